@@ -0,0 +1,196 @@
+"""
+Admin API Endpoints
+Operational controls for the LLM layer (cache, coalescing, scheduling, metrics)
+the background job queue, the similarity index, the watch-list screening index
+and the compliance rules engine
+"""
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+
+from ..services.llm_cache import llm_response_cache
+from ..services.single_flight import llm_single_flight
+from ..services.llm_scheduler import llm_scheduler
+from ..services.llm_metrics import llm_metrics
+from ..services.job_queue import job_queue, job_worker_pool, WATCHLIST_RESCREEN_JOB
+from ..services.similarity_index import similarity_index
+from ..services.name_screening import name_screener
+from ..services.screening_cache import screening_cache
+from ..services.client_dedup import client_deduplicator
+from ..services.watchlist_rescreen import watchlist_rescreener
+from ..services.compliance_rules import compliance_rules
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/llm/stats")
+async def get_llm_stats():
+    """
+    Get LLM layer statistics (response cache, request coalescing and scheduler lanes)
+    """
+    return {
+        "cache": await asyncio.to_thread(llm_response_cache.stats),
+        "single_flight": llm_single_flight.stats(),
+        "scheduler": llm_scheduler.stats()
+    }
+
+
+@router.get("/llm/scheduler")
+async def get_llm_scheduler_stats():
+    """
+    Get per-lane queue depth and wait times of the LLM scheduler
+    """
+    return llm_scheduler.stats()
+
+
+@router.get("/llm/cache")
+async def get_llm_cache_stats():
+    """
+    Get LLM response cache hit/miss counters and tier sizes
+    """
+    return await asyncio.to_thread(llm_response_cache.stats)
+
+
+@router.delete("/llm/cache")
+async def purge_llm_cache(
+    template_type: Optional[str] = Query(None, description="Only purge entries for this template type")
+):
+    """
+    Purge cached LLM responses from memory and persistent tiers
+    """
+    deleted = await asyncio.to_thread(llm_response_cache.purge, template_type)
+    return {
+        "purged": deleted,
+        "template_type": template_type
+    }
+
+
+@router.get("/llm/metrics")
+async def get_llm_metrics():
+    """
+    Get per-call LLM accounting aggregated by template type, agent and model:
+    call/token/cost totals plus queue wait, time-to-first-byte and total latency
+    histograms with p50/p95/p99
+    """
+    return llm_metrics.snapshot()
+
+
+@router.delete("/llm/metrics")
+async def reset_llm_metrics():
+    """
+    Reset aggregated LLM metrics
+    """
+    llm_metrics.reset()
+    return {"reset": True}
+
+
+@router.get("/jobs/stats")
+async def get_job_stats():
+    """
+    Get background job metrics: jobs per status, queue depth and age of the oldest
+    queued job, expired leases, retries, queue wait / run time percentiles of
+    recent jobs, and counters of this process's workers
+    """
+    return {
+        "queue": await asyncio.to_thread(job_queue.stats),
+        "workers": job_worker_pool.stats()
+    }
+
+
+@router.get("/similarity/stats")
+async def get_similarity_index_stats():
+    """
+    Get similarity index size, partitioning, build time and query latency
+    """
+    return similarity_index.stats()
+
+
+@router.post("/similarity/rebuild")
+async def rebuild_similarity_index():
+    """
+    Rebuild the similarity index from the KYC history in the database
+    """
+    records = await asyncio.to_thread(similarity_index.build)
+    return {"records": records, **similarity_index.stats()}
+
+
+@router.get("/screening/stats")
+async def get_screening_stats():
+    """
+    Get loaded watch-lists, screening index size, load time and screening latency
+    """
+    return {
+        **name_screener.stats(),
+        "cache": await asyncio.to_thread(screening_cache.stats),
+        "client_dedup": await asyncio.to_thread(client_deduplicator.stats)
+    }
+
+
+@router.get("/screening/cache")
+async def get_screening_cache_stats():
+    """
+    Get screening result cache hit rate and tier sizes
+    """
+    return await asyncio.to_thread(screening_cache.stats)
+
+
+@router.delete("/screening/cache")
+async def purge_screening_cache():
+    """
+    Purge cached screening results (entries of older list versions are dropped automatically)
+    """
+    deleted = await asyncio.to_thread(screening_cache.purge)
+    return {"purged": deleted}
+
+
+@router.post("/screening/reload")
+async def reload_screening_watchlists():
+    """
+    Re-open SCREENING_INDEX_PATH, or re-index the SCREENING_WATCHLIST_PATHS files
+    """
+    aliases = await asyncio.to_thread(name_screener.reload)
+    return {"aliases": aliases, **name_screener.stats()}
+
+
+@router.post("/screening/rescreen", status_code=202)
+async def rescreen_clients():
+    """
+    Queue a re-screening of all clients against the current watch-list version
+
+    Only entries added or changed since the last screened version are matched
+    (against an index of all client names); new matches flag the client and raise
+    a risk alert. Poll GET /agents/jobs/{job_id} for the outcome.
+    """
+    list_version = await asyncio.to_thread(lambda: name_screener.list_version)
+    job = await asyncio.to_thread(job_queue.enqueue, WATCHLIST_RESCREEN_JOB, {"list_version": list_version})
+    return {"job_id": job["job_id"], "status": job["status"], "list_version": list_version}
+
+
+@router.get("/screening/runs")
+async def get_screening_runs(limit: int = Query(20, ge=1, le=200)):
+    """
+    Get recent client book re-screenings, newest first
+    """
+    return {"runs": await asyncio.to_thread(watchlist_rescreener.runs, limit)}
+
+
+@router.get("/compliance/rules")
+async def get_compliance_rules_stats():
+    """
+    Get the loaded compliance rules, per-rule hits and the fast-path ratio (cases decided without the LLM)
+    """
+    return compliance_rules.stats()
+
+
+@router.post("/compliance/rules/reload")
+async def reload_compliance_rules():
+    """
+    Re-compile the rules from COMPLIANCE_RULES_PATH (or the built-in rules)
+    """
+    try:
+        rules = await asyncio.to_thread(compliance_rules.load)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid compliance rules: {e}")
+    return {"loaded": rules, **compliance_rules.stats()}
@@ -3,13 +3,19 @@ Agent Orchestration API Endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any
 from sqlalchemy.orm import Session
+import asyncio
+import json
+import uuid
 
 from app.database import get_db
-from app.services.agent_orchestrator import AgentOrchestrator
-from app.services.llm_service import llm_service
+from app.services.agent_orchestrator import agent_orchestrator
+from app.services.workflow_checkpoints import workflow_checkpoints, RUN_COMPLETED
+from app.services.job_queue import job_queue, KYC_ORCHESTRATION_JOB, JOB_SUCCEEDED, TERMINAL_STATUSES
+from app.config import settings
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
@@ -18,6 +24,7 @@ class AgentWorkflowRequest(BaseModel):
     kyc_notes: str
     nationality: str | None = None
     residency_country: str | None = None
+    force: bool = False  # Re-run every step instead of reusing checkpoints with identical inputs
 
 @router.post("/orchestrate")
 async def run_agent_orchestration(
@@ -31,25 +38,171 @@ async def run_agent_orchestration(
     - Multi-agent coordination
     - RAG for context retrieval
     - Tool calling for compliance checks
+    
+    Each agent step is checkpointed; completed steps with identical inputs are
+    reused unless force is set. On failure the error names the run_id, which can
+    be resumed via POST /agents/runs/{run_id}/resume.
     """
+    run_id = uuid.uuid4().hex
     try:
-        # Use global llm_service instance
-        orchestrator = AgentOrchestrator(llm_service)
-        
-        # Run orchestration
-        result = await orchestrator.orchestrate_kyc_workflow({
+        # Shared orchestrator; each run gets its own WorkflowContext
+        result = await agent_orchestrator.orchestrate_kyc_workflow({
             "full_name": request.full_name,
             "kyc_notes": request.kyc_notes,
             "nationality": request.nationality,
             "residency_country": request.residency_country
-        })
+        }, run_id=run_id, reuse_checkpoints=not request.force)
         
         return result
         
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Agent orchestration failed: {str(e)}"
+            detail=f"Agent orchestration failed: {str(e)} (run_id: {run_id})"
+        )
+
+@router.post("/orchestrate/stream")
+async def stream_agent_orchestration(request: AgentWorkflowRequest):
+    """
+    Run multi-agent orchestration workflow, streaming progress as Server-Sent Events.
+    
+    Each agent's execution log entry, tool call and the final decision are pushed
+    as soon as they are produced; the compliance rationale is streamed token by
+    token (rationale_token events). The last event is workflow_completed, carrying
+    the same payload as POST /agents/orchestrate, or error.
+    """
+    async def event_stream():
+        async for item in agent_orchestrator.stream_kyc_workflow({
+            "full_name": request.full_name,
+            "kyc_notes": request.kyc_notes,
+            "nationality": request.nationality,
+            "residency_country": request.residency_country
+        }, reuse_checkpoints=not request.force):
+            yield f"event: {item['event']}\ndata: {json.dumps(item['data'], default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so events flush immediately
+        }
+    )
+
+def _job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job state returned to clients (without the stored request payload)"""
+    view = {key: value for key, value in job.items() if key != "payload"}
+    view["status_url"] = f"/agents/jobs/{job['job_id']}"
+    view["events_url"] = f"/agents/jobs/{job['job_id']}/events"
+    return view
+
+@router.post("/jobs", status_code=202)
+async def enqueue_agent_workflow(request: AgentWorkflowRequest):
+    """
+    Queue a multi-agent orchestration workflow and return immediately.
+    
+    The workflow runs on a background worker (in-process or `python -m app.worker`).
+    Poll GET /agents/jobs/{job_id} or subscribe to its events for the result.
+    Failed attempts are retried, resuming the job's workflow run (run_id).
+    """
+    job = await asyncio.to_thread(
+        job_queue.enqueue,
+        KYC_ORCHESTRATION_JOB,
+        {
+            "kyc_data": {
+                "full_name": request.full_name,
+                "kyc_notes": request.kyc_notes,
+                "nationality": request.nationality,
+                "residency_country": request.residency_country
+            },
+            "reuse_checkpoints": not request.force
+        },
+        None,
+        uuid.uuid4().hex
+    )
+    return _job_view(job)
+
+@router.get("/jobs/{job_id}")
+async def get_agent_job(job_id: str):
+    """
+    Get a queued workflow's status, attempts, latest progress event and (once
+    it succeeded) the same result payload as POST /agents/orchestrate.
+    """
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_view(job)
+
+@router.get("/jobs/{job_id}/events")
+async def subscribe_agent_job(job_id: str):
+    """
+    Subscribe to a queued workflow as Server-Sent Events.
+    
+    A status event is sent whenever the job's status, attempt or progress
+    changes; the stream ends with completed (carrying the result) or failed.
+    """
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        current, last = job, None
+        while True:
+            snapshot = (current["status"], current["attempts"], current["progress"])
+            if snapshot != last:
+                last = snapshot
+                status = {key: current[key] for key in ("job_id", "run_id", "status", "attempts", "max_attempts", "progress", "error")}
+                yield f"event: status\ndata: {json.dumps(status, default=str)}\n\n"
+            if current["status"] in TERMINAL_STATUSES:
+                event = "completed" if current["status"] == JOB_SUCCEEDED else "failed"
+                yield f"event: {event}\ndata: {json.dumps(_job_view(current), default=str)}\n\n"
+                return
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+            current = await asyncio.to_thread(job_queue.get, job_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+@router.get("/runs/{run_id}")
+async def get_workflow_run(run_id: str):
+    """
+    Get a workflow run's status, step checkpoints and (when finished) its result.
+    """
+    run = await asyncio.to_thread(workflow_checkpoints.get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    return run
+
+@router.post("/runs/{run_id}/resume")
+async def resume_workflow_run(run_id: str):
+    """
+    Resume a failed, incomplete or interrupted workflow run.
+    
+    Completed step checkpoints are replayed without calling the model again and
+    execution restarts from the first incomplete step. A run that already
+    completed returns its stored result; a run that is still running (checkpoint
+    writes within WORKFLOW_RUN_STALE_SECONDS) is rejected with 409.
+    """
+    run = await asyncio.to_thread(workflow_checkpoints.get_run, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Workflow run not found")
+    if run["status"] == RUN_COMPLETED and run["result"] is not None:
+        return run["result"]
+    if not await asyncio.to_thread(workflow_checkpoints.claim_resume, run_id):
+        raise HTTPException(status_code=409, detail=f"Workflow run is still running (run_id: {run_id})")
+    
+    try:
+        return await agent_orchestrator.orchestrate_kyc_workflow(run["input_data"], run_id=run_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Agent orchestration failed: {str(e)} (run_id: {run_id})"
         )
 
 @router.get("/workflow-info")
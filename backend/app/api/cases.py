@@ -10,6 +10,7 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 from ..database import get_db
 from ..models import Case, RiskAlert, Client
+from ..services.similarity_index import similarity_index
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api", tags=["cases", "alerts"])
@@ -86,7 +87,8 @@ def list_cases(
     db: Session = Depends(get_db)
 ):
     """List all cases with optional filters"""
-    query = db.query(Case)
+    # Client names come from the same query (outer join), not a lazy load per case
+    query = db.query(Case, Client.full_name).outerjoin(Client, Client.id == Case.client_id)
     
     if status:
         query = query.filter(Case.status == status)
@@ -95,16 +97,16 @@ def list_cases(
     if assigned_to:
         query = query.filter(Case.assigned_to == assigned_to)
     
-    cases = query.order_by(desc(Case.created_at)).all()
+    rows = query.order_by(desc(Case.created_at)).all()
     
     # Add client names
     result = []
-    for case in cases:
+    for case, client_name in rows:
         case_dict = {
             "id": case.id,
             "alert_id": case.alert_id,
             "client_id": case.client_id,
-            "client_name": case.client.full_name if case.client else None,
+            "client_name": client_name,
             "case_type": case.case_type,
             "status": case.status,
             "priority": case.priority,
@@ -161,6 +163,7 @@ def create_case(case_data: CaseCreate, db: Session = Depends(get_db)):
     db.add(new_case)
     db.commit()
     db.refresh(new_case)
+    similarity_index.schedule_refresh([new_case.client_id])
     
     # Build response
     case_dict = {
@@ -251,6 +254,7 @@ def update_case(case_id: int, case_update: CaseUpdate, db: Session = Depends(get
     
     db.commit()
     db.refresh(case)
+    similarity_index.schedule_refresh([case.client_id])
     
     case_dict = {
         "id": case.id,
@@ -282,7 +286,12 @@ def get_open_alerts(
     db: Session = Depends(get_db)
 ):
     """Get open alerts queue for compliance team dashboard"""
-    query = db.query(RiskAlert).filter(RiskAlert.status.in_(["Open", "Under Review"]))
+    # Client names come from the same query (outer join), not a lazy load per alert
+    query = (
+        db.query(RiskAlert, Client.full_name)
+        .outerjoin(Client, Client.id == RiskAlert.client_id)
+        .filter(RiskAlert.status.in_(["Open", "Under Review"]))
+    )
     
     if priority:
         query = query.filter(RiskAlert.priority == priority)
@@ -291,13 +300,13 @@ def get_open_alerts(
     if assigned_to:
         query = query.filter(RiskAlert.assigned_to == assigned_to)
     
-    alerts = query.order_by(asc(RiskAlert.sla_due_date), desc(RiskAlert.created_at)).all()
+    rows = query.order_by(asc(RiskAlert.sla_due_date), desc(RiskAlert.created_at)).all()
     
     # Build response with SLA status
     result = []
     now = datetime.utcnow()
     
-    for alert in alerts:
+    for alert, client_name in rows:
         is_overdue = False
         if alert.sla_due_date:
             is_overdue = alert.sla_due_date < now
@@ -305,7 +314,7 @@ def get_open_alerts(
         alert_dict = {
             "id": alert.id,
             "client_id": alert.client_id,
-            "client_name": alert.client.full_name if alert.client else None,
+            "client_name": client_name,
             "severity": alert.severity,
             "status": alert.status,
             "priority": alert.priority,
@@ -1,14 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 from ..database import get_db
 from ..models import Client, RiskAlert, KYCRecord, Case
 from ..schemas.insights import ClientInsights
 from ..services.llm_service import llm_service
+from ..services.client_dedup import client_deduplicator
 
 router = APIRouter(prefix="/api/clients", tags=["Client Insights"])
 
@@ -62,6 +63,30 @@ class ClientCaseResponse(BaseModel):
         from_attributes = True
 
 
+class DuplicateClientResponse(BaseModel):
+    client_id: int
+    full_name: str
+    date_of_birth: str | None
+    nationality: str | None
+    status: str | None
+    score: float
+
+
+@router.get("/duplicates", response_model=List[DuplicateClientResponse])
+async def find_duplicate_clients(
+    name: str = Query(..., min_length=1, description="Name to check, in any script"),
+    limit: int = Query(10, ge=1, le=100),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Minimum similarity (default CLIENT_DEDUP_MATCH_THRESHOLD)"),
+    exclude_client_id: Optional[int] = Query(None, description="Client to leave out (when checking an existing client)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Existing clients that are likely the same person as a name (transliterations,
+    spelling variants and reordered names included), best match first
+    """
+    return client_deduplicator.find_duplicates(db, name, limit, threshold, exclude_client_id)
+
+
 @router.get("/{client_id}/insights", response_model=ClientInsights)
 async def get_client_insights(
     client_id: int,
@@ -104,7 +129,7 @@ async def get_client_insights(
     ]
     
     # Generate insights using LLM
-    insights = llm_service.generate_insights(client_data, alerts_data)
+    insights = await llm_service.generate_insights(client_data, alerts_data)
     
     return {
         "client_id": client_id,
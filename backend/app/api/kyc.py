@@ -1,11 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Any, Dict
-from datetime import datetime, timedelta, date
+from typing import List, Any, Dict, Optional
+import json
 
+from ..config import settings
 from ..database import get_db
 from ..models.client import Client
-from ..models.kyc_record import KYCRecord
 from ..schemas.client import (
     KYCAnalysisRequest,
     ClientResponse,
@@ -13,6 +14,17 @@ from ..schemas.client import (
     ClientListItem
 )
 from ..services.ai_analysis_service import AIAnalysisService
+from ..services.similarity_index import similarity_index
+from ..services.client_dedup import client_deduplicator
+from ..services.kyc_service import (
+    build_kyc_context,
+    find_unchanged_kyc,
+    refresh_kyc_review,
+    apply_kyc_analysis,
+    build_client_response,
+    analyze_kyc_batch,
+    dumps_outcome
+)
 
 router = APIRouter(prefix="/api/kyc", tags=["KYC Workflows"])
 
@@ -24,17 +36,20 @@ async def analyze_kyc(
 ):
     """
     Analyze KYC data using AI, create/update client, and record KYC history
+    
+    If the inputs match the client's latest KYC record, the previous assessment is
+    reused and only the review dates move forward; set "force" to re-analyse.
     """
+    # Incremental review: unchanged inputs skip the model entirely
+    unchanged = find_unchanged_kyc(db, request)
+    if unchanged:
+        client, kyc_record = refresh_kyc_review(db, *unchanged)
+        db.commit()
+        db.refresh(client)
+        return build_client_response(client, kyc_record, reused=True)
+    
     # Prepare context for AI
-    context = {
-        "full_name": request.full_name,
-        "date_of_birth": str(request.date_of_birth) if request.date_of_birth else None,
-        "nationality": request.nationality,
-        "residency_country": request.residency_country,
-        "source_of_wealth": request.source_of_wealth,
-        "business_activity": request.business_activity,
-        "kyc_notes": request.kyc_notes
-    }
+    context = build_kyc_context(request)
     
     # Call Unified AI Service
     analysis_result = await AIAnalysisService.analyze(
@@ -42,90 +57,62 @@ async def analyze_kyc(
         template_type="KYC_ANALYSIS"
     )
     
-    # Calculate next review date
-    next_review_months = analysis_result.get("next_review_months", 12)
-    next_review_date = date.today() + timedelta(days=next_review_months * 30)
-    
-    # Check if client exists
-    client = db.query(Client).filter(Client.full_name == request.full_name).first()
+    # Create/update client and record KYC history
+    client, kyc_record = apply_kyc_analysis(db, request, analysis_result)
     
-    if client:
-        # Update existing client
-        client.date_of_birth = request.date_of_birth or client.date_of_birth
-        client.nationality = request.nationality or client.nationality
-        client.residency_country = request.residency_country or client.residency_country
-        client.source_of_wealth = request.source_of_wealth or client.source_of_wealth
-        client.business_activity = request.business_activity or client.business_activity
-        client.raw_kyc_notes = request.kyc_notes
-        client.updated_at = datetime.utcnow()
-    else:
-        # Create new client
-        client = Client(
-            full_name=request.full_name,
-            date_of_birth=request.date_of_birth,
-            nationality=request.nationality,
-            residency_country=request.residency_country,
-            source_of_wealth=request.source_of_wealth,
-            business_activity=request.business_activity,
-            raw_kyc_notes=request.kyc_notes,
-            status="Active"
-        )
-        db.add(client)
-        db.flush()  # Get ID
-        
-    # Update Client Risk Profile
-    client.risk_score = analysis_result.get("risk_score", "Medium")
-    client.risk_rationale = analysis_result.get("risk_rationale", "")
-    client.kyc_summary = analysis_result.get("kyc_summary", "")
-    client.pep_flag = analysis_result.get("pep_flag", False)
-    client.sanctions_flag = analysis_result.get("sanctions_flag", False)
-    client.next_review_date = next_review_date
-    
-    # Create KYC Record (History)
-    # Determine version
-    last_record = db.query(KYCRecord).filter(KYCRecord.client_id == client.id).order_by(KYCRecord.version.desc()).first()
-    new_version = (last_record.version + 1) if last_record else 1
+    db.commit()
+    db.refresh(client)
+    similarity_index.schedule_refresh([client.id])
+    client_deduplicator.schedule_index([client.id])
     
-    kyc_record = KYCRecord(
-        client_id=client.id,
-        version=new_version,
-        risk_score=client.risk_score,
-        risk_rationale=client.risk_rationale,
-        kyc_summary=client.kyc_summary,
-        cdd_conclusion=analysis_result.get("cdd_conclusion", "Standard CDD"),
-        edd_required=analysis_result.get("edd_required", False),
-        review_date=date.today(),
-        next_review_date=next_review_date
+    return build_client_response(client, kyc_record)
+
+
+@router.post("/analyze/batch")
+async def analyze_kyc_batch_endpoint(
+    request: Request,
+    concurrency: Optional[int] = Query(
+        None, ge=1, le=settings.KYC_BATCH_MAX_CONCURRENCY,
+        description="Maximum concurrent analyses (defaults to KYC_BATCH_CONCURRENCY)"
+    ),
+    commit_batch_size: Optional[int] = Query(
+        None, ge=1, le=1000,
+        description="Rows written per transaction (defaults to KYC_BATCH_COMMIT_SIZE)"
     )
-    db.add(kyc_record)
+):
+    """
+    Bulk KYC analysis for periodic reviews
     
-    db.commit()
-    db.refresh(client)
+    Accepts a JSON array of KYCAnalysisRequest objects, or an NDJSON body
+    (Content-Type: application/x-ndjson) with one request per line. Results are
+    streamed back as NDJSON in completion order: one line per item with its input
+    index and either the client result or the error, followed by a summary line.
+    Invalid or failing items do not abort the batch.
+    """
+    # The body is read up front: once the streaming response starts, Starlette
+    # listens on the same receive channel for client disconnects.
+    body = await request.body()
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = [line for line in body.decode("utf-8").splitlines() if line.strip()]
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array of KYC requests")
     
-    # Construct response combining Client and Analysis details
-    response_data = {
-        "id": client.id,
-        "full_name": client.full_name,
-        "date_of_birth": client.date_of_birth,
-        "nationality": client.nationality,
-        "residency_country": client.residency_country,
-        "source_of_wealth": client.source_of_wealth,
-        "business_activity": client.business_activity,
-        "pep_flag": client.pep_flag,
-        "sanctions_flag": client.sanctions_flag,
-        "risk_score": client.risk_score,
-        "risk_rationale": client.risk_rationale,
-        "kyc_summary": client.kyc_summary,
-        "raw_kyc_notes": client.raw_kyc_notes,
-        "created_at": client.created_at,
-        "updated_at": client.updated_at,
-        # Enhanced fields from analysis
-        "cdd_conclusion": kyc_record.cdd_conclusion,
-        "edd_required": kyc_record.edd_required,
-        "next_review_date": client.next_review_date
-    }
+    async def result_stream():
+        completed = failed = 0
+        async for outcome in analyze_kyc_batch(items, concurrency, commit_batch_size):
+            if outcome["status"] == "completed":
+                completed += 1
+            else:
+                failed += 1
+            yield dumps_outcome(outcome)
+        yield dumps_outcome({"summary": {"total": completed + failed, "completed": completed, "failed": failed}})
     
-    return response_data
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
 
 
 @router.get("/clients", response_model=ClientListResponse)
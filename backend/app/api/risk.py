@@ -12,6 +12,7 @@ from ..schemas.risk import (
     RiskAlertListItem
 )
 from ..services.ai_analysis_service import AIAnalysisService
+from ..services.similarity_index import similarity_index
 
 router = APIRouter(prefix="/api/risk", tags=["Risk Surveillance"])
 
@@ -42,7 +43,8 @@ async def analyze_risk(
     analysis_result = await AIAnalysisService.analyze(
         context=context,
         template_type="RISK_SURVEILLANCE",
-        client_id=request.client_id
+        client_id=request.client_id,
+        priority="bulk"
     )
     
     # Create risk alert record
@@ -60,6 +62,7 @@ async def analyze_risk(
     db.add(alert)
     db.commit()
     db.refresh(alert)
+    similarity_index.schedule_refresh([alert.client_id])
     
     return alert
 
@@ -84,17 +87,19 @@ async def get_risk_alerts(
         query = query.filter(RiskAlert.client_id == client_id)
     
     total = query.count()
-    alerts = query.order_by(RiskAlert.created_at.desc()).offset(skip).limit(limit).all()
+    # Client names come from the same query (outer join), not one query per alert
+    rows = (
+        query.add_columns(Client.full_name)
+        .outerjoin(Client, Client.id == RiskAlert.client_id)
+        .order_by(RiskAlert.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
     
     # Build response with client names
     alert_items = []
-    for alert in alerts:
-        client_name = None
-        if alert.client_id:
-            client = db.query(Client).filter(Client.id == alert.client_id).first()
-            if client:
-                client_name = client.full_name
-        
+    for alert, client_name in rows:
         alert_items.append(RiskAlertListItem(
             id=alert.id,
             client_id=alert.client_id,
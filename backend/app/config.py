@@ -8,10 +8,87 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4o"
+    OPENAI_BASE_URL: str = ""  # Optional OpenAI-compatible endpoint override
+    
+    # LLM Gateway Configuration
+    LLM_TIMEOUT_SECONDS: float = 60.0  # Default per-call read timeout
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_MAX_CONNECTIONS: int = 100  # Upper bound on concurrent sockets per worker
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    
+    # LLM Scheduler (provider quota; 0 disables a limit)
+    LLM_RATE_LIMIT_RPM: int = 500
+    LLM_RATE_LIMIT_TPM: int = 150000
+    LLM_RATE_LIMIT_BURST_SECONDS: float = 10.0
+    LLM_INTERACTIVE_WEIGHT: int = 4  # Share of admissions under contention
+    LLM_BULK_WEIGHT: int = 1
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1024  # In-process LRU capacity
+    LLM_CACHE_TTL_SECONDS: int = 86400  # Applies to both memory and persistent tiers
+    
+    # Oversized Input Handling (map-reduce over chunks)
+    LLM_INPUT_TOKEN_BUDGET: int = 6000  # Max tokens of activity_log/kyc_notes sent in one prompt
+    LLM_CHUNK_TOKENS: int = 3000  # Tokens per chunk when the budget is exceeded
+    LLM_CHUNK_OVERLAP_TOKENS: int = 150  # Context carried over between adjacent chunks
+    LLM_CHUNK_CONCURRENCY: int = 8  # Concurrent chunk extractions per analysis
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./xbanker.db"
     
+    # Incremental KYC Review (reuse the last assessment when inputs are unchanged)
+    KYC_INCREMENTAL_ENABLED: bool = True
+    
+    # Agent Workflow Checkpoints (resume failed runs, reuse completed steps)
+    WORKFLOW_CHECKPOINTS_ENABLED: bool = True
+    WORKFLOW_CHECKPOINT_TTL_SECONDS: int = 86400  # Max age of a completed step reused by a new run
+    WORKFLOW_RUN_STALE_SECONDS: int = 600  # A Running run without checkpoint writes for this long is interrupted (resumable)
+    WORKFLOW_SPECULATIVE_SCREENING: bool = True  # Screen the request's nationality/residency before the KYC Analyst finishes
+    
+    # Similarity Index (RAG retrieval of similar historical KYC reviews)
+    SIMILARITY_INDEX_ENABLED: bool = True
+    SIMILARITY_INDEX_DIM: int = 256  # Hashed feature dimensions (float32 per record and dimension)
+    SIMILARITY_INDEX_TOP_K: int = 3  # Cases returned to the Risk Assessor
+    SIMILARITY_INDEX_MIN_SCORE: float = 0.05  # Minimum cosine similarity of a returned case
+    SIMILARITY_INDEX_PARTITION_MIN_ROWS: int = 50000  # Exact search below this size, k-means partitions above
+    SIMILARITY_INDEX_NPROBE: int = 16  # Partitions scanned per query
+    SIMILARITY_INDEX_MERGE_ROWS: int = 5000  # Delta rows that trigger a background merge into the base segment
+    SIMILARITY_INDEX_SNAPSHOT_PATH: str = "./similarity_index.npz"  # Base segment saved after builds and merges ("" disables)
+    
+    # Name Screening (local fuzzy matching against sanctions and PEP watch-lists)
+    SCREENING_INDEX_PATH: str = ""  # Compiled watch-list file (python -m app.ingest_watchlists), memory-mapped
+    SCREENING_WATCHLIST_PATHS: str = ""  # Comma-separated JSON Lines watch-list files, used without an index file
+    SCREENING_MATCH_THRESHOLD: float = 0.85  # Minimum name similarity (0-1) reported as a match
+    SCREENING_MAX_CANDIDATES: int = 256  # Candidates (most shared rare trigrams) scored per screened name
+    SCREENING_MAX_HITS: int = 10  # Ranked matches returned per screened name
+    SCREENING_RESCREEN_MAX_CLIENT_HITS: int = 50  # Clients matched per changed list name in a re-screening
+    SCREENING_ALERT_SLA_HOURS: int = 24  # Review deadline of alerts raised by re-screenings
+    SCREENING_CACHE_ENABLED: bool = True
+    SCREENING_CACHE_MAX_ENTRIES: int = 10000  # In-process LRU capacity
+    SCREENING_CACHE_TTL_SECONDS: int = 604800  # Both tiers; entries are also dropped when the list version changes
+    CLIENT_DEDUP_MATCH_THRESHOLD: float = 0.85  # Minimum name similarity (0-1) of a possible duplicate client
+    CLIENT_DEDUP_MAX_CANDIDATES: int = 200  # Clients (most shared blocking keys) scored per duplicate check
+    
+    # Compliance Rules (deterministic fast path of the Compliance Agent)
+    COMPLIANCE_RULES_ENABLED: bool = True
+    COMPLIANCE_RULES_PATH: str = ""  # JSON list of rules replacing the built-in ones (see compliance_rules.py)
+    
+    # Background Job Queue (asynchronous agent workflows; the database is the queue)
+    JOB_WORKER_CONCURRENCY: int = 2  # In-process workers started with the API (0 when using `python -m app.worker`)
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300  # Lease of a running job, renewed every third of it
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0  # Doubled after every failed attempt
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0  # Idle worker polling and job event subscription interval
+    
+    # Bulk KYC Analysis
+    KYC_BATCH_CONCURRENCY: int = 8  # Concurrent model calls per batch
+    KYC_BATCH_MAX_CONCURRENCY: int = 64  # Upper bound accepted from callers
+    KYC_BATCH_COMMIT_SIZE: int = 50  # Rows written per transaction
+    KYC_BATCH_FLUSH_SECONDS: float = 1.0  # Max time a completed row waits for its group
+    
     # CORS Configuration
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
     
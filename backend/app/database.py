@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -25,7 +25,26 @@ def get_db():
         db.close()
 
 
+def _add_missing_columns():
+    """Add nullable columns introduced after a table was first created (create_all skips existing tables)"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                if column.index:
+                    conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name} ON {table.name} ({column.name})"))
+
+
 def init_db():
     """Initialize database tables"""
-    from .models import client, risk_alert, case, kyc_record  # Import all models to register them
+    from .models import client, risk_alert, case, kyc_record, llm_cache_entry, workflow_run, workflow_job, screening_run, screening_cache_entry, client_name_key  # Import all models to register them
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
@@ -0,0 +1,52 @@
+"""
+Watch-list Ingestion
+Compiles sanctions and PEP list files into the screening index file that the API
+and workers memory-map (SCREENING_INDEX_PATH):
+
+    python -m app.ingest_watchlists --output ./watchlists.bin sdn.xml consolidated.xml \
+        eu_fsf.xml ConList.csv pep.jsonl
+
+Formats are detected from each file; prefix a path with its format to override
+(ofac:, un:, eu:, uk:, jsonl:). Running processes pick up the new file within
+seconds, without a restart. With --rescreen, a job re-screening all clients
+against the changed entries is queued for the workers.
+"""
+
+import argparse
+import json
+import logging
+
+from .config import settings
+from .database import init_db
+from .services.job_queue import job_queue, WATCHLIST_RESCREEN_JOB
+from .services.watchlist_ingest import ingest
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile watch-list files into the screening index file")
+    parser.add_argument("sources", nargs="+", help="List files, optionally prefixed with their format (uk:ConList.csv)")
+    parser.add_argument(
+        "--output", default=settings.SCREENING_INDEX_PATH or None, required=not settings.SCREENING_INDEX_PATH,
+        help="Index file to write (default: SCREENING_INDEX_PATH)"
+    )
+    parser.add_argument(
+        "--rescreen", action="store_true",
+        help="Queue a re-screening of all clients against the new version (the workers must use --output)"
+    )
+    args = parser.parse_args()
+
+    header = ingest(args.sources, args.output)
+    print(json.dumps(header, indent=2, ensure_ascii=False))
+    if args.rescreen:
+        init_db()
+        job = job_queue.enqueue(WATCHLIST_RESCREEN_JOB, {"list_version": header["list_version"]})
+        print(f"Queued re-screening job {job['job_id']}")
+
+
+if __name__ == "__main__":
+    main()
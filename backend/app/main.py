@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 
 from .config import settings
 from .database import init_db
-from .api import kyc, risk, clients, dashboard, agents, cases
+from .services.llm_gateway import llm_gateway
+from .services.job_queue import job_worker_pool
+from .services.similarity_index import similarity_index
+from .services.name_screening import name_screener
+from .services.client_dedup import client_deduplicator
+from .api import kyc, risk, clients, dashboard, agents, cases, admin
 
 # Configure logging
 logging.basicConfig(
@@ -39,6 +45,7 @@ app.include_router(clients.router)
 app.include_router(dashboard.router)
 app.include_router(agents.router)
 app.include_router(cases.router)
+app.include_router(admin.router)
 
 
 @app.on_event("startup")
@@ -50,6 +57,23 @@ async def startup_event():
     logger.info(f"Application started: {settings.APP_NAME}")
     if not settings.OPENAI_API_KEY:
         logger.warning("No OpenAI API key configured - running in MOCK MODE")
+    if settings.JOB_WORKER_CONCURRENCY > 0:
+        job_worker_pool.start(settings.JOB_WORKER_CONCURRENCY)
+    if settings.SIMILARITY_INDEX_ENABLED:
+        # Warm the RAG index in the background; early queries wait for it
+        asyncio.get_running_loop().run_in_executor(None, similarity_index.ensure_built)
+    if settings.SCREENING_INDEX_PATH or settings.SCREENING_WATCHLIST_PATHS:
+        # Map (or index) the watch-lists in the background; early screenings wait for them
+        asyncio.get_running_loop().run_in_executor(None, name_screener.ensure_loaded)
+    # Key the names of clients created before (or outside) the API for duplicate checks
+    asyncio.get_running_loop().run_in_executor(None, client_deduplicator.backfill)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers (releasing their jobs) and pooled LLM connections on shutdown"""
+    await job_worker_pool.stop()
+    await llm_gateway.aclose()
 
 
 @app.get("/")
@@ -3,5 +3,11 @@ from .client import Client
 from .risk_alert import RiskAlert
 from .case import Case
 from .kyc_record import KYCRecord
+from .llm_cache_entry import LLMCacheEntry
+from .workflow_run import WorkflowRun, WorkflowStep
+from .workflow_job import WorkflowJob
+from .screening_run import ScreeningRun, ScreeningMatch
+from .screening_cache_entry import ScreeningCacheEntry
+from .client_name_key import ClientNameKey
 
-__all__ = ["Client", "RiskAlert", "Case", "KYCRecord"]
+__all__ = ["Client", "RiskAlert", "Case", "KYCRecord", "LLMCacheEntry", "WorkflowRun", "WorkflowStep", "WorkflowJob", "ScreeningRun", "ScreeningMatch", "ScreeningCacheEntry", "ClientNameKey"]
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from ..database import Base
+
+
+class ClientNameKey(Base):
+    """Blocking key of a client's name: duplicate candidates are the clients sharing a key"""
+
+    __tablename__ = "client_name_keys"
+    __table_args__ = (
+        Index("ix_client_name_keys_key_client", "key", "client_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    key = Column(String(255), nullable=False)  # e.g. p:XMT, s:putin vladimir (see name_keys.blocking_keys)
+
+    def __repr__(self):
+        return f"<ClientNameKey(client_id={self.client_id}, key={self.key})>"
@@ -34,6 +34,7 @@ class KYCRecord(Base):
     
     # Original input data
     raw_kyc_notes = Column(Text, nullable=True)
+    input_fingerprint = Column(String(64), nullable=True, index=True)  # SHA-256 of normalized inputs
     
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from datetime import datetime
+from ..database import Base
+
+
+class LLMCacheEntry(Base):
+    """Persistent tier of the content-addressed LLM response cache"""
+    
+    __tablename__ = "llm_cache_entries"
+    
+    # SHA-256 of template type, model, sampling parameters and rendered prompt
+    cache_key = Column(String(64), primary_key=True)
+    template_type = Column(String(50), nullable=False, index=True)
+    model = Column(String(100), nullable=False)
+    
+    # Raw model output
+    response = Column(Text, nullable=False)
+    
+    # Bookkeeping
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<LLMCacheEntry(key={self.cache_key[:12]}, template={self.template_type}, model={self.model})>"
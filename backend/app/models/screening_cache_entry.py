@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from ..database import Base
+
+
+class ScreeningCacheEntry(Base):
+    """Persistent tier of the watch-list screening result cache"""
+
+    __tablename__ = "screening_cache_entries"
+
+    # SHA-256 of category, normalized name, jurisdictions, list version and match settings
+    cache_key = Column(String(64), primary_key=True)
+    list_version = Column(String(32), nullable=False, index=True)
+    category = Column(String(20), nullable=False)
+    normalized_name = Column(String(255), nullable=False)
+
+    # Screening tool result
+    result = Column(JSON, nullable=False)
+
+    # Bookkeeping
+    hit_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ScreeningCacheEntry(key={self.cache_key[:12]}, category={self.category}, version={self.list_version})>"
@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class ScreeningRun(Base):
+    """Re-screening of the client book against one watch-list version"""
+
+    __tablename__ = "screening_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    list_version = Column(String(32), nullable=False, index=True)
+    previous_version = Column(String(32), nullable=True)  # Version diffed against (None: full screening)
+
+    # Running, Succeeded, Failed
+    status = Column(String(20), nullable=False, default="Running", index=True)
+    mode = Column(String(20), nullable=True)  # delta (changed entries vs. client names) or full (clients vs. lists)
+
+    # Sorted uint64 digests of every entry of list_version: the next run screens only entries not in here
+    entry_digests = Column(LargeBinary, nullable=True)
+
+    # Outcome
+    stats = Column(JSON, nullable=True)  # Changed entries, clients, hits, new alerts, ...
+    error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<ScreeningRun(id={self.id}, list_version={self.list_version}, status={self.status})>"
+
+
+class ScreeningMatch(Base):
+    """Watch-list entry matching a client's name, kept so re-screenings only alert on new hits"""
+
+    __tablename__ = "screening_matches"
+    __table_args__ = (
+        UniqueConstraint("client_id", "entry_id", name="uq_screening_matches_client_entry"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    entry_id = Column(String(100), nullable=False, index=True)  # e.g. OFAC-36
+    category = Column(String(20), nullable=False)  # sanctions or pep
+    list_name = Column(String(255), nullable=False)
+    entry_name = Column(String(255), nullable=False)
+    matched_alias = Column(String(255), nullable=True)
+    score = Column(Float, nullable=False)
+
+    # Active, or Delisted once the entry left the lists (flags are left for review)
+    status = Column(String(20), nullable=False, default="Active", index=True)
+    entry_digest = Column(String(16), nullable=True)  # Digest of the entry as last matched
+    list_version = Column(String(32), nullable=True)  # Version the match was last confirmed in
+    alert_id = Column(Integer, ForeignKey("risk_alerts.id"), nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    client = relationship("Client")
+    alert = relationship("RiskAlert")
+
+    def __repr__(self):
+        return f"<ScreeningMatch(client_id={self.client_id}, entry_id={self.entry_id}, status={self.status})>"
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from datetime import datetime
+from ..database import Base
+
+
+class WorkflowJob(Base):
+    """Queued agent workflow executed by a background worker (the database is the queue)"""
+
+    __tablename__ = "workflow_jobs"
+    __table_args__ = (
+        # Claim scan: next visible job in FIFO order
+        Index("ix_workflow_jobs_status_available", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(32), nullable=False, unique=True, index=True)
+    job_type = Column(String(50), nullable=False)  # e.g. kyc_orchestration
+    payload = Column(JSON, nullable=False)
+
+    # Workflow run executed by the job; retries resume it from its checkpoints
+    run_id = Column(String(32), nullable=True, index=True)
+
+    # Queued, Running, Succeeded, Failed
+    status = Column(String(20), nullable=False, default="Queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+
+    # Lease: a Running job whose locked_until has passed is visible to other workers again
+    locked_by = Column(String(100), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Retry backoff
+
+    # Outcome
+    progress = Column(JSON, nullable=True)  # Latest workflow event, for pollers and subscribers
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)  # First claim
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<WorkflowJob(job_id={self.job_id}, type={self.job_type}, status={self.status}, attempts={self.attempts})>"
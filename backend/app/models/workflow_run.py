@@ -0,0 +1,69 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from ..database import Base
+
+
+class WorkflowRun(Base):
+    """One execution of an agent workflow, resumable from its step checkpoints"""
+
+    __tablename__ = "workflow_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(String(32), nullable=False, unique=True, index=True)
+    workflow_type = Column(String(50), nullable=False)  # e.g. kyc_orchestration
+
+    # Inputs, kept so the run can be resumed without the original request
+    input_hash = Column(String(64), nullable=False, index=True)
+    input_data = Column(JSON, nullable=False)
+
+    # Running, Completed, Incomplete (a step degraded to fallback data), Failed
+    status = Column(String(20), nullable=False, default="Running", index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    steps = relationship("WorkflowStep", back_populates="run", cascade="all, delete-orphan",
+                         order_by="WorkflowStep.id")
+
+    def __repr__(self):
+        return f"<WorkflowRun(run_id={self.run_id}, type={self.workflow_type}, status={self.status})>"
+
+
+class WorkflowStep(Base):
+    """Checkpoint of one workflow step: its input hash, output and the events it emitted"""
+
+    __tablename__ = "workflow_steps"
+    __table_args__ = (
+        UniqueConstraint("run_id", "step_name", name="uq_workflow_steps_run_step"),
+        Index("ix_workflow_steps_step_input", "step_name", "input_hash"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(String(32), ForeignKey("workflow_runs.run_id"), nullable=False, index=True)
+    step_name = Column(String(50), nullable=False)
+
+    # SHA-256 of the step name, model and the step's inputs
+    input_hash = Column(String(64), nullable=False)
+
+    # Completed steps are reusable; Incomplete ones (fallback output) are re-run
+    status = Column(String(20), nullable=False)
+    output = Column(JSON, nullable=True)
+    events = Column(JSON, nullable=True)  # [[event, payload], ...] replayed on reuse
+    execution_time = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    reused_from = Column(String(32), nullable=True)  # run_id whose checkpoint was reused
+
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    # Relationships
+    run = relationship("WorkflowRun", back_populates="steps")
+
+    def __repr__(self):
+        return f"<WorkflowStep(run_id={self.run_id}, step={self.step_name}, status={self.status})>"
@@ -12,6 +12,7 @@ class KYCAnalysisRequest(BaseModel):
     source_of_wealth: Optional[str] = Field(None, description="Source of wealth description")
     business_activity: Optional[str] = Field(None, description="Business activity description")
     kyc_notes: str = Field(..., description="Unstructured KYC notes or document text")
+    force: bool = Field(False, description="Re-run the analysis even if inputs are unchanged since the last KYC record")
 
 
 class ClientBase(BaseModel):
@@ -37,6 +38,7 @@ class ClientResponse(ClientBase):
     cdd_conclusion: Optional[str] = None
     edd_required: Optional[bool] = None
     next_review_date: Optional[date] = None
+    analysis_reused: bool = False  # True when unchanged inputs reused the previous assessment
     created_at: datetime
     updated_at: datetime
     
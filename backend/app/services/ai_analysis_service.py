@@ -3,18 +3,39 @@ Unified AI Analysis Service
 Provides a single analysis engine with template-based prompts for both KYC and Risk Surveillance
 """
 
-import os
+import asyncio
 import json
-from typing import Dict, Any, Optional, Literal
-from openai import OpenAI
+import logging
+from typing import Dict, Any, Optional, Literal, List
 
 from ..config import settings
+from .llm_gateway import llm_gateway, is_json_response
+from .llm_scheduler import Priority
+from .token_budget import count_tokens, split_into_chunks
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
 
 TemplateType = Literal["KYC_ANALYSIS", "RISK_SURVEILLANCE"]
 
+# Force gpt-4o to avoid env var conflicts causing 400 error
+MODEL = "gpt-4o"
+TEMPERATURE = 0.3
+SYSTEM_PROMPT = "You are an expert compliance analyst. Always respond with valid JSON only."
+
+# Free-text field of each template that is chunked when it exceeds LLM_INPUT_TOKEN_BUDGET
+CHUNKED_FIELDS = {
+    "KYC_ANALYSIS": "kyc_notes",
+    "RISK_SURVEILLANCE": "activity_log"
+}
+SEVERITY_RANK = {"Low": 0, "Medium": 1, "High": 2, "Critical": 3}
+KYC_FINDING_SECTIONS = [
+    ("pep_indicators", "PEP Indicators"),
+    ("sanctions_indicators", "Sanctions Indicators"),
+    ("risk_factors", "Risk Factors"),
+    ("mitigating_factors", "Mitigating Factors"),
+    ("key_facts", "Key Facts")
+]
+
 
 class AIAnalysisService:
     """Unified AI analysis service with template-based prompts"""
@@ -88,61 +109,292 @@ Please provide your analysis in the following JSON format:
 
 Common risk tags include: transaction_pattern_risk, pep_association, high_risk_jurisdiction, structuring, unusual_activity, sanctions_exposure, adverse_media
 
+Respond ONLY with the JSON object, no additional text."""
+
+    @staticmethod
+    def _get_kyc_chunk_prompt(context: Dict[str, Any], chunk: str, index: int, total: int) -> str:
+        """Generate the per-chunk extraction prompt for oversized KYC notes"""
+        return f"""You are an expert KYC (Know Your Customer) compliance analyst. The KYC documentation for {context.get('full_name', 'N/A')} is too long to review at once; below is section {index} of {total}.
+
+**KYC Documentation & Notes (section {index} of {total}):**
+{chunk}
+
+Extract only what this section states. Quote names, roles, jurisdictions, amounts and dates exactly. Do not make an overall risk assessment.
+
+Please provide your findings in the following JSON format:
+{{
+  "pep_indicators": ["Public functions, political connections or family/associates of PEPs"],
+  "sanctions_indicators": ["Sanctions list matches, sanctioned jurisdictions or counterparties"],
+  "risk_factors": ["Other red flags: opaque structures, unexplained wealth, adverse media, high-risk jurisdictions"],
+  "mitigating_factors": ["Verified documents, transparent wealth sources, regulated counterparties"],
+  "key_facts": ["Other facts relevant to the client profile"]
+}}
+
+Use empty lists when nothing applies. Respond ONLY with the JSON object, no additional text."""
+
+    @staticmethod
+    def _get_risk_chunk_prompt(context: Dict[str, Any], chunk: str, index: int, total: int) -> str:
+        """Generate the per-chunk prompt for oversized activity logs"""
+        client_info = ""
+        if context.get('client_name'):
+            client_info = f"\n**Associated Client:** {context['client_name']}"
+
+        return f"""You are an expert in financial crime risk surveillance and transaction monitoring. The activity log below is segment {index} of {total} of a larger log; analyze this segment for potential money laundering, fraud, or other suspicious patterns.{client_info}
+
+**Activity Log / Transaction Data / Intelligence (segment {index} of {total}):**
+{chunk}
+
+**Analysis Requirements:**
+1. Identify any suspicious patterns or red flags in this segment
+2. Assess severity level (Low, Medium, High, or Critical) for this segment
+3. Tag relevant risk categories
+4. Provide actionable next steps for the compliance team
+5. List any entities (persons, companies, locations) involved, spelled exactly as in the log
+
+Please provide your analysis in the following JSON format:
+{{
+  "severity": "Low|Medium|High|Critical",
+  "summary": "Brief summary of the findings in this segment",
+  "risk_tags": ["tag1", "tag2", "tag3"],
+  "entities": ["entity1", "entity2"],
+  "next_steps": "Recommended actions for compliance team",
+  "priority": "Low|Medium|High|Critical"
+}}
+
+Common risk tags include: transaction_pattern_risk, pep_association, high_risk_jurisdiction, structuring, unusual_activity, sanctions_exposure, adverse_media
+
 Respond ONLY with the JSON object, no additional text."""
 
+    @classmethod
+    def _build_chunk_prompt(
+        cls,
+        context: Dict[str, Any],
+        template_type: TemplateType,
+        chunk: str,
+        index: int,
+        total: int
+    ) -> str:
+        """Select and render the per-chunk prompt for a template type"""
+        if template_type == "KYC_ANALYSIS":
+            return cls._get_kyc_chunk_prompt(context, chunk, index, total)
+        return cls._get_risk_chunk_prompt(context, chunk, index, total)
+
+    @staticmethod
+    def _split_input(context: Dict[str, Any], template_type: TemplateType) -> Optional[List[str]]:
+        """Chunks of the template's free-text field, or None if it fits the token budget"""
+        field = CHUNKED_FIELDS.get(template_type)
+        text = context.get(field) if field else None
+        if not text or count_tokens(text, MODEL) <= settings.LLM_INPUT_TOKEN_BUDGET:
+            return None
+        chunks = split_into_chunks(
+            text,
+            max_tokens=settings.LLM_CHUNK_TOKENS,
+            overlap_tokens=settings.LLM_CHUNK_OVERLAP_TOKENS,
+            model=MODEL
+        )
+        logger.info(f"{template_type} input {field} exceeds token budget, analysing {len(chunks)} chunks")
+        return chunks
+
+    @staticmethod
+    def _unique(values: List[Any]) -> List[str]:
+        """Case-insensitive de-duplication preserving first-seen order and spelling"""
+        seen = set()
+        unique = []
+        for value in values:
+            if not isinstance(value, str) or not value.strip():
+                continue
+            key = " ".join(value.lower().split())
+            if key not in seen:
+                seen.add(key)
+                unique.append(value.strip())
+        return unique
+
+    @classmethod
+    def _merge_risk_results(cls, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reduce per-segment surveillance results into the standard alert JSON"""
+        def rank(value: Any) -> int:
+            return SEVERITY_RANK.get(value, 0)
+
+        severity = max((r.get("severity") for r in results), key=rank, default="Low")
+        priority = max((r.get("priority") for r in results), key=rank, default=severity)
+
+        # Most frequent tags first (a pattern seen in many segments outranks a one-off)
+        tag_counts: Dict[str, int] = {}
+        for result in results:
+            for tag in cls._unique(result.get("risk_tags") or []):
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        risk_tags = sorted(tag_counts, key=lambda tag: -tag_counts[tag])
+
+        entities = cls._unique([entity for r in results for entity in (r.get("entities") or [])])
+
+        next_steps = []
+        for result in sorted(results, key=lambda r: -rank(r.get("severity"))):
+            steps = result.get("next_steps")
+            next_steps.extend(steps if isinstance(steps, list) else [steps])
+
+        # Lead with the segments that drove the overall severity
+        summaries = cls._unique([r.get("summary") for r in results if rank(r.get("severity")) == rank(severity)])
+        summaries += cls._unique([r.get("summary") for r in results if rank(r.get("severity")) != rank(severity)])
+
+        return {
+            "severity": severity if severity in SEVERITY_RANK else "Medium",
+            "summary": " ".join(summaries),
+            "risk_tags": risk_tags,
+            "entities": entities,
+            "next_steps": " ".join(cls._unique(next_steps)),
+            "priority": priority if priority in SEVERITY_RANK else "Medium"
+        }
+
+    @classmethod
+    def _build_kyc_digest(cls, results: List[Dict[str, Any]], total: int) -> str:
+        """Condense per-section KYC findings into notes for the final assessment prompt"""
+        lines = [f"[Findings extracted from {total} sections of KYC documentation]"]
+        for key, title in KYC_FINDING_SECTIONS:
+            findings = cls._unique([item for r in results for item in (r.get(key) or [])])
+            lines.append(f"\n{title}:")
+            if findings:
+                lines.extend(f"- {finding}" for finding in findings)
+            else:
+                lines.append("- None identified")
+        digest = "\n".join(lines)
+
+        if count_tokens(digest, MODEL) > settings.LLM_INPUT_TOKEN_BUDGET:
+            digest = split_into_chunks(digest, settings.LLM_INPUT_TOKEN_BUDGET, model=MODEL)[0] + "\n[... further findings truncated]"
+        return digest
+
+    @classmethod
+    def _build_prompt(cls, context: Dict[str, Any], template_type: TemplateType) -> str:
+        """Select and render the prompt for a template type"""
+        if template_type == "KYC_ANALYSIS":
+            return cls._get_kyc_prompt(context)
+        elif template_type == "RISK_SURVEILLANCE":
+            return cls._get_risk_surveillance_prompt(context)
+        else:
+            raise ValueError(f"Unknown template type: {template_type}")
+
+    @staticmethod
+    def _build_messages(prompt: str) -> list:
+        """Wrap a rendered prompt with the shared system message"""
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
+    @staticmethod
+    def _attach_client(result: Dict[str, Any], client_id: Optional[int]) -> Dict[str, Any]:
+        """Attach the client ID to a parsed result if provided"""
+        if client_id:
+            result["client_id"] = client_id
+        return result
+
+    @classmethod
+    async def _complete(
+        cls,
+        prompt: str,
+        template_type: str,
+        timeout: Optional[float],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        """Run one JSON-mode completion through the shared async gateway"""
+        content = await llm_gateway.complete(
+            messages=cls._build_messages(prompt),
+            model=MODEL,
+            temperature=TEMPERATURE,
+            response_format={"type": "json_object"},
+            timeout=timeout,
+            template_type=template_type,
+            cache_validator=is_json_response,
+            priority=priority
+        )
+        return json.loads(content)
+
+    @classmethod
+    def _complete_sync(cls, prompt: str, template_type: str, timeout: Optional[float]) -> Dict[str, Any]:
+        """Run one JSON-mode completion through the blocking gateway path"""
+        content = llm_gateway.complete_sync(
+            messages=cls._build_messages(prompt),
+            model=MODEL,
+            temperature=TEMPERATURE,
+            response_format={"type": "json_object"},
+            timeout=timeout,
+            template_type=template_type,
+            cache_validator=is_json_response
+        )
+        return json.loads(content)
+
+    @classmethod
+    async def _analyze_chunked(
+        cls,
+        context: Dict[str, Any],
+        template_type: TemplateType,
+        chunks: List[str],
+        timeout: Optional[float],
+        priority: Priority
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce analysis of an oversized input
+
+        Chunk extractions run concurrently, so latency follows the slowest chunk
+        rather than the total input length. Risk results are merged locally; KYC
+        findings are condensed into a digest for one final assessment call.
+        """
+        semaphore = asyncio.Semaphore(settings.LLM_CHUNK_CONCURRENCY)
+
+        async def analyze_chunk(index: int, chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                prompt = cls._build_chunk_prompt(context, template_type, chunk, index, len(chunks))
+                return await cls._complete(prompt, f"{template_type}_CHUNK", timeout, priority)
+
+        # Any failed chunk fails the analysis: a partial review could miss the red flag
+        results = await asyncio.gather(*(analyze_chunk(i, chunk) for i, chunk in enumerate(chunks, start=1)))
+
+        if template_type == "RISK_SURVEILLANCE":
+            return cls._merge_risk_results(results)
+
+        digest_context = {**context, "kyc_notes": cls._build_kyc_digest(results, len(chunks))}
+        return await cls._complete(cls._build_prompt(digest_context, template_type), template_type, timeout, priority)
+
     @classmethod
     async def analyze(
         cls,
         context: Dict[str, Any],
         template_type: TemplateType,
-        client_id: Optional[int] = None
+        client_id: Optional[int] = None,
+        timeout: Optional[float] = None,
+        priority: Priority = "interactive"
     ) -> Dict[str, Any]:
         """
         Unified analysis method that handles both KYC and Risk Surveillance
         
+        Inputs whose free-text field exceeds LLM_INPUT_TOKEN_BUDGET are split into
+        chunks and analysed with map-reduce; the result has the same shape.
+        
         Args:
             context: Dictionary containing all relevant data for analysis
             template_type: Type of analysis to perform
             client_id: Optional client ID for linking results
+            timeout: Optional per-call timeout in seconds (defaults to LLM_TIMEOUT_SECONDS)
+            priority: Scheduler lane - "interactive" for user-facing flows, "bulk" for surveillance
             
         Returns:
             Dictionary containing analysis results specific to template type
         """
         try:
-            # Select appropriate prompt based on template
-            if template_type == "KYC_ANALYSIS":
-                prompt = cls._get_kyc_prompt(context)
-            elif template_type == "RISK_SURVEILLANCE":
-                prompt = cls._get_risk_surveillance_prompt(context)
-            else:
-                raise ValueError(f"Unknown template type: {template_type}")
-            
-            # Call OpenAI API
-            # Force gpt-4o to avoid env var conflicts causing 400 error
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert compliance analyst. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-            
-            # Parse response
-            result = json.loads(response.choices[0].message.content)
+            prompt = cls._build_prompt(context, template_type)
+            chunks = cls._split_input(context, template_type)
             
-            # Add client_id to result if provided
-            if client_id:
-                result["client_id"] = client_id
+            if chunks is None:
+                result = await cls._complete(prompt, template_type, timeout, priority)
+            else:
+                result = await cls._analyze_chunked(context, template_type, chunks, timeout, priority)
             
-            return result
+            return cls._attach_client(result, client_id)
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse AI response as JSON: {e}")
@@ -154,46 +406,36 @@ Respond ONLY with the JSON object, no additional text."""
         cls,
         context: Dict[str, Any],
         template_type: TemplateType,
-        client_id: Optional[int] = None
+        client_id: Optional[int] = None,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Synchronous version of analyze method for non-async contexts
+        
+        Oversized inputs are chunked as in analyze(), with chunks processed sequentially.
         """
         try:
-            # Select appropriate prompt based on template
-            if template_type == "KYC_ANALYSIS":
-                prompt = cls._get_kyc_prompt(context)
-            elif template_type == "RISK_SURVEILLANCE":
-                prompt = cls._get_risk_surveillance_prompt(context)
-            else:
-                raise ValueError(f"Unknown template type: {template_type}")
+            prompt = cls._build_prompt(context, template_type)
+            chunks = cls._split_input(context, template_type)
             
-            # Call OpenAI API
-            # Force gpt-4o to avoid env var conflicts causing 400 error
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert compliance analyst. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+            if chunks is None:
+                return cls._attach_client(cls._complete_sync(prompt, template_type, timeout), client_id)
             
-            # Parse response
-            result = json.loads(response.choices[0].message.content)
-            
-            # Add client_id to result if provided
-            if client_id:
-                result["client_id"] = client_id
+            results = [
+                cls._complete_sync(
+                    cls._build_chunk_prompt(context, template_type, chunk, index, len(chunks)),
+                    f"{template_type}_CHUNK",
+                    timeout
+                )
+                for index, chunk in enumerate(chunks, start=1)
+            ]
+            if template_type == "RISK_SURVEILLANCE":
+                result = cls._merge_risk_results(results)
+            else:
+                digest_context = {**context, "kyc_notes": cls._build_kyc_digest(results, len(chunks))}
+                result = cls._complete_sync(cls._build_prompt(digest_context, template_type), template_type, timeout)
             
-            return result
+            return cls._attach_client(result, client_id)
             
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse AI response as JSON: {e}")
@@ -0,0 +1,220 @@
+"""
+Client Deduplication
+Finds existing clients whose names are likely the same person as a given name,
+across scripts and transliterations ("Vladimir Putin", "Владимир Путин",
+"Wladimir Putin").
+
+The blocking keys of every client's name (see name_keys.py) are kept in the
+client_name_keys table, indexed by key. A lookup reads only the clients sharing
+a key with the name, ranked by the number of shared keys in SQL, and scores the
+best of them like watch-list candidates; the client table is never scanned.
+Keys of new clients are written in the background after the commit that created
+them, and clients without keys (created before this table existed, or imported
+directly) are backfilled at startup.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Iterable, Set
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.client import Client
+from ..models.client_name_key import ClientNameKey
+from .name_keys import blocking_keys
+from .name_screening import normalize_name, score_names, MAX_KEY_BLOCK
+
+logger = logging.getLogger(__name__)
+
+# Clients read and keyed per batch by backfill()
+BACKFILL_BATCH_SIZE = 5000
+
+# Stored keys are truncated to the column size
+MAX_KEY_LENGTH = 255
+
+
+def _key_rows(client_id: int, full_name: str) -> List[Dict[str, Any]]:
+    keys = dict.fromkeys(key[:MAX_KEY_LENGTH] for key in blocking_keys(normalize_name(full_name)))
+    return [{"client_id": client_id, "key": key} for key in keys]
+
+
+class ClientDeduplicator:
+    """Blocking-key table maintenance and duplicate lookups for client names"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="client-dedup")
+        self._pending: Set[int] = set()
+        self.keyed_clients = 0
+        self.lookups = 0
+
+    def schedule_index(self, client_ids: Iterable[Optional[int]]):
+        """
+        Queue (re)keying of clients after a committed write
+
+        Non-blocking: clients queued while a batch is being keyed are coalesced
+        into the next one.
+        """
+        client_ids = {client_id for client_id in client_ids if client_id is not None}
+        if not client_ids:
+            return
+        with self._lock:
+            if not self._pending:
+                self._writer.submit(self._drain)
+            self._pending |= client_ids
+
+    def _drain(self):
+        with self._lock:
+            client_ids, self._pending = self._pending, set()
+        try:
+            self.index_clients(client_ids)
+        except Exception as e:
+            logger.warning(f"Client name keys update failed ({len(client_ids)} clients): {e}")
+
+    def index_clients(self, client_ids: Iterable[int]) -> int:
+        """
+        Replace the keys of clients with those of their current names
+
+        Returns:
+            Number of keys written
+        """
+        client_ids = sorted(set(client_ids))
+        if not client_ids:
+            return 0
+        db = SessionLocal()
+        try:
+            rows = db.query(Client.id, Client.full_name).filter(Client.id.in_(client_ids)).all()
+            db.query(ClientNameKey).filter(ClientNameKey.client_id.in_(client_ids)).delete(synchronize_session=False)
+            keys = [key for row in rows for key in _key_rows(row.id, row.full_name)]
+            if keys:
+                db.execute(insert(ClientNameKey), keys)
+            db.commit()
+            self.keyed_clients += len(rows)
+            return len(keys)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def backfill(self) -> int:
+        """
+        Key every client that has no keys yet, in batches
+
+        Returns:
+            Number of clients keyed
+        """
+        keyed = 0
+        db = SessionLocal()
+        try:
+            while True:
+                rows = (
+                    db.query(Client.id, Client.full_name)
+                    .filter(~db.query(ClientNameKey.id).filter(ClientNameKey.client_id == Client.id).exists())
+                    .order_by(Client.id)
+                    .limit(BACKFILL_BATCH_SIZE)
+                    .all()
+                )
+                keys = [key for row in rows for key in _key_rows(row.id, row.full_name)]
+                if keys:
+                    db.execute(insert(ClientNameKey), keys)
+                db.commit()
+                keyed += len(rows)
+                # A client whose name has no keys (no letters or digits) would be selected again
+                if len(rows) < BACKFILL_BATCH_SIZE or not keys:
+                    break
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Client name keys backfill failed after {keyed} clients: {e}")
+        finally:
+            db.close()
+        if keyed:
+            logger.info(f"Backfilled name keys of {keyed} clients")
+        self.keyed_clients += keyed
+        return keyed
+
+    def find_duplicates(
+        self,
+        db: Session,
+        name: str,
+        limit: int = 10,
+        threshold: Optional[float] = None,
+        exclude_client_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Existing clients whose names likely denote the same person as ``name``
+
+        Returns:
+            Up to ``limit`` clients scoring at least ``threshold``, best first
+        """
+        threshold = settings.CLIENT_DEDUP_MATCH_THRESHOLD if threshold is None else threshold
+        self.lookups += 1
+        keys = [key[:MAX_KEY_LENGTH] for key in blocking_keys(normalize_name(name))]
+        if not keys:
+            return []
+        # Keys shared by too many clients (common surnames' codes, initials) do not narrow anything down
+        block_sizes = (
+            db.query(ClientNameKey.key, func.count(ClientNameKey.id))
+            .filter(ClientNameKey.key.in_(keys))
+            .group_by(ClientNameKey.key)
+            .all()
+        )
+        usable = [key for key, size in block_sizes if size <= MAX_KEY_BLOCK]
+        if not usable:
+            return []
+        shared = func.count(ClientNameKey.id)
+        query = db.query(ClientNameKey.client_id).filter(ClientNameKey.key.in_(usable))
+        if exclude_client_id is not None:
+            query = query.filter(ClientNameKey.client_id != exclude_client_id)
+        candidate_ids = [
+            row.client_id for row in
+            query.group_by(ClientNameKey.client_id).order_by(shared.desc()).limit(settings.CLIENT_DEDUP_MAX_CANDIDATES)
+        ]
+        if not candidate_ids:
+            return []
+        clients = (
+            db.query(Client.id, Client.full_name, Client.date_of_birth, Client.nationality, Client.status)
+            .filter(Client.id.in_(candidate_ids))
+            .all()
+        )
+        scores = score_names(name, [client.full_name for client in clients])
+        ranked = sorted(
+            (
+                (float(score), client) for score, client in zip(scores.tolist(), clients) if score >= threshold
+            ),
+            key=lambda item: -item[0]
+        )[:limit]
+        return [
+            {
+                "client_id": client.id,
+                "full_name": client.full_name,
+                "date_of_birth": client.date_of_birth.isoformat() if client.date_of_birth else None,
+                "nationality": client.nationality,
+                "status": client.status,
+                "score": round(score, 3)
+            }
+            for score, client in ranked
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            keys = db.query(func.count(ClientNameKey.id)).scalar()
+            keyed = db.query(func.count(func.distinct(ClientNameKey.client_id))).scalar()
+        finally:
+            db.close()
+        return {
+            "keys": keys,
+            "clients_with_keys": keyed,
+            "clients_keyed": self.keyed_clients,
+            "lookups": self.lookups,
+            "match_threshold": settings.CLIENT_DEDUP_MATCH_THRESHOLD
+        }
+
+
+# Global instance
+client_deduplicator = ClientDeduplicator()
@@ -0,0 +1,366 @@
+"""
+Compliance Rules Engine
+Deterministic fast path of the Compliance Agent: clear-cut cases are decided by
+rules, without a model call, and only ambiguous ones reach the LLM.
+
+Rules are data (DEFAULT_RULES, or the JSON file at COMPLIANCE_RULES_PATH): a name,
+a list of conditions over the case facts, all of which must hold, and the
+compliance_decision to emit. They are compiled once into predicates (one
+closure per condition, operators resolved up front) and evaluated in order; the
+first matching rule decides. Evaluating a case takes a few microseconds.
+
+Facts (see case_facts):
+- inputs_complete: no upstream step fell back to placeholder data
+- screening_performed: both PEP and sanctions results come from loaded watch-lists
+  (a list_version), not from demo data; rules that decide without the model require it
+- risk_score: the Risk Assessor's level ("Low", "Medium", "High")
+- red_flags: number of red flags found by the KYC Analyst
+- is_pep, is_sanctioned: the screening tools' flags
+- pep_best_score, sanctions_best_score: best watch-list match score (0 without matches)
+- sanctions_jurisdiction_match: the best sanctions match lists one of the client's jurisdictions
+- kyc_check, pep_check, sanctions_check: decision_breakdown statuses derived from
+  red_flags ("Pass" without red flags, else "Warning"), is_pep and is_sanctioned
+  ("Fail" on a match, else "Pass")
+
+Condition operators: eq, ne, lt, le, gt, ge, in, not_in. A condition on a missing
+fact never holds, so a rule only fires on cases it fully understands. The
+rationale and the decision_breakdown statuses are templates over the facts
+("{sanctions_best_score:.2f}", "{pep_check}"), so the audit record states what was
+actually found; templates referencing anything else are rejected when loaded.
+"""
+
+import copy
+import json
+import logging
+import operator
+import string
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "in": lambda fact, value: fact in value,
+    "not_in": lambda fact, value: fact not in value
+}
+
+FACTS = (
+    "inputs_complete",
+    "screening_performed",
+    "risk_score",
+    "red_flags",
+    "is_pep",
+    "is_sanctioned",
+    "pep_best_score",
+    "sanctions_best_score",
+    "sanctions_jurisdiction_match",
+    "kyc_check",
+    "pep_check",
+    "sanctions_check"
+)
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {
+        "name": "confirmed_sanctions_hit",
+        "description": "Near-exact sanctions match in one of the client's jurisdictions",
+        "conditions": [
+            {"fact": "inputs_complete", "op": "eq", "value": True},
+            {"fact": "screening_performed", "op": "eq", "value": True},
+            {"fact": "is_sanctioned", "op": "eq", "value": True},
+            {"fact": "sanctions_best_score", "op": "ge", "value": 0.97},
+            {"fact": "sanctions_jurisdiction_match", "op": "eq", "value": True}
+        ],
+        "decision": {
+            "compliance_status": "Rejected",
+            "confidence_score": 0.99,
+            "risk_score": 100,
+            "approval_tier": "Level 3 (Executive)",
+            "decision_breakdown": {
+                "kyc_data": "{kyc_check}",
+                "pep_check": "{pep_check}",
+                "sanctions_check": "{sanctions_check}"
+            },
+            "recommended_actions": [
+                "Reject account opening",
+                "Freeze any pending transactions",
+                "Escalate to MLRO and assess regulatory reporting obligations"
+            ],
+            "rationale": (
+                "Confirmed sanctions hit: the client name matches a sanctions list entry "
+                "(score {sanctions_best_score:.2f}) that lists one of the client's jurisdictions. "
+                "Business relationships with sanctioned persons are prohibited."
+            )
+        }
+    },
+    {
+        "name": "clean_low_risk",
+        "description": "Low risk, no PEP or sanctions match and no red flags",
+        "conditions": [
+            {"fact": "inputs_complete", "op": "eq", "value": True},
+            {"fact": "screening_performed", "op": "eq", "value": True},
+            {"fact": "risk_score", "op": "eq", "value": "Low"},
+            {"fact": "is_pep", "op": "eq", "value": False},
+            {"fact": "is_sanctioned", "op": "eq", "value": False},
+            {"fact": "red_flags", "op": "eq", "value": 0}
+        ],
+        "decision": {
+            "compliance_status": "Approved",
+            "confidence_score": 0.95,
+            "risk_score": 15,
+            "approval_tier": "Level 1 (Automated)",
+            "decision_breakdown": {
+                "kyc_data": "{kyc_check}",
+                "pep_check": "{pep_check}",
+                "sanctions_check": "{sanctions_check}"
+            },
+            "recommended_actions": [
+                "Approve account opening",
+                "Schedule standard annual review",
+                "Enable standard transaction limits"
+            ],
+            "rationale": (
+                "Low-risk profile with no red flags. No PEP or sanctions matches were found. "
+                "The case meets the criteria for automated Level 1 approval."
+            )
+        }
+    }
+]
+
+
+@dataclass
+class CompiledRule:
+    name: str
+    description: str
+    predicates: List[Callable[[Dict[str, Any]], bool]]
+    decision: Dict[str, Any]
+
+    def matches(self, facts: Dict[str, Any]) -> bool:
+        return all(predicate(facts) for predicate in self.predicates)
+
+
+def _predicate(condition: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+    fact, value = condition["fact"], condition.get("value")
+    compare = OPERATORS.get(condition["op"])
+    if compare is None:
+        raise ValueError(f"Unknown operator {condition['op']!r} (expected one of {', '.join(OPERATORS)})")
+    if condition["op"] in ("in", "not_in"):
+        value = frozenset(value)
+
+    def predicate(facts: Dict[str, Any]) -> bool:
+        if fact not in facts:
+            return False
+        try:
+            return bool(compare(facts[fact], value))
+        except TypeError:
+            return False
+
+    return predicate
+
+
+def _templates(decision: Dict[str, Any]) -> Dict[str, Any]:
+    """Templated fields of a decision: the rationale and the decision_breakdown statuses"""
+    templates = {"rationale": decision.get("rationale", "")}
+    breakdown = decision.get("decision_breakdown") or {}
+    if not isinstance(breakdown, dict):
+        raise ValueError("decision.decision_breakdown is not an object")
+    for check, status in breakdown.items():
+        templates[f"decision_breakdown.{check}"] = status
+    return templates
+
+
+def _check_templates(rule_name: Any, decision: Dict[str, Any]):
+    """Reject decision templates that could not be rendered from the case facts"""
+    try:
+        templates = _templates(decision)
+    except ValueError as e:
+        raise ValueError(f"Rule {rule_name!r}: {e}")
+    for path, template in templates.items():
+        if not isinstance(template, str):
+            raise ValueError(f"Rule {rule_name!r} has a non-text decision.{path}")
+        try:
+            fields = [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+        except ValueError as e:
+            raise ValueError(f"Rule {rule_name!r} has a malformed decision.{path} ({e}); escape literal braces as {{{{ }}}}")
+        for field in fields:
+            fact = field.split(".")[0].split("[")[0]
+            if fact not in FACTS:
+                raise ValueError(
+                    f"Rule {rule_name!r} decision.{path} references unknown fact {{{field}}} "
+                    f"(expected one of {', '.join(FACTS)})"
+                )
+
+
+def _render(decision: Dict[str, Any], facts: Dict[str, Any]) -> Dict[str, Any]:
+    """A rule's decision with its templates filled in from the case facts"""
+    rendered = copy.deepcopy(decision)
+    rendered["rationale"] = rendered.get("rationale", "").format_map(facts)
+    breakdown = rendered.get("decision_breakdown")
+    if breakdown:
+        rendered["decision_breakdown"] = {check: status.format_map(facts) for check, status in breakdown.items()}
+    return rendered
+
+
+def compile_rules(rules: List[Dict[str, Any]]) -> List[CompiledRule]:
+    """Validate rule definitions and compile their conditions into predicates"""
+    compiled = []
+    for rule in rules:
+        if not rule.get("conditions"):
+            raise ValueError(f"Rule {rule.get('name')!r} has no conditions")
+        if rule.get("decision", {}).get("compliance_status") not in ("Approved", "Review Required", "Rejected"):
+            raise ValueError(f"Rule {rule.get('name')!r} has no valid decision.compliance_status")
+        _check_templates(rule.get("name"), rule["decision"])
+        compiled.append(CompiledRule(
+            name=rule["name"],
+            description=rule.get("description", ""),
+            predicates=[_predicate(condition) for condition in rule["conditions"]],
+            decision=rule["decision"]
+        ))
+    return compiled
+
+
+def _screened(result: Dict[str, Any]) -> bool:
+    """Whether a screening tool result comes from loaded watch-lists (demo results have no list_version)"""
+    return bool(result.get("list_version")) and not result.get("demo")
+
+
+def case_facts(
+    risk_result: Dict[str, Any],
+    pep_result: Dict[str, Any],
+    sanctions_result: Dict[str, Any],
+    inputs_complete: bool
+) -> Dict[str, Any]:
+    """Facts of a case from the Compliance Agent's inputs (missing inputs are left out)"""
+    facts: Dict[str, Any] = {
+        "inputs_complete": inputs_complete,
+        "screening_performed": _screened(pep_result) and _screened(sanctions_result)
+    }
+    risk_score = (risk_result.get("risk_assessment") or {}).get("risk_score")
+    if isinstance(risk_score, str):
+        facts["risk_score"] = risk_score.strip().title()
+    red_flags = (risk_result.get("extracted_data") or {}).get("red_flags")
+    if isinstance(red_flags, list):
+        facts["red_flags"] = len(red_flags)
+        facts["kyc_check"] = "Warning" if red_flags else "Pass"
+    if isinstance(pep_result.get("is_pep"), bool):
+        facts["is_pep"] = pep_result["is_pep"]
+        facts["pep_check"] = "Fail" if pep_result["is_pep"] else "Pass"
+    if isinstance(sanctions_result.get("is_sanctioned"), bool):
+        facts["is_sanctioned"] = sanctions_result["is_sanctioned"]
+        facts["sanctions_check"] = "Fail" if sanctions_result["is_sanctioned"] else "Pass"
+    pep_matches = pep_result.get("matches") or []
+    sanctions_matches = sanctions_result.get("matches") or []
+    facts["pep_best_score"] = max((match["score"] for match in pep_matches), default=0.0)
+    facts["sanctions_best_score"] = max((match["score"] for match in sanctions_matches), default=0.0)
+    best = max(sanctions_matches, key=lambda match: match["score"], default=None)
+    facts["sanctions_jurisdiction_match"] = bool(best and best.get("jurisdiction_match"))
+    return facts
+
+
+class ComplianceRulesEngine:
+    """Ordered, compiled compliance rules with fast-path counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rules: List[CompiledRule] = []
+        self.source = "default"
+        self.evaluations = 0
+        self.fast_path = 0
+        self.rule_hits: Dict[str, int] = {}
+        self._evaluation_seconds = 0.0
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.COMPLIANCE_RULES_ENABLED
+
+    def load(self, rules: Optional[List[Dict[str, Any]]] = None, source: Optional[str] = None) -> int:
+        """
+        Compile rules (default: COMPLIANCE_RULES_PATH, or DEFAULT_RULES without it)
+
+        Returns:
+            Number of rules loaded
+        """
+        if rules is None:
+            if settings.COMPLIANCE_RULES_PATH:
+                with open(settings.COMPLIANCE_RULES_PATH, encoding="utf-8") as f:
+                    rules = json.load(f)
+                source = settings.COMPLIANCE_RULES_PATH
+            else:
+                rules, source = DEFAULT_RULES, "default"
+        compiled = compile_rules(rules)
+        with self._lock:
+            self.rules, self.source = compiled, source or "custom"
+            self.rule_hits = {rule.name: 0 for rule in compiled}
+            self._loaded = True
+        logger.info(f"Loaded {len(compiled)} compliance rules from {self.source}")
+        return len(compiled)
+
+    def evaluate(self, facts: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Decision of the first rule matching the facts
+
+        Returns:
+            {"rule": name, "decision": compliance_decision} for a decisive case,
+            None when the case has to go to the model
+        """
+        if not self._loaded:
+            try:
+                self.load()
+            except Exception as e:
+                # Broken rules must not block decisions: every case goes to the model
+                logger.error(f"Compliance rules could not be loaded, using none: {e}")
+                with self._lock:
+                    self.rules, self.source, self._loaded = [], "none (load failed)", True
+        start = time.perf_counter()
+        rule = next((rule for rule in self.rules if rule.matches(facts)), None)
+        elapsed = time.perf_counter() - start
+        decision = None
+        if rule is not None:
+            try:
+                decision = _render(rule.decision, facts)
+            except (KeyError, IndexError, AttributeError, TypeError, ValueError) as e:
+                # e.g. a fact a template uses is missing from this case: let the model decide
+                logger.error(f"Compliance rule {rule.name!r} decision could not be rendered, using the model: {e!r}")
+                rule = None
+        with self._lock:
+            self.evaluations += 1
+            self._evaluation_seconds += elapsed
+            if rule is not None:
+                self.fast_path += 1
+                self.rule_hits[rule.name] = self.rule_hits.get(rule.name, 0) + 1
+        if rule is None:
+            return None
+        decision["pep_flag"] = bool(facts.get("is_pep"))
+        decision["sanctions_flag"] = bool(facts.get("is_sanctioned"))
+        return {"rule": rule.name, "decision": decision}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            evaluations, fast_path = self.evaluations, self.fast_path
+            rule_hits = dict(self.rule_hits)
+            seconds = self._evaluation_seconds
+        return {
+            "enabled": self.enabled,
+            "source": self.source,
+            "rules": [{"name": rule.name, "description": rule.description} for rule in self.rules],
+            "evaluations": evaluations,
+            "fast_path": fast_path,
+            "llm": evaluations - fast_path,
+            "fast_path_ratio": round(fast_path / evaluations, 4) if evaluations else 0.0,
+            "rule_hits": rule_hits,
+            "mean_evaluation_us": round(seconds / evaluations * 1e6, 2) if evaluations else None
+        }
+
+
+# Global instance
+compliance_rules = ComplianceRulesEngine()
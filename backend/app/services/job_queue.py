@@ -0,0 +1,545 @@
+"""
+Background Job Queue
+Runs long agent workflows outside the HTTP request. The database is the queue, so
+jobs survive restarts and can be executed by in-process asyncio workers (started
+with the API) or by separate worker processes (python -m app.worker).
+
+A worker claims a job with a lease (visibility timeout) that it renews while the
+job runs. If the worker dies, the lease expires and another worker picks the job
+up. Failed attempts are retried with exponential backoff up to max_attempts.
+Retries resume the job's workflow run, so completed agent steps are reused.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from sqlalchemy import and_, or_, func
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.workflow_job import WorkflowJob
+from .agent_orchestrator import agent_orchestrator
+from .watchlist_rescreen import watchlist_rescreener
+from .workflow_checkpoints import to_json
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "Queued"
+JOB_RUNNING = "Running"
+JOB_SUCCEEDED = "Succeeded"
+JOB_FAILED = "Failed"
+TERMINAL_STATUSES = {JOB_SUCCEEDED, JOB_FAILED}
+
+# Finished jobs sampled for latency percentiles in stats()
+STATS_SAMPLE_SIZE = 500
+
+# Candidates tried per claim when other workers win the race for them
+CLAIM_ATTEMPTS = 5
+
+ProgressReporter = Callable[[Dict[str, Any]], Awaitable[None]]
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Dict[str, Any]]]
+
+
+class RetryableJobError(Exception):
+    """Raised by a handler whose outcome was degraded and is worth retrying while attempts remain"""
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+
+    def percentile(p: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3) if ordered else None,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "max": round(ordered[-1], 3) if ordered else None
+    }
+
+
+class JobQueue:
+    """
+    Database-backed job queue
+
+    All methods are blocking; async callers run them via asyncio.to_thread.
+    Claims are compare-and-set updates, so any number of workers (threads or
+    processes) can share the queue without double-claiming a job.
+    """
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        max_attempts: Optional[int] = None,
+        run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Add a job and return its serialized state"""
+        db = SessionLocal()
+        try:
+            job = WorkflowJob(
+                job_id=uuid.uuid4().hex,
+                job_type=job_type,
+                payload=payload,
+                run_id=run_id,
+                status=JOB_QUEUED,
+                attempts=0,
+                max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+                available_at=datetime.utcnow()
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return self._serialize(job)
+        finally:
+            db.close()
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next visible job to a worker
+
+        Visible jobs are Queued jobs past their backoff and Running jobs whose lease
+        expired. An expired job with no attempts left is marked Failed instead.
+
+        Returns:
+            The claimed job (attempts already incremented), or None if the queue is empty
+        """
+        db = SessionLocal()
+        try:
+            for _ in range(CLAIM_ATTEMPTS):
+                now = datetime.utcnow()
+                visible = or_(
+                    and_(WorkflowJob.status == JOB_QUEUED, WorkflowJob.available_at <= now),
+                    and_(WorkflowJob.status == JOB_RUNNING, WorkflowJob.locked_until < now)
+                )
+                candidate = (
+                    db.query(WorkflowJob.id, WorkflowJob.status, WorkflowJob.attempts, WorkflowJob.max_attempts)
+                    .filter(visible)
+                    .order_by(WorkflowJob.available_at, WorkflowJob.id)
+                    .first()
+                )
+                if candidate is None:
+                    return None
+
+                expired = candidate.status == JOB_RUNNING
+                if expired and candidate.attempts >= candidate.max_attempts:
+                    db.query(WorkflowJob).filter(WorkflowJob.id == candidate.id, visible).update({
+                        "status": JOB_FAILED,
+                        "error": f"Visibility timeout expired on attempt {candidate.attempts} of {candidate.max_attempts}",
+                        "locked_by": None,
+                        "locked_until": None,
+                        "finished_at": now
+                    }, synchronize_session=False)
+                    db.commit()
+                    continue
+
+                claimed = db.query(WorkflowJob).filter(WorkflowJob.id == candidate.id, visible).update({
+                    "status": JOB_RUNNING,
+                    "attempts": WorkflowJob.attempts + 1,
+                    "locked_by": worker_id,
+                    "locked_until": now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS),
+                    "started_at": func.coalesce(WorkflowJob.started_at, now)
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    job = db.query(WorkflowJob).filter(WorkflowJob.id == candidate.id).first()
+                    if expired:
+                        logger.warning(f"Job {job.job_id} lease expired; reclaimed by {worker_id} (attempt {job.attempts})")
+                    return {**self._serialize(job), "reclaimed": expired}
+            return None
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _update_leased(self, job_id: str, worker_id: str, values: Dict[str, Any]) -> bool:
+        """Apply an update only while the worker still holds the job's lease"""
+        db = SessionLocal()
+        try:
+            updated = db.query(WorkflowJob).filter(
+                WorkflowJob.job_id == job_id,
+                WorkflowJob.status == JOB_RUNNING,
+                WorkflowJob.locked_by == worker_id
+            ).update(values, synchronize_session=False)
+            db.commit()
+            return bool(updated)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; False if the worker lost it (expired and reclaimed)"""
+        return self._update_leased(job_id, worker_id, {
+            "locked_until": datetime.utcnow() + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+        })
+
+    def report_progress(self, job_id: str, worker_id: str, progress: Dict[str, Any]) -> bool:
+        """Store the latest workflow event for pollers and subscribers"""
+        return self._update_leased(job_id, worker_id, {"progress": progress})
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Mark a job Succeeded with its result"""
+        return self._update_leased(job_id, worker_id, {
+            "status": JOB_SUCCEEDED,
+            "result": to_json(result),
+            "error": None,
+            "locked_by": None,
+            "locked_until": None,
+            "finished_at": datetime.utcnow()
+        })
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> Optional[str]:
+        """
+        Record a failed attempt: requeue with exponential backoff while attempts
+        remain, otherwise mark the job Failed
+
+        Returns:
+            The job's new status, or None if the worker no longer held the lease
+        """
+        db = SessionLocal()
+        try:
+            job = db.query(WorkflowJob).filter(
+                WorkflowJob.job_id == job_id,
+                WorkflowJob.status == JOB_RUNNING,
+                WorkflowJob.locked_by == worker_id
+            ).first()
+            if job is None:
+                return None
+            now = datetime.utcnow()
+            job.error = error
+            job.locked_by = None
+            job.locked_until = None
+            if job.attempts < job.max_attempts:
+                job.status = JOB_QUEUED
+                job.available_at = now + timedelta(
+                    seconds=settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1))
+                )
+            else:
+                job.status = JOB_FAILED
+                job.finished_at = now
+            db.commit()
+            return job.status
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Return a job to the queue without counting the attempt (worker shutting down)"""
+        return self._update_leased(job_id, worker_id, {
+            "status": JOB_QUEUED,
+            "attempts": WorkflowJob.attempts - 1,
+            "locked_by": None,
+            "locked_until": None,
+            "available_at": datetime.utcnow()
+        })
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Serialized job state, or None if unknown"""
+        db = SessionLocal()
+        try:
+            job = db.query(WorkflowJob).filter(WorkflowJob.job_id == job_id).first()
+            return self._serialize(job) if job is not None else None
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, age of the oldest waiting job, retries and latency of recent jobs"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            by_status = dict(
+                db.query(WorkflowJob.status, func.count(WorkflowJob.id)).group_by(WorkflowJob.status).all()
+            )
+            oldest_queued = (
+                db.query(func.min(WorkflowJob.created_at))
+                .filter(WorkflowJob.status == JOB_QUEUED)
+                .scalar()
+            )
+            expired_leases = (
+                db.query(func.count(WorkflowJob.id))
+                .filter(WorkflowJob.status == JOB_RUNNING, WorkflowJob.locked_until < now)
+                .scalar()
+            )
+            retried = (
+                db.query(func.count(WorkflowJob.id))
+                .filter(WorkflowJob.attempts > 1)
+                .scalar()
+            )
+            recent = (
+                db.query(WorkflowJob.status, WorkflowJob.created_at, WorkflowJob.started_at, WorkflowJob.finished_at)
+                .filter(WorkflowJob.finished_at.isnot(None))
+                .order_by(WorkflowJob.finished_at.desc())
+                .limit(STATS_SAMPLE_SIZE)
+                .all()
+            )
+        finally:
+            db.close()
+
+        succeeded = sum(1 for row in recent if row.status == JOB_SUCCEEDED)
+        return {
+            "jobs": {status: by_status.get(status, 0) for status in (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED)},
+            "queue_depth": by_status.get(JOB_QUEUED, 0),
+            "oldest_queued_seconds": round((now - oldest_queued).total_seconds(), 3) if oldest_queued else None,
+            "expired_leases": expired_leases,
+            "retried_jobs": retried,
+            "recent": {
+                "jobs": len(recent),
+                "success_rate": round(succeeded / len(recent), 4) if recent else None,
+                "queue_wait_seconds": _percentiles([
+                    (row.started_at - row.created_at).total_seconds() for row in recent if row.started_at
+                ]),
+                "run_seconds": _percentiles([
+                    (row.finished_at - row.started_at).total_seconds() for row in recent if row.started_at
+                ]),
+                "end_to_end_seconds": _percentiles([
+                    (row.finished_at - row.created_at).total_seconds() for row in recent
+                ])
+            }
+        }
+
+    @staticmethod
+    def _serialize(job: WorkflowJob) -> Dict[str, Any]:
+        return {
+            "job_id": job.job_id,
+            "job_type": job.job_type,
+            "run_id": job.run_id,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "payload": job.payload,
+            "progress": job.progress,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None
+        }
+
+
+class JobWorkerPool:
+    """
+    Asyncio workers executing queued jobs
+
+    Used in-process by the API (JOB_WORKER_CONCURRENCY workers) and by the
+    standalone worker process. Each worker polls the queue, renews its lease while
+    a job runs and releases the job back to the queue if stopped mid-run.
+    """
+
+    def __init__(self, queue: JobQueue):
+        self.queue = queue
+        self.handlers: Dict[str, JobHandler] = {}
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def register(self, job_type: str, handler: JobHandler):
+        """Register the coroutine executing jobs of a type"""
+        self.handlers[job_type] = handler
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self, concurrency: int):
+        """Start workers on the running event loop"""
+        for _ in range(concurrency):
+            worker_id = f"{self.worker_prefix}:{uuid.uuid4().hex[:8]}"
+            self._tasks.append(asyncio.create_task(self._work(worker_id), name=f"job-worker-{worker_id}"))
+        logger.info(f"Started {concurrency} job workers ({self.worker_prefix})")
+
+    async def stop(self):
+        """Stop all workers; jobs in progress are released back to the queue"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Stopped {len(tasks)} job workers")
+
+    async def wait(self):
+        """Block until every worker has exited"""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self._counters[name] += delta
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of the workers in this process"""
+        with self._lock:
+            return {
+                "workers": sum(1 for task in self._tasks if not task.done()),
+                "active_jobs": self._active,
+                **dict(self._counters)
+            }
+
+    async def _work(self, worker_id: str):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, worker_id)
+            except Exception as e:
+                logger.error(f"Job claim failed ({worker_id}): {e}")
+                job = None
+            if job is None:
+                # Jitter keeps idle workers from polling in lockstep
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS * random.uniform(0.5, 1.5))
+                continue
+            self._count("claimed")
+            if job.get("reclaimed"):
+                self._count("reclaimed")
+            await self._execute(job, worker_id)
+
+    async def _execute(self, job: Dict[str, Any], worker_id: str):
+        job_id = job["job_id"]
+        handler = self.handlers.get(job["job_type"])
+        if handler is None:
+            await asyncio.to_thread(self.queue.fail, job_id, worker_id, f"No handler for job type {job['job_type']}")
+            self._count("failed")
+            return
+
+        async def report(progress: Dict[str, Any]):
+            await asyncio.to_thread(self.queue.report_progress, job_id, worker_id, progress)
+
+        lease_lost = asyncio.Event()
+        run = asyncio.create_task(handler(job, report))
+        keeper = asyncio.create_task(self._keep_lease(job_id, worker_id, run, lease_lost))
+        with self._lock:
+            self._active += 1
+        try:
+            result = await run
+        except asyncio.CancelledError:
+            if lease_lost.is_set():
+                # Another worker owns the job now; drop this attempt
+                logger.warning(f"Job {job_id} lease lost by {worker_id}; abandoning attempt")
+                self._count("lease_lost")
+                return
+            await asyncio.to_thread(self.queue.release, job_id, worker_id)
+            self._count("released")
+            raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            status = await asyncio.to_thread(self.queue.fail, job_id, worker_id, error)
+            if status == JOB_QUEUED:
+                logger.warning(f"Job {job_id} attempt {job['attempts']} failed, retrying: {error}")
+                self._count("retried")
+            else:
+                logger.error(f"Job {job_id} failed after {job['attempts']} attempts: {error}")
+                self._count("failed")
+        else:
+            if await asyncio.to_thread(self.queue.complete, job_id, worker_id, result):
+                self._count("succeeded")
+            else:
+                self._count("lease_lost")
+        finally:
+            keeper.cancel()
+            with self._lock:
+                self._active -= 1
+
+    async def _keep_lease(self, job_id: str, worker_id: str, run: asyncio.Task, lease_lost: asyncio.Event):
+        """Renew the lease every third of the visibility timeout; cancel the run if it was lost"""
+        interval = settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                held = await asyncio.to_thread(self.queue.heartbeat, job_id, worker_id)
+            except Exception as e:
+                logger.warning(f"Job {job_id} heartbeat failed: {e}")
+                continue
+            if not held:
+                lease_lost.set()
+                run.cancel()
+                return
+
+
+# ---------------------------------------------------------------------------
+# Job handlers
+# ---------------------------------------------------------------------------
+
+KYC_ORCHESTRATION_JOB = "kyc_orchestration"
+
+# Workflow events stored as job progress
+PROGRESS_EVENTS = {"workflow_started", "agent_completed", "final_decision"}
+
+
+async def run_kyc_orchestration(job: Dict[str, Any], report: ProgressReporter) -> Dict[str, Any]:
+    """
+    Execute the multi-agent KYC workflow of a job
+
+    The job's run_id is reused on every attempt, so a retry resumes from the
+    workflow's checkpoints, also for a job submitted with force (which only
+    stops the first attempt from reusing other runs' steps). A run that
+    completed with fallback data is retried while attempts remain; the last
+    attempt returns it as is.
+    """
+    completed_agents: List[str] = []
+
+    async def sink(event: str, data: Dict[str, Any]):
+        if event not in PROGRESS_EVENTS:
+            return
+        if event == "agent_completed":
+            completed_agents.append(data.get("agent_name"))
+        await report({
+            "event": event,
+            "agent_name": data.get("agent_name"),
+            "completed_agents": list(completed_agents),
+            "attempt": job["attempts"],
+            "at": datetime.utcnow().isoformat()
+        })
+
+    payload = job["payload"]
+    result = await agent_orchestrator.orchestrate_kyc_workflow(
+        payload["kyc_data"],
+        event_sink=sink,
+        run_id=job["run_id"],
+        reuse_checkpoints=payload.get("reuse_checkpoints", True)
+    )
+    incomplete = result["metadata"].get("checkpoints", {}).get("incomplete")
+    if incomplete and job["attempts"] < job["max_attempts"]:
+        raise RetryableJobError(f"Workflow steps incomplete: {', '.join(sorted(incomplete))}")
+    return result
+
+
+WATCHLIST_RESCREEN_JOB = "watchlist_rescreen"
+
+
+async def run_watchlist_rescreen(job: Dict[str, Any], report: ProgressReporter) -> Dict[str, Any]:
+    """
+    Re-screen the client book against the current watch-list version
+
+    The screening runs on a thread; its progress is reported from there through
+    the event loop. A retry of a version that was already screened is a no-op.
+    """
+    loop = asyncio.get_running_loop()
+
+    def progress(data: Dict[str, Any]):
+        asyncio.run_coroutine_threadsafe(
+            report({**data, "attempt": job["attempts"], "at": datetime.utcnow().isoformat()}), loop
+        )
+
+    return await asyncio.to_thread(watchlist_rescreener.run, progress)
+
+
+# Global instances
+job_queue = JobQueue()
+job_worker_pool = JobWorkerPool(job_queue)
+job_worker_pool.register(KYC_ORCHESTRATION_JOB, run_kyc_orchestration)
+job_worker_pool.register(WATCHLIST_RESCREEN_JOB, run_watchlist_rescreen)
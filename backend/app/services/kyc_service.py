@@ -0,0 +1,436 @@
+"""
+KYC Service
+Shared persistence logic for KYC analyses, used by the single-client endpoint and
+by the bulk (periodic review) entry point.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, Optional, List, Tuple, Union, Iterable, AsyncIterable, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.client import Client
+from ..models.kyc_record import KYCRecord
+from ..schemas.client import KYCAnalysisRequest
+from .ai_analysis_service import AIAnalysisService, MODEL
+from .llm_scheduler import Priority
+from .similarity_index import similarity_index
+from .client_dedup import client_deduplicator
+
+logger = logging.getLogger(__name__)
+
+BatchItem = Union[KYCAnalysisRequest, Dict[str, Any], str]
+
+
+def build_kyc_context(request: KYCAnalysisRequest) -> Dict[str, Any]:
+    """Prepare the AI analysis context for a KYC request"""
+    return {
+        "full_name": request.full_name,
+        "date_of_birth": str(request.date_of_birth) if request.date_of_birth else None,
+        "nationality": request.nationality,
+        "residency_country": request.residency_country,
+        "source_of_wealth": request.source_of_wealth,
+        "business_activity": request.business_activity,
+        "kyc_notes": request.kyc_notes
+    }
+
+
+def _normalize(value: Any) -> str:
+    """Canonical text form: NFC, trimmed, internal whitespace collapsed"""
+    if value is None:
+        return ""
+    return " ".join(unicodedata.normalize("NFC", str(value)).split())
+
+
+def compute_input_fingerprint(request: KYCAnalysisRequest) -> str:
+    """
+    Fingerprint of the inputs that determine a KYC assessment
+
+    Whitespace-only edits and country casing do not change the fingerprint; the
+    model name is included so switching models forces a fresh analysis.
+    """
+    payload = {
+        "model": MODEL,
+        "full_name": _normalize(request.full_name),
+        "date_of_birth": str(request.date_of_birth) if request.date_of_birth else "",
+        "nationality": _normalize(request.nationality).casefold(),
+        "residency_country": _normalize(request.residency_country).casefold(),
+        "source_of_wealth": _normalize(request.source_of_wealth),
+        "business_activity": _normalize(request.business_activity),
+        "kyc_notes": _normalize(request.kyc_notes)
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def find_unchanged_kyc(db: Session, request: KYCAnalysisRequest) -> Optional[Tuple[Client, KYCRecord]]:
+    """
+    Return the client and latest KYC record if their inputs match the request
+
+    Returns None when incremental review is disabled, the request forces a
+    re-analysis, the client is new, or any input changed.
+    """
+    if request.force or not settings.KYC_INCREMENTAL_ENABLED:
+        return None
+    client = db.query(Client).filter(Client.full_name == request.full_name).first()
+    if not client:
+        return None
+    last_record = db.query(KYCRecord).filter(KYCRecord.client_id == client.id).order_by(KYCRecord.version.desc()).first()
+    if not last_record or last_record.input_fingerprint != compute_input_fingerprint(request):
+        return None
+    return client, last_record
+
+
+def refresh_kyc_review(db: Session, client: Client, kyc_record: KYCRecord) -> Tuple[Client, KYCRecord]:
+    """
+    Record a periodic review with unchanged inputs (not committed)
+
+    Keeps the previous assessment and version, and moves the review dates forward
+    by the interval the original analysis chose.
+    """
+    interval = timedelta(days=365)
+    if kyc_record.review_date and kyc_record.next_review_date:
+        interval = kyc_record.next_review_date - kyc_record.review_date
+    kyc_record.review_date = date.today()
+    kyc_record.next_review_date = date.today() + interval
+    client.next_review_date = kyc_record.next_review_date
+    client.updated_at = datetime.utcnow()
+    db.flush()
+    return client, kyc_record
+
+
+def apply_kyc_analysis(
+    db: Session,
+    request: KYCAnalysisRequest,
+    analysis_result: Dict[str, Any]
+) -> Tuple[Client, KYCRecord]:
+    """
+    Create/update the client and add a new KYC record version (not committed)
+
+    Args:
+        db: Database session
+        request: Original KYC request
+        analysis_result: Parsed KYC_ANALYSIS output
+
+    Returns:
+        Tuple of (client, new KYC record)
+    """
+    # Calculate next review date
+    next_review_months = analysis_result.get("next_review_months", 12)
+    next_review_date = date.today() + timedelta(days=next_review_months * 30)
+
+    # Check if client exists
+    client = db.query(Client).filter(Client.full_name == request.full_name).first()
+
+    if client:
+        # Update existing client
+        client.date_of_birth = request.date_of_birth or client.date_of_birth
+        client.nationality = request.nationality or client.nationality
+        client.residency_country = request.residency_country or client.residency_country
+        client.source_of_wealth = request.source_of_wealth or client.source_of_wealth
+        client.business_activity = request.business_activity or client.business_activity
+        client.raw_kyc_notes = request.kyc_notes
+        client.updated_at = datetime.utcnow()
+    else:
+        # Create new client
+        client = Client(
+            full_name=request.full_name,
+            date_of_birth=request.date_of_birth,
+            nationality=request.nationality,
+            residency_country=request.residency_country,
+            source_of_wealth=request.source_of_wealth,
+            business_activity=request.business_activity,
+            raw_kyc_notes=request.kyc_notes,
+            status="Active"
+        )
+        db.add(client)
+        db.flush()  # Get ID
+
+    # Update Client Risk Profile
+    client.risk_score = analysis_result.get("risk_score", "Medium")
+    client.risk_rationale = analysis_result.get("risk_rationale", "")
+    client.kyc_summary = analysis_result.get("kyc_summary", "")
+    client.pep_flag = analysis_result.get("pep_flag", False)
+    client.sanctions_flag = analysis_result.get("sanctions_flag", False)
+    client.next_review_date = next_review_date
+
+    # Create KYC Record (History)
+    # Determine version
+    last_record = db.query(KYCRecord).filter(KYCRecord.client_id == client.id).order_by(KYCRecord.version.desc()).first()
+    new_version = (last_record.version + 1) if last_record else 1
+
+    kyc_record = KYCRecord(
+        client_id=client.id,
+        version=new_version,
+        risk_score=client.risk_score,
+        risk_rationale=client.risk_rationale,
+        kyc_summary=client.kyc_summary,
+        pep_flag=client.pep_flag,
+        sanctions_flag=client.sanctions_flag,
+        cdd_conclusion=analysis_result.get("cdd_conclusion", "Standard CDD"),
+        edd_required=analysis_result.get("edd_required", False),
+        review_date=date.today(),
+        next_review_date=next_review_date,
+        raw_kyc_notes=request.kyc_notes,
+        input_fingerprint=compute_input_fingerprint(request)
+    )
+    db.add(kyc_record)
+    # Flush so later items in the same transaction see this version
+    db.flush()
+
+    return client, kyc_record
+
+
+def build_client_response(client: Client, kyc_record: KYCRecord, reused: bool = False) -> Dict[str, Any]:
+    """Construct response combining Client and Analysis details"""
+    return {
+        "id": client.id,
+        "full_name": client.full_name,
+        "date_of_birth": client.date_of_birth,
+        "nationality": client.nationality,
+        "residency_country": client.residency_country,
+        "source_of_wealth": client.source_of_wealth,
+        "business_activity": client.business_activity,
+        "pep_flag": client.pep_flag,
+        "sanctions_flag": client.sanctions_flag,
+        "risk_score": client.risk_score,
+        "risk_rationale": client.risk_rationale,
+        "kyc_summary": client.kyc_summary,
+        "raw_kyc_notes": client.raw_kyc_notes,
+        "created_at": client.created_at,
+        "updated_at": client.updated_at,
+        # Enhanced fields from analysis
+        "cdd_conclusion": kyc_record.cdd_conclusion,
+        "edd_required": kyc_record.edd_required,
+        "next_review_date": client.next_review_date,
+        "analysis_reused": reused
+    }
+
+
+def _parse_batch_item(item: BatchItem) -> KYCAnalysisRequest:
+    """Validate one batch item (request object, dict or NDJSON line)"""
+    if isinstance(item, KYCAnalysisRequest):
+        return item
+    if isinstance(item, (str, bytes)):
+        return KYCAnalysisRequest.model_validate_json(item)
+    return KYCAnalysisRequest.model_validate(item)
+
+
+def _has_unchanged_kyc(request: KYCAnalysisRequest) -> bool:
+    """Incremental-review check for batch items (runs in a worker thread)"""
+    db = SessionLocal()
+    try:
+        return find_unchanged_kyc(db, request) is not None
+    finally:
+        db.close()
+
+
+def _write_group(group: List[Tuple[int, KYCAnalysisRequest, Optional[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Persist a group of completed analyses in one transaction.
+
+    Each item runs in a SAVEPOINT so a failing row is rolled back on its own
+    without discarding the rest of the group. Items without an analysis result
+    are unchanged reviews and only have their review dates moved forward.
+    """
+    db = SessionLocal()
+    written = []
+    outcomes = []
+    try:
+        for index, request, analysis_result in group:
+            try:
+                with db.begin_nested():
+                    if analysis_result is None:
+                        unchanged = find_unchanged_kyc(db, request)
+                        if unchanged is None:
+                            raise ValueError("KYC inputs changed during the batch, resubmit the item")
+                        client, kyc_record = refresh_kyc_review(db, *unchanged)
+                    else:
+                        client, kyc_record = apply_kyc_analysis(db, request, analysis_result)
+                written.append((index, client, kyc_record, analysis_result is None))
+            except Exception as e:
+                logger.warning(f"KYC batch item {index} failed to persist: {e}")
+                outcomes.append({"index": index, "status": "failed", "error": f"Database write failed: {str(e)}"})
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"KYC batch group commit failed: {e}")
+            outcomes.extend(
+                {"index": index, "status": "failed", "error": f"Database commit failed: {str(e)}"}
+                for index, _, _, _ in written
+            )
+            written = []
+        for index, client, kyc_record, reused in written:
+            db.refresh(client)
+            outcomes.append({
+                "index": index,
+                "status": "completed",
+                "result": build_client_response(client, kyc_record, reused)
+            })
+        similarity_index.schedule_refresh(client.id for _, client, _, reused in written if not reused)
+        client_deduplicator.schedule_index(client.id for _, client, _, reused in written if not reused)
+    finally:
+        db.close()
+    return sorted(outcomes, key=lambda outcome: outcome["index"])
+
+
+async def _aiter(items: Union[Iterable[BatchItem], AsyncIterable[BatchItem]]) -> AsyncIterator[BatchItem]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def analyze_kyc_batch(
+    items: Union[Iterable[BatchItem], AsyncIterable[BatchItem]],
+    concurrency: Optional[int] = None,
+    commit_batch_size: Optional[int] = None,
+    priority: Priority = "bulk"
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run KYC analyses for many clients with bounded concurrency
+
+    Items are consumed lazily (an async NDJSON stream works), analysed with at most
+    ``concurrency`` model calls in flight, and written in grouped transactions of up
+    to ``commit_batch_size`` rows. Items whose inputs match the client's latest KYC
+    record skip the model and only have their review dates bumped (unless ``force``
+    is set). Invalid items and failed analyses are reported per item and never
+    abort the batch.
+
+    Args:
+        items: KYCAnalysisRequest objects, dicts or JSON strings
+        concurrency: Maximum concurrent analyses (defaults to KYC_BATCH_CONCURRENCY)
+        commit_batch_size: Rows per transaction (defaults to KYC_BATCH_COMMIT_SIZE)
+        priority: Scheduler lane for the model calls
+
+    Yields:
+        Per-item outcomes {"index", "status": "completed"|"failed", "result"|"error"}
+        in completion order
+    """
+    concurrency = concurrency or settings.KYC_BATCH_CONCURRENCY
+    commit_batch_size = commit_batch_size or settings.KYC_BATCH_COMMIT_SIZE
+    semaphore = asyncio.Semaphore(concurrency)
+    completed: asyncio.Queue = asyncio.Queue()
+
+    async def analyze_one(index: int, item: BatchItem):
+        try:
+            try:
+                request = _parse_batch_item(item)
+            except ValidationError as e:
+                await completed.put((index, None, None, f"Invalid request: {str(e)}"))
+                return
+            except Exception as e:
+                # Anything else unparseable is reported per item too, never aborting the batch
+                await completed.put((index, None, None, f"Invalid request: {e!r}"))
+                return
+            try:
+                if await asyncio.to_thread(_has_unchanged_kyc, request):
+                    await completed.put((index, request, None, None))
+                    return
+            except Exception as e:
+                logger.warning(f"KYC batch item {index} incremental check failed, re-analysing: {e}")
+            try:
+                analysis_result = await AIAnalysisService.analyze(
+                    context=build_kyc_context(request),
+                    template_type="KYC_ANALYSIS",
+                    priority=priority
+                )
+            except Exception as e:
+                await completed.put((index, request, None, str(e)))
+                return
+            await completed.put((index, request, analysis_result, None))
+        finally:
+            semaphore.release()
+
+    async def produce():
+        tasks = []
+        index = 0
+        try:
+            async for item in _aiter(items):
+                # Backpressure: do not read further input until a slot is free
+                await semaphore.acquire()
+                tasks.append(asyncio.create_task(analyze_one(index, item)))
+                index += 1
+        finally:
+            # Even when the input stream breaks: report the items in flight, then always
+            # send the end marker (the consumer would otherwise wait for it forever)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await completed.put(None)
+
+    producer = asyncio.create_task(produce())
+    pending: List[Tuple[int, KYCAnalysisRequest, Optional[Dict[str, Any]]]] = []
+    oldest = None
+    finished = False
+    try:
+        while not finished:
+            timeout = None
+            if pending:
+                timeout = max(0.0, settings.KYC_BATCH_FLUSH_SECONDS - (time.monotonic() - oldest))
+            try:
+                entry = await asyncio.wait_for(completed.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                entry = False  # Flush deadline reached
+
+            if entry is None:
+                finished = True
+            elif entry:
+                index, request, analysis_result, error = entry
+                if error is not None:
+                    yield {"index": index, "status": "failed", "error": error}
+                    continue
+                if not pending:
+                    oldest = time.monotonic()
+                pending.append((index, request, analysis_result))
+                if len(pending) < commit_batch_size:
+                    continue
+
+            if pending:
+                group, pending = pending, []
+                for outcome in await asyncio.to_thread(_write_group, group):
+                    yield outcome
+        # Surface producer errors (e.g. a broken input stream)
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+
+
+def analyze_kyc_batch_sync(
+    items: Iterable[BatchItem],
+    concurrency: Optional[int] = None,
+    commit_batch_size: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Synchronous version of analyze_kyc_batch for scripts and scheduled jobs
+
+    Returns:
+        All per-item outcomes ordered by input index
+    """
+    async def run():
+        return [outcome async for outcome in analyze_kyc_batch(items, concurrency, commit_batch_size)]
+
+    return sorted(asyncio.run(run()), key=lambda outcome: outcome["index"])
+
+
+def iter_ndjson_file(path: str) -> Iterable[str]:
+    """Yield non-empty lines of an NDJSON file for analyze_kyc_batch"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def dumps_outcome(outcome: Dict[str, Any]) -> str:
+    """Serialize a batch outcome as one NDJSON line"""
+    return json.dumps(outcome, default=str) + "\n"
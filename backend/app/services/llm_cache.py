@@ -0,0 +1,257 @@
+"""
+LLM Response Cache
+Content-addressed cache for model completions with two tiers:
+
+1. A bounded in-process LRU with TTL (microsecond lookups, per worker)
+2. A persistent table in the application database (survives restarts, shared by workers)
+
+Keys are a SHA-256 over the template type, model, sampling parameters and the fully
+rendered prompt, so any change to the inputs produces a different entry.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List, Tuple, Hashable
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.llm_cache_entry import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+
+class LRUTTLCache:
+    """Thread-safe bounded LRU mapping whose entries expire after a TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Insert or refresh a value, evicting the least recently used entries when full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def keys(self) -> List[Hashable]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + persistent table) cache for raw LLM responses"""
+
+    def __init__(self):
+        # Memory tier values are (template_type, response) so purges can be selective
+        self.memory = LRUTTLCache(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LLM_CACHE_ENABLED
+
+    @staticmethod
+    def make_key(
+        template_type: str,
+        model: str,
+        temperature: float,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Content address of a completion request"""
+        payload = json.dumps(
+            {
+                "template_type": template_type,
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_format": response_format,
+                "messages": messages,
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_persistent(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (response, template_type) from the persistent tier"""
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == key).first()
+            if entry is None:
+                return None, None
+            if entry.expires_at <= datetime.utcnow():
+                db.delete(entry)
+                db.commit()
+                return None, None
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+            return entry.response, entry.template_type
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            db.rollback()
+            return None, None
+        finally:
+            db.close()
+
+    def _set_persistent(self, key: str, template_type: str, model: str, response: str):
+        db = SessionLocal()
+        try:
+            entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == key).first()
+            expires_at = datetime.utcnow() + timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+            if entry is None:
+                db.add(LLMCacheEntry(
+                    cache_key=key,
+                    template_type=template_type,
+                    model=model,
+                    response=response,
+                    hit_count=0,
+                    expires_at=expires_at
+                ))
+            else:
+                entry.response = response
+                entry.expires_at = expires_at
+            db.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response in memory, then in the persistent tier (promoting hits)"""
+        item = self.memory.get(key)
+        if item is not None:
+            self.memory_hits += 1
+            return item[1]
+        value, template_type = self._get_persistent(key)
+        if value is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, (template_type, value))
+            return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, template_type: str, model: str, response: str):
+        """Store a response in both tiers"""
+        self.memory.set(key, (template_type, response))
+        self._set_persistent(key, template_type, model, response)
+        self.writes += 1
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async lookup: memory tier inline, persistent tier off the event loop"""
+        item = self.memory.get(key)
+        if item is not None:
+            self.memory_hits += 1
+            return item[1]
+        value, template_type = await asyncio.to_thread(self._get_persistent, key)
+        if value is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, (template_type, value))
+            return value
+        self.misses += 1
+        return None
+
+    async def aset(self, key: str, template_type: str, model: str, response: str):
+        """Async store: persistent write runs in a worker thread"""
+        self.memory.set(key, (template_type, response))
+        await asyncio.to_thread(self._set_persistent, key, template_type, model, response)
+        self.writes += 1
+
+    def purge(self, template_type: Optional[str] = None) -> int:
+        """
+        Remove cached responses from both tiers
+
+        Args:
+            template_type: Only purge entries for this template (all entries if omitted)
+
+        Returns:
+            Number of persistent entries deleted
+        """
+        if template_type is None:
+            self.memory.clear()
+        else:
+            for key in self.memory.keys():
+                item = self.memory.get(key)
+                if item is not None and item[0] == template_type:
+                    self.memory.delete(key)
+
+        db = SessionLocal()
+        try:
+            query = db.query(LLMCacheEntry)
+            if template_type is not None:
+                query = query.filter(LLMCacheEntry.template_type == template_type)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        db = SessionLocal()
+        try:
+            persistent_entries = db.query(LLMCacheEntry).count()
+        finally:
+            db.close()
+        return {
+            "enabled": self.enabled,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "memory_entries": len(self.memory),
+            "memory_capacity": self.memory.max_entries,
+            "memory_evictions": self.memory.evictions,
+            "persistent_entries": persistent_entries,
+            "ttl_seconds": settings.LLM_CACHE_TTL_SECONDS
+        }
+
+
+# Global instance
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,369 @@
+"""
+Shared LLM Gateway
+Single async entry point for every chat completion issued by the backend.
+
+All services talk to the model through the global ``llm_gateway`` instance so that
+connections are pooled and kept alive across requests, timeouts are applied
+consistently, and waiting on the model never blocks the event loop.
+
+Every call is recorded in ``llm_metrics``: queue wait is time spent in the
+scheduler, time to first byte is measured from dispatch to the first response
+bytes (first content delta when streaming), and total time covers the whole call.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+import weakref
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from ..config import settings
+from .llm_cache import llm_response_cache
+from .single_flight import llm_single_flight
+from .llm_scheduler import llm_scheduler, estimate_tokens, Priority
+from .llm_metrics import llm_metrics, LLMCallRecord
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+CacheValidator = Callable[[str], bool]
+
+# Set by the gateway around each provider request; the httpx response hook stamps the
+# moment response headers arrive (time to first byte for non-streamed calls).
+_first_byte: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("llm_first_byte", default=None)
+
+
+def _mark_first_byte():
+    marker = _first_byte.get()
+    if marker is not None and "at" not in marker:
+        marker["at"] = time.perf_counter()
+
+
+async def _on_response_async(response: httpx.Response):
+    _mark_first_byte()
+
+
+def _on_response_sync(response: httpx.Response):
+    _mark_first_byte()
+
+
+class LLMGateway:
+    """Pooled, keep-alive async client wrapper for OpenAI-compatible chat completions"""
+
+    def __init__(self):
+        # One async client per event loop: httpx connection pools are bound to the
+        # loop that opened them, so a client must never be shared across loops.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+        self._sync_client: Optional[OpenAI] = None
+
+    @property
+    def enabled(self) -> bool:
+        """True when an API key is configured and real model calls can be made"""
+        return bool(settings.OPENAI_API_KEY)
+
+    @staticmethod
+    def _timeout(timeout: Optional[float] = None) -> httpx.Timeout:
+        """Build an httpx timeout from a per-call read timeout (seconds)"""
+        read_timeout = timeout if timeout is not None else settings.LLM_TIMEOUT_SECONDS
+        return httpx.Timeout(read_timeout, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS)
+
+    @staticmethod
+    def _limits() -> httpx.Limits:
+        """Connection pool limits shared by the sync and async transports"""
+        return httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+        )
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "api_key": settings.OPENAI_API_KEY,
+            "max_retries": settings.LLM_MAX_RETRIES,
+            "timeout": self._timeout(),
+        }
+        if settings.OPENAI_BASE_URL:
+            kwargs["base_url"] = settings.OPENAI_BASE_URL
+        return kwargs
+
+    def get_client(self) -> AsyncOpenAI:
+        """Return the pooled async client for the running event loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=self._limits(),
+                timeout=self._timeout(),
+                event_hooks={"response": [_on_response_async]}
+            )
+            client = AsyncOpenAI(http_client=http_client, **self._client_kwargs())
+            self._clients[loop] = client
+            logger.info("LLM gateway: async client initialized")
+        return client
+
+    def get_sync_client(self) -> OpenAI:
+        """Return the pooled sync client used by non-async callers"""
+        if self._sync_client is None:
+            http_client = httpx.Client(
+                limits=self._limits(),
+                timeout=self._timeout(),
+                event_hooks={"response": [_on_response_sync]}
+            )
+            self._sync_client = OpenAI(http_client=http_client, **self._client_kwargs())
+        return self._sync_client
+
+    @staticmethod
+    def _request_kwargs(
+        messages: Messages,
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        kwargs: Dict[str, Any] = {
+            "model": model or settings.OPENAI_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "timeout": LLMGateway._timeout(timeout),
+        }
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+        return kwargs
+
+    @staticmethod
+    def _new_record(template_type: str, model: str, priority: str, streamed: bool = False) -> LLMCallRecord:
+        tags = llm_metrics.current_tags()
+        return LLMCallRecord(
+            template_type=template_type,
+            model=model,
+            agent_name=tags.get("agent_name"),
+            priority=priority,
+            streamed=streamed,
+            tags=tags
+        )
+
+    @staticmethod
+    def _record_usage(record: LLMCallRecord, usage: Any):
+        if usage is not None:
+            record.prompt_tokens = usage.prompt_tokens or 0
+            record.completion_tokens = usage.completion_tokens or 0
+
+    @staticmethod
+    def _record_cache_hit(record: LLMCallRecord, started: float):
+        record.cache_hit = True
+        record.total_ms = (time.perf_counter() - started) * 1000
+        llm_metrics.record(record)
+
+    async def complete(
+        self,
+        messages: Messages,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        template_type: str = "GENERIC",
+        use_cache: bool = True,
+        cache_validator: Optional[CacheValidator] = None,
+        priority: Priority = "interactive"
+    ) -> str:
+        """
+        Issue a chat completion without blocking the event loop
+
+        Args:
+            messages: Chat messages to send
+            model: Model name (defaults to OPENAI_MODEL)
+            temperature: Sampling temperature
+            max_tokens: Optional completion token cap
+            response_format: Optional response format (e.g. JSON mode)
+            timeout: Optional per-call read timeout in seconds
+            template_type: Prompt family, used to namespace cache entries
+            use_cache: Serve identical requests from the response cache
+                (concurrent identical requests are always coalesced)
+            cache_validator: Only responses passing this check are cached
+            priority: Scheduler lane ("interactive" or "bulk")
+
+        Returns:
+            Content of the first choice
+        """
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, response_format, timeout)
+        fingerprint = llm_response_cache.make_key(
+            template_type, kwargs["model"], temperature, messages, max_tokens, response_format
+        )
+        record = self._new_record(template_type, kwargs["model"], priority)
+        started = time.perf_counter()
+        use_cache = use_cache and llm_response_cache.enabled
+        if use_cache:
+            cached = await llm_response_cache.aget(fingerprint)
+            if cached is not None:
+                self._record_cache_hit(record, started)
+                return cached
+
+        async def fetch() -> str:
+            fetch_started = time.perf_counter()
+            marker: Dict[str, float] = {}
+            try:
+                record.queue_wait_ms = await llm_scheduler.acquire(priority, estimate_tokens(messages, max_tokens)) * 1000
+                dispatched = time.perf_counter()
+                _first_byte.set(marker)
+                response = await self.get_client().chat.completions.create(**kwargs)
+                if "at" in marker:
+                    record.ttfb_ms = (marker["at"] - dispatched) * 1000
+                self._record_usage(record, response.usage)
+            except Exception as e:
+                record.error = str(e)
+                raise
+            finally:
+                record.total_ms = (time.perf_counter() - fetch_started) * 1000
+                llm_metrics.record(record)
+            content = response.choices[0].message.content
+            if use_cache and content and (cache_validator is None or cache_validator(content)):
+                await llm_response_cache.aset(fingerprint, template_type, kwargs["model"], content)
+            return content
+
+        # Identical concurrent requests await the same in-flight call
+        return await llm_single_flight.do(fingerprint, fetch)
+
+    async def stream(
+        self,
+        messages: Messages,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        template_type: str = "GENERIC",
+        use_cache: bool = True,
+        cache_validator: Optional[CacheValidator] = None,
+        priority: Priority = "interactive"
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion as content deltas
+
+        Takes the same arguments as ``complete``. A cached response is yielded as a
+        single delta; otherwise deltas are yielded as the provider produces them and
+        the assembled response is cached once the stream finishes.
+        """
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, response_format, timeout)
+        fingerprint = llm_response_cache.make_key(
+            template_type, kwargs["model"], temperature, messages, max_tokens, response_format
+        )
+        record = self._new_record(template_type, kwargs["model"], priority, streamed=True)
+        started = time.perf_counter()
+        use_cache = use_cache and llm_response_cache.enabled
+        if use_cache:
+            cached = await llm_response_cache.aget(fingerprint)
+            if cached is not None:
+                self._record_cache_hit(record, started)
+                yield cached
+                return
+
+        parts: List[str] = []
+        try:
+            record.queue_wait_ms = await llm_scheduler.acquire(priority, estimate_tokens(messages, max_tokens)) * 1000
+            dispatched = time.perf_counter()
+            response = await self.get_client().chat.completions.create(
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs
+            )
+            async for chunk in response:
+                self._record_usage(record, getattr(chunk, "usage", None))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if record.ttfb_ms is None:
+                        record.ttfb_ms = (time.perf_counter() - dispatched) * 1000
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            record.total_ms = (time.perf_counter() - started) * 1000
+            llm_metrics.record(record)
+
+        content = "".join(parts)
+        if use_cache and content and (cache_validator is None or cache_validator(content)):
+            await llm_response_cache.aset(fingerprint, template_type, kwargs["model"], content)
+
+    def complete_sync(
+        self,
+        messages: Messages,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        template_type: str = "GENERIC",
+        use_cache: bool = True,
+        cache_validator: Optional[CacheValidator] = None
+    ) -> str:
+        """Blocking variant of ``complete`` for scripts and other non-async contexts"""
+        kwargs = self._request_kwargs(messages, model, temperature, max_tokens, response_format, timeout)
+        record = self._new_record(template_type, kwargs["model"], "sync")
+        started = time.perf_counter()
+        cache_key = None
+        if use_cache and llm_response_cache.enabled:
+            cache_key = llm_response_cache.make_key(
+                template_type, kwargs["model"], temperature, messages, max_tokens, response_format
+            )
+            cached = llm_response_cache.get(cache_key)
+            if cached is not None:
+                self._record_cache_hit(record, started)
+                return cached
+
+        marker: Dict[str, float] = {}
+        token = _first_byte.set(marker)
+        try:
+            response = self.get_sync_client().chat.completions.create(**kwargs)
+            if "at" in marker:
+                record.ttfb_ms = (marker["at"] - started) * 1000
+            self._record_usage(record, response.usage)
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            _first_byte.reset(token)
+            record.total_ms = (time.perf_counter() - started) * 1000
+            llm_metrics.record(record)
+        content = response.choices[0].message.content
+
+        if cache_key is not None and content and (cache_validator is None or cache_validator(content)):
+            llm_response_cache.set(cache_key, template_type, kwargs["model"], content)
+        return content
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        client = self._clients.pop(loop, None) if loop is not None else None
+        if client is not None:
+            await client.close()
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+
+def is_json_response(content: str) -> bool:
+    """Cache validator accepting only responses that parse as JSON"""
+    try:
+        json.loads(content)
+        return True
+    except (TypeError, ValueError):
+        return False
+
+
+# Global instance
+llm_gateway = LLMGateway()
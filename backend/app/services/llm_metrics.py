@@ -0,0 +1,258 @@
+"""
+LLM Call Metrics
+Per-call accounting for every model invocation issued through the gateway.
+
+Each call is recorded with monotonic timings (queue wait, time to first byte, total),
+prompt/completion tokens and estimated cost, tagged by template type, agent name and
+model. Records feed process-wide aggregates (histograms and percentiles) and, when a
+capture is active, a per-run list used by the orchestrator's metadata block.
+"""
+
+import contextvars
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, Optional, List, Deque, Iterator, Tuple
+
+# USD per 1M tokens (input, output); unknown models are costed at zero
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+# Histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# Samples kept per group for percentile estimation
+RESERVOIR_SIZE = 2048
+
+_tags: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("llm_metric_tags", default={})
+_capture: contextvars.ContextVar[Optional[List["LLMCallRecord"]]] = contextvars.ContextVar("llm_metric_capture", default=None)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call from the pricing table"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # Dated snapshots (e.g. gpt-4o-2024-08-06) are priced like their base model
+        for name in sorted(MODEL_PRICING, key=len, reverse=True):
+            if model.startswith(name):
+                pricing = MODEL_PRICING[name]
+                break
+    if pricing is None:
+        return 0.0
+    return (prompt_tokens * pricing[0] + completion_tokens * pricing[1]) / 1_000_000
+
+
+@dataclass
+class LLMCallRecord:
+    """One model invocation (or cache hit)"""
+    template_type: str
+    model: str
+    agent_name: Optional[str] = None
+    priority: str = "interactive"
+    streamed: bool = False
+    cache_hit: bool = False
+    error: Optional[str] = None
+    queue_wait_ms: float = 0.0
+    ttfb_ms: Optional[float] = None
+    total_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    tags: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Series:
+    """Histogram plus bounded reservoir for one latency measure"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.samples: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value_ms: float):
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.samples.append(value_ms)
+        self.total += value_ms
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))], 2)
+
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["gt_" + str(LATENCY_BUCKETS_MS[-1])]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(ordered[-1], 2) if ordered else None,
+            "histogram": dict(zip(labels, self.buckets))
+        }
+
+
+class _Group:
+    """Aggregates for one (template_type, agent_name, model) combination"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.queue_wait = _Series()
+        self.ttfb = _Series()
+        self.total = _Series()
+
+    def add(self, record: LLMCallRecord):
+        self.calls += 1
+        self.total.add(record.total_ms)
+        if record.cache_hit:
+            self.cache_hits += 1
+            return
+        if record.error:
+            self.errors += 1
+        self.queue_wait.add(record.queue_wait_ms)
+        if record.ttfb_ms is not None:
+            self.ttfb.add(record.ttfb_ms)
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.cost_usd += record.cost_usd
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_ms": {
+                "queue_wait": self.queue_wait.summary(),
+                "ttfb": self.ttfb.summary(),
+                "total": self.total.summary()
+            }
+        }
+
+
+class LLMMetrics:
+    """Process-wide registry of LLM call metrics"""
+
+    def __init__(self):
+        self._groups: Dict[Tuple[str, str, str], _Group] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def tag(self, **tags: str) -> Iterator[None]:
+        """Attach tags (e.g. agent_name) to every call made inside the block"""
+        token = _tags.set({**_tags.get(), **tags})
+        try:
+            yield
+        finally:
+            _tags.reset(token)
+
+    @contextmanager
+    def capture(self) -> Iterator[List[LLMCallRecord]]:
+        """Collect the records of every call made inside the block (including child tasks)"""
+        records: List[LLMCallRecord] = []
+        token = _capture.set(records)
+        try:
+            yield records
+        finally:
+            _capture.reset(token)
+
+    def current_tags(self) -> Dict[str, str]:
+        return dict(_tags.get())
+
+    def record(self, record: LLMCallRecord):
+        """Store a finished call in the aggregates and the active capture, if any"""
+        if record.cost_usd == 0.0 and not record.cache_hit:
+            record.cost_usd = estimate_cost(record.model, record.prompt_tokens, record.completion_tokens)
+        key = (record.template_type, record.agent_name or "-", record.model)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _Group()
+            group.add(record)
+        records = _capture.get()
+        if records is not None:
+            records.append(record)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregated metrics per template type / agent / model"""
+        with self._lock:
+            groups = [
+                {
+                    "template_type": template_type,
+                    "agent_name": None if agent_name == "-" else agent_name,
+                    "model": model,
+                    **group.summary()
+                }
+                for (template_type, agent_name, model), group in sorted(self._groups.items())
+            ]
+        return {
+            "groups": groups,
+            "totals": {
+                "calls": sum(g["calls"] for g in groups),
+                "cache_hits": sum(g["cache_hits"] for g in groups),
+                "errors": sum(g["errors"] for g in groups),
+                "prompt_tokens": sum(g["prompt_tokens"] for g in groups),
+                "completion_tokens": sum(g["completion_tokens"] for g in groups),
+                "cost_usd": round(sum(g["cost_usd"] for g in groups), 6)
+            }
+        }
+
+    def reset(self):
+        with self._lock:
+            self._groups.clear()
+
+    @staticmethod
+    def summarize(records: List[LLMCallRecord]) -> Dict[str, Any]:
+        """Compact per-run usage summary (used in orchestrator metadata)"""
+        by_agent: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            agent = by_agent.setdefault(record.agent_name or record.template_type, {
+                "calls": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                "cost_usd": 0.0, "queue_wait_ms": 0.0, "ttfb_ms": None, "total_ms": 0.0
+            })
+            agent["calls"] += 1
+            agent["cache_hits"] += int(record.cache_hit)
+            agent["prompt_tokens"] += record.prompt_tokens
+            agent["completion_tokens"] += record.completion_tokens
+            agent["cost_usd"] = round(agent["cost_usd"] + record.cost_usd, 6)
+            agent["queue_wait_ms"] = round(agent["queue_wait_ms"] + record.queue_wait_ms, 2)
+            agent["total_ms"] = round(agent["total_ms"] + record.total_ms, 2)
+            if record.ttfb_ms is not None and agent["ttfb_ms"] is None:
+                agent["ttfb_ms"] = round(record.ttfb_ms, 2)
+        return {
+            "llm_calls": len(records),
+            "cache_hits": sum(1 for record in records if record.cache_hit),
+            "prompt_tokens": sum(record.prompt_tokens for record in records),
+            "completion_tokens": sum(record.completion_tokens for record in records),
+            "cost_usd": round(sum(record.cost_usd for record in records), 6),
+            "by_agent": by_agent
+        }
+
+
+# Global instance
+llm_metrics = LLMMetrics()
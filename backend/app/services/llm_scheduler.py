@@ -0,0 +1,210 @@
+"""
+LLM Request Scheduler
+Central admission control in front of the model provider.
+
+Every model call acquires a slot from the scheduler before it is sent. Two token
+buckets mirror the provider quota (requests per minute and tokens per minute), and
+waiting calls are queued in priority lanes:
+
+- interactive: onboarding flows a user is waiting on (/api/kyc/analyze, /agents/orchestrate)
+- bulk: surveillance and batch work that can absorb queueing delay
+
+Lanes are served by smooth weighted round-robin, so interactive traffic gets the
+larger share under contention while bulk work still makes progress.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Deque, Literal, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+Priority = Literal["interactive", "bulk"]
+
+# Rough characters-per-token ratio used to estimate prompt size before sending
+CHARS_PER_TOKEN = 4
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+def estimate_tokens(messages, max_tokens: Optional[int] = None) -> int:
+    """Estimate the quota cost (prompt + completion tokens) of a chat request"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    completion = max_tokens if max_tokens is not None else DEFAULT_COMPLETION_TOKENS
+    return prompt_chars // CHARS_PER_TOKEN + completion
+
+
+class TokenBucket:
+    """Continuously refilling token bucket; a rate of 0 disables the limit"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        if self.unlimited:
+            return
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+
+class _Lane:
+    """Queue and statistics for one priority lane"""
+
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = max(1, weight)
+        self.queue: Deque[tuple] = deque()
+        self.current_weight = 0
+        self.admitted = 0
+        self.cancelled = 0
+        self.wait_times: Deque[float] = deque(maxlen=1000)
+        self.max_wait = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self.wait_times)
+        return {
+            "weight": self.weight,
+            "queue_depth": len(self.queue),
+            "admitted": self.admitted,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+            "p95_wait_ms": round(waits[int(0.95 * (len(waits) - 1))] * 1000, 2) if waits else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2)
+        }
+
+
+class LLMScheduler:
+    """Priority-lane scheduler enforcing request and token rate limits"""
+
+    def __init__(self):
+        self.request_bucket = TokenBucket(settings.LLM_RATE_LIMIT_RPM, settings.LLM_RATE_LIMIT_BURST_SECONDS)
+        self.token_bucket = TokenBucket(settings.LLM_RATE_LIMIT_TPM, settings.LLM_RATE_LIMIT_BURST_SECONDS)
+        self.lanes: Dict[str, _Lane] = {
+            "interactive": _Lane("interactive", settings.LLM_INTERACTIVE_WEIGHT),
+            "bulk": _Lane("bulk", settings.LLM_BULK_WEIGHT),
+        }
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: Priority = "interactive", estimated_tokens: int = 0) -> float:
+        """
+        Wait until the request may be sent to the provider
+
+        Args:
+            priority: Lane to queue in
+            estimated_tokens: Estimated prompt + completion tokens
+
+        Returns:
+            Seconds spent queued
+        """
+        lane = self.lanes.get(priority, self.lanes["interactive"])
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        lane.queue.append((future, estimated_tokens, time.monotonic()))
+        self._pump()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            lane.cancelled += 1
+            # Give the freed position to the next waiter
+            self._pump()
+            raise
+
+    def _pick_lane(self) -> Optional[_Lane]:
+        """Smooth weighted round-robin over non-empty lanes (state is committed on admit)"""
+        candidates = [lane for lane in self.lanes.values() if lane.queue]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda lane: lane.current_weight + lane.weight)
+
+    def _commit_pick(self, picked: _Lane):
+        candidates = [lane for lane in self.lanes.values() if lane.queue]
+        total = sum(lane.weight for lane in candidates)
+        for lane in candidates:
+            lane.current_weight += lane.weight
+        picked.current_weight -= total
+
+    def _pump(self):
+        """Admit as many queued requests as the buckets allow, then arm a refill timer"""
+        while True:
+            lane = self._pick_lane()
+            if lane is None:
+                return
+            future, tokens, enqueued_at = lane.queue[0]
+            if future.done():
+                lane.queue.popleft()
+                continue
+
+            now = time.monotonic()
+            wait = max(
+                self.request_bucket.time_until(1, now),
+                self.token_bucket.time_until(tokens, now)
+            )
+            if wait > 0:
+                self._arm_timer(future.get_loop(), wait)
+                return
+
+            self.request_bucket.consume(1, now)
+            self.token_bucket.consume(tokens, now)
+            self._commit_pick(lane)
+            lane.queue.popleft()
+
+            waited = now - enqueued_at
+            lane.admitted += 1
+            lane.wait_times.append(waited)
+            lane.max_wait = max(lane.max_wait, waited)
+            future.set_result(waited)
+
+    def _arm_timer(self, loop: asyncio.AbstractEventLoop, delay: float):
+        if self._timer is not None and not self._timer.cancelled():
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._pump()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-lane queue depth and wait times plus bucket configuration"""
+        now = time.monotonic()
+        self.request_bucket._refill(now)
+        self.token_bucket._refill(now)
+        return {
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+            "limits": {
+                "requests_per_minute": settings.LLM_RATE_LIMIT_RPM,
+                "tokens_per_minute": settings.LLM_RATE_LIMIT_TPM,
+                "burst_seconds": settings.LLM_RATE_LIMIT_BURST_SECONDS
+            },
+            "available": {
+                "requests": None if self.request_bucket.unlimited else round(self.request_bucket.tokens, 2),
+                "tokens": None if self.token_bucket.unlimited else round(self.token_bucket.tokens, 2)
+            }
+        }
+
+
+# Global instance
+llm_scheduler = LLMScheduler()
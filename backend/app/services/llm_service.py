@@ -1,47 +1,42 @@
 import json
 import logging
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
-from ..config import settings
+from typing import Dict, Any, Optional, List, AsyncIterator
+from .llm_gateway import llm_gateway, is_json_response
+from .llm_scheduler import Priority
 
 logger = logging.getLogger(__name__)
 
+# Fragment size used when replaying mock responses as a stream
+MOCK_STREAM_CHUNK_CHARS = 16
+
 
 class LLMService:
     """Service for interacting with OpenAI API for KYC, Risk, and Insights analysis"""
     
     def __init__(self):
-        self.client = None
-        self.mock_mode = False
+        self.gateway = llm_gateway
+        self.mock_mode = not llm_gateway.enabled
         
-        if settings.OPENAI_API_KEY and settings.OPENAI_API_KEY != "":
-            try:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-                logger.info("OpenAI client initialized successfully")
-            except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI client: {e}. Using mock mode.")
-                self.mock_mode = True
-        else:
+        if self.mock_mode:
             logger.warning("No OpenAI API key provided. Using mock mode.")
-            self.mock_mode = True
     
-    def _call_llm(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_llm(self, system_prompt: str, user_prompt: str) -> str:
         """Generic method to call OpenAI API"""
-        if self.mock_mode or not self.client:
+        if self.mock_mode:
             logger.info("Mock mode: returning placeholder response")
             return self._get_mock_response(system_prompt, user_prompt)
         
         try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            return await self.gateway.complete(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                max_tokens=2000
+                max_tokens=2000,
+                template_type="LLM_SERVICE",
+                cache_validator=is_json_response
             )
-            return response.choices[0].message.content
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
             return self._get_mock_response(system_prompt, user_prompt)
@@ -91,7 +86,14 @@ class LLMService:
                 ]
             })
     
-    async def generate_completion(self, prompt: str, temperature: float = 0.3, max_tokens: int = 500) -> str:
+    async def generate_completion(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 500,
+        timeout: Optional[float] = None,
+        priority: Priority = "interactive"
+    ) -> str:
         """
         Generate a completion from the LLM.
         Used by agent orchestrator.
@@ -100,11 +102,13 @@ class LLMService:
             prompt: The prompt to send to the LLM
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            timeout: Optional per-call timeout in seconds
+            priority: Scheduler lane for the call
             
         Returns:
             String response from LLM
         """
-        if self.mock_mode or not self.client:
+        if self.mock_mode:
             logger.info("Mock mode: returning placeholder response")
             
             # Check if this is a compliance decision request
@@ -140,15 +144,17 @@ class LLMService:
             })
         
         try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+            return await self.gateway.complete(
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                timeout=timeout,
+                template_type="AGENT_COMPLETION",
+                cache_validator=is_json_response,
+                priority=priority
             )
-            return response.choices[0].message.content
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
             return json.dumps({
@@ -156,7 +162,59 @@ class LLMService:
                 "fallback": True
             })
     
-    def analyze_kyc(self, kyc_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def stream_completion(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        max_tokens: int = 500,
+        timeout: Optional[float] = None,
+        priority: Priority = "interactive"
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from the LLM as content deltas.
+        Used by the orchestrator's streaming mode.
+        
+        Args:
+            prompt: The prompt to send to the LLM
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            timeout: Optional per-call timeout in seconds
+            priority: Scheduler lane for the call
+            
+        Yields:
+            Response text fragments in order
+        """
+        if self.mock_mode:
+            # Replay the mock response in small fragments so streaming clients behave as with a real model
+            response = await self.generate_completion(prompt, temperature, max_tokens, timeout, priority)
+            for start in range(0, len(response), MOCK_STREAM_CHUNK_CHARS):
+                yield response[start:start + MOCK_STREAM_CHUNK_CHARS]
+            return
+        
+        emitted = False
+        try:
+            async for delta in self.gateway.stream(
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout,
+                template_type="AGENT_COMPLETION",
+                cache_validator=is_json_response,
+                priority=priority
+            ):
+                emitted = True
+                yield delta
+        except Exception as e:
+            logger.error(f"LLM streaming call failed: {e}")
+            if not emitted:
+                yield json.dumps({
+                    "error": "LLM call failed",
+                    "fallback": True
+                })
+    
+    async def analyze_kyc(self, kyc_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze KYC data and generate risk assessment
         
@@ -200,7 +258,7 @@ KYC Notes/Documentation:
 
 Provide your analysis in the required JSON format."""
 
-        response_text = self._call_llm(system_prompt, user_prompt)
+        response_text = await self._call_llm(system_prompt, user_prompt)
         
         try:
             # Try to parse JSON from response
@@ -226,7 +284,7 @@ Provide your analysis in the required JSON format."""
                 "kyc_summary": "Automated KYC analysis incomplete. Please conduct manual review of client documentation."
             }
     
-    def analyze_risk(self, activity_log: str, client_name: Optional[str] = None) -> Dict[str, Any]:
+    async def analyze_risk(self, activity_log: str, client_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze activity logs for risk signals
         
@@ -268,7 +326,7 @@ Do not include any text before or after the JSON object."""
 
 Provide your risk analysis in the required JSON format."""
 
-        response_text = self._call_llm(system_prompt, user_prompt)
+        response_text = await self._call_llm(system_prompt, user_prompt)
         
         try:
             # Parse JSON from response
@@ -291,7 +349,7 @@ Provide your risk analysis in the required JSON format."""
                 "next_steps": "Please conduct manual review of the activity log by compliance team."
             }
     
-    def generate_insights(
+    async def generate_insights(
         self,
         client_data: Dict[str, Any],
         risk_alerts: List[Dict[str, Any]]
@@ -346,7 +404,7 @@ RISK ALERTS:
 
 Provide insights in the required JSON format."""
 
-        response_text = self._call_llm(system_prompt, user_prompt)
+        response_text = await self._call_llm(system_prompt, user_prompt)
         
         try:
             # Parse JSON from response
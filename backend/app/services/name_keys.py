@@ -0,0 +1,639 @@
+"""
+Name Keys
+Script-independent normalization and blocking keys for person and entity names,
+shared by watch-list screening (name_screening.py) and client deduplication
+(client_dedup.py).
+
+Names are first transliterated to Latin:
+- Cyrillic, Greek, Arabic/Persian and Hebrew letters by character tables
+- Hangul syllables by Revised Romanization (decomposed into jamo); the family
+  name (first syllable) becomes its own token
+- Japanese kana by Hepburn romanization
+- Latin accents are folded (NFKD, combining marks removed)
+
+Chinese characters cannot be romanized without a pronunciation dictionary; they
+are kept as they are, so Han names block and match against Han names.
+
+Blocking keys group names that are likely the same person, so comparisons are
+only made within a block instead of against every stored name:
+- t:<transliterated name>          exact match after transliteration
+- s:<sorted tokens>                 the same tokens in any order
+- p:<Double Metaphone code>         per token, primary and alternate code
+- k:<consonant skeleton>            per token; Arabic and Hebrew are written without
+                                    short vowels, so "mhmd" only meets "mohammed" here
+- i:<sorted initials>               initials of names with two or more tokens
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import FrozenSet, List, Tuple
+
+# Double Metaphone codes are truncated to this length (as in the original algorithm)
+METAPHONE_LENGTH = 4
+
+# Tokens shorter than this get no phonetic key (initials, particles)
+MIN_PHONETIC_TOKEN = 2
+
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
+    "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "shch", "ъ": "", "ы": "y",
+    "ь": "", "э": "e", "ю": "yu", "я": "ya",
+    # Ukrainian, Belarusian, Serbian, Macedonian
+    "є": "ye", "і": "i", "ї": "yi", "ґ": "g", "ў": "u", "ђ": "dj", "ј": "j", "љ": "lj", "њ": "nj",
+    "ћ": "c", "џ": "dz", "ѓ": "gj", "ќ": "kj", "ѕ": "dz"
+}
+
+_GREEK = {
+    "α": "a", "β": "v", "γ": "g", "δ": "d", "ε": "e", "ζ": "z", "η": "i", "θ": "th", "ι": "i", "κ": "k",
+    "λ": "l", "μ": "m", "ν": "n", "ξ": "x", "ο": "o", "π": "p", "ρ": "r", "σ": "s", "ς": "s", "τ": "t",
+    "υ": "y", "φ": "f", "χ": "ch", "ψ": "ps", "ω": "o"
+}
+
+_ARABIC = {
+    "ا": "a", "أ": "a", "إ": "i", "آ": "a", "ٱ": "a", "ب": "b", "ت": "t", "ث": "th", "ج": "j", "ح": "h",
+    "خ": "kh", "د": "d", "ذ": "dh", "ر": "r", "ز": "z", "س": "s", "ش": "sh", "ص": "s", "ض": "d", "ط": "t",
+    "ظ": "z", "ع": "", "غ": "gh", "ف": "f", "ق": "q", "ك": "k", "ل": "l", "م": "m", "ن": "n", "ه": "h",
+    "ة": "a", "و": "w", "ي": "y", "ى": "a", "ء": "", "ؤ": "", "ئ": "",
+    # Persian and Urdu letters
+    "پ": "p", "چ": "ch", "ژ": "zh", "گ": "g", "ک": "k", "ی": "y", "ٹ": "t", "ڈ": "d", "ڑ": "r", "ں": "n", "ہ": "h", "ے": "e"
+}
+
+_HEBREW = {
+    "א": "", "ב": "b", "ג": "g", "ד": "d", "ה": "h", "ו": "v", "ז": "z", "ח": "kh", "ט": "t", "י": "y",
+    "כ": "k", "ך": "k", "ל": "l", "מ": "m", "ם": "m", "נ": "n", "ן": "n", "ס": "s", "ע": "", "פ": "p",
+    "ף": "f", "צ": "ts", "ץ": "ts", "ק": "k", "ר": "r", "ש": "sh", "ת": "t"
+}
+
+_KANA_ROWS = {
+    "": "aiueo", "k": "かきくけこ", "s": "さしすせそ", "t": "たちつてと", "n": "なにぬねの", "h": "はひふへほ",
+    "m": "まみむめも", "y": "や ゆ よ", "r": "らりるれろ", "w": "わ   を", "g": "がぎぐげご", "z": "ざじずぜぞ",
+    "d": "だぢづでど", "b": "ばびぶべぼ", "p": "ぱぴぷぺぽ"
+}
+_KANA = {"あ": "a", "い": "i", "う": "u", "え": "e", "お": "o", "ん": "n", "ゐ": "i", "ゑ": "e"}
+for _consonant, _row in _KANA_ROWS.items():
+    if _consonant:
+        for _kana, _vowel in zip(_row, "aiueo"):
+            if _kana != " ":
+                _KANA[_kana] = _consonant + _vowel
+_KANA.update({"し": "shi", "ち": "chi", "つ": "tsu", "ふ": "fu", "じ": "ji", "ぢ": "ji", "づ": "zu", "を": "o"})
+_SMALL_KANA = {"ゃ": "ya", "ゅ": "yu", "ょ": "yo", "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o"}
+_KATAKANA_OFFSET = ord("ア") - ord("あ")
+
+_HANGUL_INITIALS = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+_HANGUL_MEDIALS = [
+    "a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we", "wi", "yu",
+    "eu", "ui", "i"
+]
+_HANGUL_FINALS = [
+    "", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "l", "l", "l", "p", "l", "m", "p", "p", "t", "t",
+    "ng", "t", "t", "k", "t", "p", "t"
+]
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+
+_LETTER_TABLE = {**_CYRILLIC, **_GREEK, **_ARABIC, **_HEBREW}
+
+# Greek vowel digraphs read as one sound
+_GREEK_DIGRAPHS = {"ου": "ou", "αυ": "av", "ευ": "ev"}
+
+# Skeleton: vowels and weak consonants dropped, similar consonants merged, repeats collapsed
+_SKELETON_DROP_RE = re.compile(r"[aeiouyhw]")
+_SKELETON_MAP = str.maketrans({"c": "k", "q": "k", "z": "s", "v": "f"})
+_REPEAT_RE = re.compile(r"(.)\1+")
+
+
+def _hangul(syllable: str) -> str:
+    offset = ord(syllable) - _HANGUL_FIRST
+    initial, rest = divmod(offset, 21 * 28)
+    medial, final = divmod(rest, 28)
+    return _HANGUL_INITIALS[initial] + _HANGUL_MEDIALS[medial] + _HANGUL_FINALS[final]
+
+
+def _kana(text: str, start: int) -> Tuple[str, int]:
+    """Romanization of the kana sequence starting at ``start``, and where it ends"""
+    parts: List[str] = []
+    position = start
+    double_next = False
+    while position < len(text):
+        char = text[position]
+        code = ord(char)
+        if 0x30A1 <= code <= 0x30F6:
+            char = chr(code - _KATAKANA_OFFSET)
+        if char in ("っ", "ッ"):
+            double_next = True
+        elif char == "ー":
+            pass
+        elif char in _SMALL_KANA and parts:
+            small = _SMALL_KANA[char]
+            previous = parts[-1]
+            # き + ゃ = kya, し + ゃ = sha, ち + ゃ = cha, じ + ゃ = ja
+            if small[0] == "y" and previous.endswith("i"):
+                stem = previous[:-1]
+                parts[-1] = stem + (small[1:] if stem in ("sh", "ch", "j") else small)
+            else:
+                parts[-1] = previous[:-1] + small
+        elif char in _KANA:
+            syllable = _KANA[char]
+            if double_next and syllable[0] not in "aiueon":
+                syllable = syllable[0] + syllable
+            double_next = False
+            parts.append(syllable)
+        else:
+            break
+        position += 1
+    return "".join(parts), position
+
+
+def _is_kana(char: str) -> bool:
+    return "ぁ" <= char <= "ヿ"
+
+
+@lru_cache(maxsize=65536)
+def transliterate(name: str) -> str:
+    """Latin form of a name: lowercase, accents folded, other scripts romanized"""
+    if name.isascii():
+        return name.lower()
+    # NFKD separates accents (and Greek tonos) from their letters, and Hangul syllables are kept whole by NFC first
+    text = unicodedata.normalize("NFC", name)
+    parts: List[str] = []
+    position = 0
+    while position < len(text):
+        char = text[position]
+        lower = char.lower()
+        if _HANGUL_FIRST <= ord(char) <= _HANGUL_LAST:
+            syllables = []
+            while position < len(text) and _HANGUL_FIRST <= ord(text[position]) <= _HANGUL_LAST:
+                syllables.append(_hangul(text[position]))
+                position += 1
+            # Korean names are written without spaces: family name first
+            if 2 <= len(syllables) <= 4:
+                parts.append(f"{syllables[0]} {''.join(syllables[1:])}")
+            else:
+                parts.append("".join(syllables))
+            continue
+        if _is_kana(char):
+            romanized, position = _kana(text, position)
+            parts.append(romanized)
+            if position < len(text) and _is_kana(text[position]):
+                position += 1
+            continue
+        base = _base(lower)
+        if base in ("ο", "α", "ε") and position + 1 < len(text):
+            digraph = _GREEK_DIGRAPHS.get(base + _base(text[position + 1].lower()))
+            if digraph:
+                parts.append(digraph)
+                position += 2
+                continue
+        parts.append("".join(_LETTER_TABLE.get(c, c) for c in base))
+        position += 1
+    return "".join(parts)
+
+
+def _base(char: str) -> str:
+    """A character without its accents (compatibility forms expanded)"""
+    return "".join(c for c in unicodedata.normalize("NFKD", char) if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def double_metaphone(word: str) -> Tuple[str, str]:
+    """
+    Double Metaphone codes (primary, alternate) of one ASCII word
+
+    Port of Lawrence Philips' algorithm; the alternate code equals the primary one
+    unless the word has a second common pronunciation (Schmidt: XMT / SMT).
+    """
+    word = word.upper()
+    length = len(word)
+    if not length:
+        return "", ""
+    last = length - 1
+    padded = word + " " * 6
+    primary: List[str] = []
+    secondary: List[str] = []
+    slavo_germanic = any(part in word for part in ("W", "K", "CZ", "WITZ"))
+
+    def add(main: str, alternate: str = None):
+        primary.append(main)
+        secondary.append(main if alternate is None else alternate)
+
+    def at(position: int, size: int, *options: str) -> bool:
+        if position < 0:
+            return False
+        return padded[position:position + size] in options
+
+    def char(position: int) -> str:
+        return padded[position] if 0 <= position < len(padded) else ""
+
+    def vowel(position: int) -> bool:
+        return 0 <= position < length and word[position] in "AEIOUY"
+
+    current = 0
+    if at(0, 2, "GN", "KN", "PN", "WR", "PS"):
+        current += 1
+    if word[0] == "X":
+        # Xavier
+        add("S")
+        current += 1
+
+    while current < length and (len("".join(primary)) < METAPHONE_LENGTH or len("".join(secondary)) < METAPHONE_LENGTH):
+        c = word[current]
+        if c in "AEIOUY":
+            if current == 0:
+                add("A")
+            current += 1
+        elif c == "B":
+            add("P")
+            current += 2 if char(current + 1) == "B" else 1
+        elif c == "C":
+            current = _metaphone_c(word, current, at, char, vowel, add)
+        elif c == "D":
+            if at(current, 2, "DG"):
+                if at(current + 2, 1, "I", "E", "Y"):
+                    # edge
+                    add("J")
+                    current += 3
+                else:
+                    # edgar
+                    add("TK")
+                    current += 2
+            elif at(current, 2, "DT", "DD"):
+                add("T")
+                current += 2
+            else:
+                add("T")
+                current += 1
+        elif c == "F":
+            add("F")
+            current += 2 if char(current + 1) == "F" else 1
+        elif c == "G":
+            current = _metaphone_g(word, current, at, char, vowel, add, slavo_germanic)
+        elif c == "H":
+            # Kept only first or between vowels
+            if (current == 0 or vowel(current - 1)) and vowel(current + 1):
+                add("H")
+                current += 2
+            else:
+                current += 1
+        elif c == "J":
+            if at(current, 4, "JOSE") or at(0, 4, "SAN "):
+                # Spanish: Jose, San Jacinto
+                if (current == 0 and char(current + 4) == " ") or at(0, 4, "SAN "):
+                    add("H")
+                else:
+                    add("J", "H")
+            elif current == 0:
+                # Yankelovich / Jankelowicz
+                add("J", "A")
+            elif vowel(current - 1) and not slavo_germanic and char(current + 1) in ("A", "O"):
+                # Spanish: bajador
+                add("J", "H")
+            elif current == last:
+                add("J", "")
+            elif not at(current + 1, 1, "L", "T", "K", "S", "N", "M", "B", "Z") and not at(current - 1, 1, "S", "K", "L"):
+                add("J")
+            current += 2 if char(current + 1) == "J" else 1
+        elif c in "KQ":
+            add("K")
+            current += 2 if char(current + 1) == c else 1
+        elif c == "L":
+            if char(current + 1) == "L":
+                # Spanish: cabrillo, gallegos
+                if (current == length - 3 and at(current - 1, 4, "ILLO", "ILLA", "ALLE")) or (
+                    (at(last - 1, 2, "AS", "OS") or at(last, 1, "A", "O")) and at(current - 1, 4, "ALLE")
+                ):
+                    add("L", "")
+                else:
+                    add("L")
+                current += 2
+            else:
+                add("L")
+                current += 1
+        elif c == "M":
+            add("M")
+            if (at(current - 1, 3, "UMB") and (current + 1 == last or at(current + 2, 2, "ER"))) or char(current + 1) == "M":
+                current += 2
+            else:
+                current += 1
+        elif c == "N":
+            add("N")
+            current += 2 if char(current + 1) == "N" else 1
+        elif c == "P":
+            if char(current + 1) == "H":
+                add("F")
+                current += 2
+            else:
+                # campbell, raspberry
+                add("P")
+                current += 2 if at(current + 1, 1, "P", "B") else 1
+        elif c == "R":
+            # French: rogier, but not hochmeier
+            if current == last and not slavo_germanic and at(current - 2, 2, "IE") and not at(current - 4, 2, "ME", "MA"):
+                add("", "R")
+            else:
+                add("R")
+            current += 2 if char(current + 1) == "R" else 1
+        elif c == "S":
+            current = _metaphone_s(word, current, at, char, vowel, add, slavo_germanic)
+        elif c == "T":
+            if at(current, 4, "TION") or at(current, 3, "TIA", "TCH"):
+                add("X")
+                current += 3
+            elif at(current, 2, "TH") or at(current, 3, "TTH"):
+                # Thomas, Thames, or Germanic
+                if at(current + 2, 2, "OM", "AM") or at(0, 4, "VAN ", "VON ") or at(0, 3, "SCH"):
+                    add("T")
+                else:
+                    add("0", "T")
+                current += 2
+            else:
+                add("T")
+                current += 2 if at(current + 1, 1, "T", "D") else 1
+        elif c == "V":
+            add("F")
+            current += 2 if char(current + 1) == "V" else 1
+        elif c == "W":
+            if at(current, 2, "WR"):
+                add("R")
+                current += 2
+                continue
+            if current == 0 and (vowel(current + 1) or at(current, 2, "WH")):
+                # Wasserman / Vasserman, Uomo / Womo
+                add("A", "F") if vowel(current + 1) else add("A")
+            if (current == last and vowel(current - 1)) or at(current - 1, 5, "EWSKI", "EWSKY", "OWSKI", "OWSKY") or at(0, 3, "SCH"):
+                # Arnow / Arnoff
+                add("", "F")
+                current += 1
+            elif at(current, 4, "WICZ", "WITZ"):
+                # Polish: filipowicz
+                add("TS", "FX")
+                current += 4
+            else:
+                current += 1
+        elif c == "X":
+            # French: breaux
+            if not (current == last and (at(current - 3, 3, "IAU", "EAU") or at(current - 2, 2, "AU", "OU"))):
+                add("KS")
+            current += 2 if at(current + 1, 1, "C", "X") else 1
+        elif c == "Z":
+            if char(current + 1) == "H":
+                # Chinese pinyin: zhao
+                add("J")
+                current += 2
+            else:
+                if at(current + 1, 2, "ZO", "ZI", "ZA") or (slavo_germanic and current > 0 and char(current - 1) != "T"):
+                    add("S", "TS")
+                else:
+                    add("S")
+                current += 2 if char(current + 1) == "Z" else 1
+        else:
+            current += 1
+
+    return "".join(primary)[:METAPHONE_LENGTH], "".join(secondary)[:METAPHONE_LENGTH]
+
+
+def _metaphone_c(word, current, at, char, vowel, add) -> int:
+    """Double Metaphone rules for C; returns the next position"""
+    # Germanic: bacher, macher
+    if (
+        current > 1 and not vowel(current - 2) and at(current - 1, 3, "ACH")
+        and char(current + 2) != "I" and (char(current + 2) != "E" or at(current - 2, 6, "BACHER", "MACHER"))
+    ):
+        add("K")
+        return current + 2
+    if current == 0 and at(current, 6, "CAESAR"):
+        add("S")
+        return current + 2
+    if at(current, 4, "CHIA"):
+        # Italian: chianti
+        add("K")
+        return current + 2
+    if at(current, 2, "CH"):
+        if current > 0 and at(current, 4, "CHAE"):
+            # michael
+            add("K", "X")
+            return current + 2
+        if current == 0 and (at(current + 1, 5, "HARAC", "HARIS") or at(current + 1, 3, "HOR", "HYM", "HIA", "HEM")) and not at(0, 5, "CHORE"):
+            # Greek roots: chemistry, chorus
+            add("K")
+            return current + 2
+        if (
+            at(0, 4, "VAN ", "VON ") or at(0, 3, "SCH")
+            or at(current - 2, 6, "ORCHES", "ARCHIT", "ORCHID")
+            or at(current + 2, 1, "T", "S")
+            or ((at(current - 1, 1, "A", "O", "U", "E") or current == 0)
+                and at(current + 2, 1, "L", "R", "N", "M", "B", "H", "F", "V", "W", " "))
+        ):
+            add("K")
+        elif current > 0:
+            add("K") if at(0, 2, "MC") else add("X", "K")
+        else:
+            add("X")
+        return current + 2
+    if at(current, 2, "CZ") and not at(current - 2, 4, "WICZ"):
+        # czerny
+        add("S", "X")
+        return current + 2
+    if at(current + 1, 3, "CIA"):
+        # focaccia
+        add("X")
+        return current + 3
+    if at(current, 2, "CC") and not (current == 1 and word[0] == "M"):
+        # bellocchio, but not bacchus
+        if at(current + 2, 1, "I", "E", "H") and not at(current + 2, 2, "HU"):
+            if (current == 1 and char(current - 1) == "A") or at(current - 1, 5, "UCCEE", "UCCES"):
+                # accident, accede, succeed
+                add("KS")
+            else:
+                # bacci, bertucci
+                add("X")
+            return current + 3
+        add("K")
+        return current + 2
+    if at(current, 2, "CK", "CG", "CQ"):
+        add("K")
+        return current + 2
+    if at(current, 2, "CI", "CE", "CY"):
+        add("S", "X") if at(current, 3, "CIO", "CIE", "CIA") else add("S")
+        return current + 2
+    add("K")
+    if at(current + 1, 2, " C", " Q", " G"):
+        # mac caffrey, mac gregor
+        return current + 3
+    if at(current + 1, 1, "C", "K", "Q") and not at(current + 1, 2, "CE", "CI"):
+        return current + 2
+    return current + 1
+
+
+def _metaphone_g(word, current, at, char, vowel, add, slavo_germanic) -> int:
+    """Double Metaphone rules for G; returns the next position"""
+    if char(current + 1) == "H":
+        if current > 0 and not vowel(current - 1):
+            add("K")
+            return current + 2
+        if current == 0:
+            # ghislane, ghiradelli
+            add("J") if char(current + 2) == "I" else add("K")
+            return current + 2
+        # Parker's rule: hugh, bough
+        if (
+            (current > 1 and at(current - 2, 1, "B", "H", "D"))
+            or (current > 2 and at(current - 3, 1, "B", "H", "D"))
+            or (current > 3 and at(current - 4, 1, "B", "H"))
+        ):
+            return current + 2
+        if current > 2 and char(current - 1) == "U" and at(current - 3, 1, "C", "G", "L", "R", "T"):
+            # laugh, mclaughlin, cough, rough
+            add("F")
+        elif current > 0 and char(current - 1) != "I":
+            add("K")
+        return current + 2
+    if char(current + 1) == "N":
+        if current == 1 and vowel(0) and not slavo_germanic:
+            add("KN", "N")
+        elif not at(current + 2, 2, "EY") and char(current + 1) != "Y" and not slavo_germanic:
+            # not cagney
+            add("N", "KN")
+        else:
+            add("KN")
+        return current + 2
+    if at(current + 1, 2, "LI") and not slavo_germanic:
+        # tagliaro
+        add("KL", "L")
+        return current + 2
+    if current == 0 and (char(current + 1) == "Y" or at(current + 1, 2, "ES", "EP", "EB", "EL", "EY", "IB", "IL", "IN", "IE", "EI", "ER")):
+        # -ges-, -gep-, -gel-, -gie- at the beginning
+        add("K", "J")
+        return current + 2
+    if (
+        (at(current + 1, 2, "ER") or char(current + 1) == "Y")
+        and not at(0, 6, "DANGER", "RANGER", "MANGER")
+        and not at(current - 1, 1, "E", "I")
+        and not at(current - 1, 3, "RGY", "OGY")
+    ):
+        # -ger-, -gy-
+        add("K", "J")
+        return current + 2
+    if at(current + 1, 1, "E", "I", "Y") or at(current - 1, 4, "AGGI", "OGGI"):
+        # Italian: biaggi
+        if at(0, 4, "VAN ", "VON ") or at(0, 3, "SCH") or at(current + 1, 2, "ET"):
+            add("K")
+        elif at(current + 1, 4, "IER "):
+            add("J")
+        else:
+            add("J", "K")
+        return current + 2
+    add("K")
+    return current + 2 if char(current + 1) == "G" else current + 1
+
+
+def _metaphone_s(word, current, at, char, vowel, add, slavo_germanic) -> int:
+    """Double Metaphone rules for S; returns the next position"""
+    last = len(word) - 1
+    if at(current - 1, 3, "ISL", "YSL"):
+        # island, carlisle
+        return current + 1
+    if current == 0 and at(current, 5, "SUGAR"):
+        add("X", "S")
+        return current + 1
+    if at(current, 2, "SH"):
+        add("S") if at(current + 1, 4, "HEIM", "HOEK", "HOLM", "HOLZ") else add("X")
+        return current + 2
+    if at(current, 3, "SIO", "SIA") or at(current, 4, "SIAN"):
+        # Italian and Armenian
+        add("S") if slavo_germanic else add("S", "X")
+        return current + 3
+    if (current == 0 and at(current + 1, 1, "M", "N", "L", "W")) or at(current + 1, 1, "Z"):
+        # smith / schmidt, snider / schneider; Slavic -sz-
+        add("S", "X")
+        return current + 2 if at(current + 1, 1, "Z") else current + 1
+    if at(current, 2, "SC"):
+        if char(current + 2) == "H":
+            if at(current + 3, 2, "OO", "ER", "EN", "UY", "ED", "EM"):
+                # Dutch: school, schooner; schermerhorn, schenker
+                add("X", "SK") if at(current + 3, 2, "ER", "EN") else add("SK")
+            elif current == 0 and not vowel(3) and char(3) != "W":
+                add("X", "S")
+            else:
+                add("X")
+            return current + 3
+        add("S") if at(current + 2, 1, "I", "E", "Y") else add("SK")
+        return current + 3
+    if current == last and at(current - 2, 2, "AI", "OI"):
+        # French: resnais, artois
+        add("", "S")
+    else:
+        add("S")
+    return current + 2 if at(current + 1, 1, "S", "Z") else current + 1
+
+
+def phonetic_codes(token: str) -> List[str]:
+    """Distinct Double Metaphone codes of a Latin token (none for short or non-ASCII tokens)"""
+    if len(token) < MIN_PHONETIC_TOKEN or not token.isascii() or not token.isalpha():
+        return []
+    primary, alternate = double_metaphone(token)
+    return [code for code in dict.fromkeys((primary, alternate)) if code]
+
+
+def consonant_skeleton(token: str) -> str:
+    """Consonants of a Latin token, similar ones merged: mohammed, muhammad and mhmd all give md"""
+    return _REPEAT_RE.sub(r"\1", _SKELETON_DROP_RE.sub("", token).translate(_SKELETON_MAP))
+
+
+@lru_cache(maxsize=65536)
+def token_codes(token: str) -> Tuple[str, ...]:
+    """Phonetic keys (p:) and consonant skeleton key (k:) of a token: tokens sharing a code sound alike"""
+    codes = [f"p:{code}" for code in phonetic_codes(token)]
+    if len(token) >= MIN_PHONETIC_TOKEN and token.isascii() and token.isalpha():
+        skeleton = consonant_skeleton(token)
+        if skeleton:
+            codes.append(f"k:{skeleton}")
+    return tuple(codes)
+
+
+@lru_cache(maxsize=65536)
+def _sound(token: str) -> Tuple[FrozenSet[str], str, bool]:
+    """Double Metaphone codes, consonant skeleton and whether a token has no vowels"""
+    skeleton = consonant_skeleton(token) if token.isascii() and token.isalpha() else ""
+    return frozenset(phonetic_codes(token)), skeleton, not any(vowel in token for vowel in "aeiou")
+
+
+def _alike(first: Tuple[FrozenSet[str], str, bool], second: Tuple[FrozenSet[str], str, bool]) -> bool:
+    if first[0] & second[0]:
+        return True
+    return (first[2] or second[2]) and bool(first[1]) and first[1] == second[1]
+
+
+def sound_alike(first: str, second: str) -> bool:
+    """
+    Whether two Latin tokens are pronounced alike: they share a Double Metaphone
+    code, or one has no vowels (an Arabic or Hebrew romanization) and their
+    consonant skeletons are equal
+    """
+    return first == second or _alike(_sound(first), _sound(second))
+
+
+def phonetic_similarity(first: List[str], second: List[str]) -> float:
+    """Share (0-1) of the tokens of two names that sound like a token of the other name"""
+    if not first or not second:
+        return 0.0
+    first_sounds, second_sounds = [_sound(token) for token in first], [_sound(token) for token in second]
+    matched = sum(any(_alike(sound, other) for other in second_sounds) for sound in first_sounds)
+    matched += sum(any(_alike(sound, other) for other in first_sounds) for sound in second_sounds)
+    return matched / (len(first) + len(second))
+
+
+def blocking_keys(normalized: str) -> List[str]:
+    """
+    Blocking keys of a normalized (transliterated) name
+
+    Names sharing a key are compared; names sharing none are never candidates.
+    """
+    tokens = normalized.split()
+    if not tokens:
+        return []
+    keys = [f"t:{normalized}", f"s:{' '.join(sorted(tokens))}"]
+    keys.extend(code for token in tokens for code in token_codes(token))
+    if len(tokens) >= 2:
+        keys.append(f"i:{''.join(sorted(token[0] for token in tokens))}")
+    return list(dict.fromkeys(keys))
@@ -0,0 +1,739 @@
+"""
+Name Screening Engine
+Local fuzzy screening of client names against loaded sanctions and PEP watch-lists,
+used by the Compliance Agent's screening tools.
+
+Every watch-list name and alias is normalized (transliterated to Latin, accents
+folded, case-folded, punctuation removed, see name_keys.py) and indexed twice in
+CSR inverted indexes: by its character trigrams (trigram bucket -> sorted alias
+positions) and by its blocking keys (sorted tokens, Double Metaphone codes,
+consonant skeletons and initials). Trigrams are taken per token, so the index is
+insensitive to name order ("Putin Vladimir" finds "Vladimir Putin").
+
+A query is screened in two steps:
+1. Candidates: prefix filtering over the query's rarest trigrams. An alias must
+   share at least MIN_TRIGRAM_OVERLAP of the query's trigrams to be a match, so
+   it has to appear in the postings of one of the (rarest) remaining ones; the
+   postings of common trigrams are never read. Aliases in the blocks of the
+   query's keys are added (blocks larger than MAX_KEY_BLOCK are skipped), so
+   "Muhammad" finds "Mohammed" and "Владимир Путин" finds "Vladimir Putin".
+2. Scoring: Jaro-Winkler over the candidates in one vectorized pass (as written
+   and with tokens sorted), token-set (Dice) overlap and phonetic token
+   agreement (scaled by PHONETIC_SCORE_SCALE). An alias scores the best of the
+   four; aliases of the same entry collapse to the best one.
+
+The index is a set of flat arrays. watchlist_ingest.py compiles list files into a
+versioned binary file holding them (string table, offsets, trigram postings),
+which screening processes memory-map instead of parsing and indexing the lists
+themselves: startup is near-instant and the pages are shared between processes.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+import numpy as np
+
+from ..config import settings
+from .name_keys import transliterate, blocking_keys, phonetic_similarity
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_SANCTIONS = "sanctions"
+CATEGORY_PEP = "pep"
+CATEGORIES = (CATEGORY_SANCTIONS, CATEGORY_PEP)
+
+# Trigram hash buckets (2^TRIGRAM_BITS); collisions only add candidates
+TRIGRAM_BITS = 21
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Fraction of the query's trigrams a candidate must share
+MIN_TRIGRAM_OVERLAP = 0.25
+
+# Blocking key hash buckets (2^KEY_BITS)
+KEY_BITS = 20
+
+# Key blocks with more aliases than this are too unspecific to add candidates
+MAX_KEY_BLOCK = 2048
+
+# Candidate ranking: a shared blocking key counts as this many shared trigrams
+KEY_WEIGHT = 3
+
+# Phonetic agreement alone never scores above this (it ignores spelling entirely)
+PHONETIC_SCORE_SCALE = 0.9
+
+# Characters of a name compared by Jaro-Winkler (longer names are truncated)
+MAX_NAME_CHARS = 64
+
+# Index file format (see ScreeningIndex.save)
+MAGIC = b"XBWL"
+FORMAT_VERSION = 2
+SECTION_ALIGNMENT = 64
+SECTIONS = (
+    "alias_entries", "alias_categories", "names_flat", "names_offsets", "sorted_flat", "sorted_offsets",
+    "postings", "indptr", "key_postings", "key_indptr", "entry_blob", "entry_offsets"
+)
+
+# Seconds between checks for a replaced index file
+INDEX_CHECK_INTERVAL_SECONDS = 5.0
+
+# Jaro-Winkler prefix bonus
+WINKLER_PREFIX = 4
+WINKLER_SCALE = 0.1
+
+_NON_ALNUM_RE = re.compile(r"[^\w]+|_")
+
+
+def normalize_name(name: str) -> str:
+    """Latin, case-folded, accent-free name with single spaces between alphanumeric tokens"""
+    return " ".join(_NON_ALNUM_RE.sub(" ", transliterate(name or "").casefold()).split())
+
+
+def _codes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Code points of texts as one flat uint32 array with CSR offsets"""
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    return flat, offsets
+
+
+def _trigram_text(normalized: str) -> str:
+    # Tokens padded by spaces on both sides: every trigram lies within one token
+    return " " + "  ".join(normalized.split()) + " "
+
+
+def _trigram_buckets(flat: np.ndarray, offsets: np.ndarray, bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed trigrams of every text in a CSR code array
+
+    Returns:
+        (text index, bucket) of every trigram occurrence
+    """
+    lengths = np.diff(offsets)
+    owners = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    positions = np.arange(len(flat), dtype=np.int64)
+    valid = positions + 2 < offsets[1:][owners]
+    starts = positions[valid]
+    key = (
+        (flat[starts].astype(np.uint64) << np.uint64(42))
+        | (flat[starts + 1].astype(np.uint64) << np.uint64(21))
+        | flat[starts + 2].astype(np.uint64)
+    )
+    buckets = (key * _HASH_MULTIPLIER) >> np.uint64(64 - bits)
+    return owners[valid], buckets.astype(np.int64)
+
+
+def _key_buckets(keys: List[str], bits: int) -> np.ndarray:
+    """Hash buckets of blocking keys"""
+    hashes = np.fromiter((zlib.crc32(key.encode("utf-8")) for key in keys), dtype=np.uint32, count=len(keys))
+    return (hashes >> np.uint32(32 - bits)).astype(np.int64)
+
+
+def _csr(rows: np.ndarray, columns: np.ndarray, bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Postings and indptr of unique (row bucket, column) pairs"""
+    pairs = np.sort((rows << 32) | columns)
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))] if len(pairs) else pairs
+    return (pairs & 0xFFFFFFFF).astype(np.int32), np.searchsorted(pairs >> 32, np.arange((1 << bits) + 1)).astype(np.int64)
+
+
+def _padded(flat: np.ndarray, offsets: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Zero-padded (len(rows), width) code matrix of some texts and their (truncated) lengths"""
+    starts = offsets[rows]
+    lengths = np.minimum(offsets[rows + 1] - starts, MAX_NAME_CHARS)
+    width = int(lengths.max()) if len(rows) else 0
+    columns = np.arange(width, dtype=np.int64)
+    inside = columns < lengths[:, None]
+    index = np.where(inside, starts[:, None] + columns, 0)
+    return np.where(inside, flat[index], 0).astype(np.uint32), lengths
+
+
+def jaro_winkler_many(query: np.ndarray, candidates: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Jaro-Winkler similarity of one string against many, vectorized over the candidates
+
+    Args:
+        query: uint32 code points of the query (non-empty, no zeros)
+        candidates: zero-padded uint32 code matrix (n, width)
+        lengths: candidate lengths (n,)
+    """
+    count, width = candidates.shape
+    query_length = len(query)
+    if count == 0 or query_length == 0:
+        return np.zeros(count)
+    rows = np.arange(count)
+    columns = np.arange(width)
+    window = np.maximum(np.maximum(lengths, query_length) // 2 - 1, 0)
+    used = np.zeros((count, width), dtype=bool)
+    match_at = np.full((count, query_length), -1, dtype=np.int64)
+
+    # Greedy matching, one query character at a time for all candidates
+    for i, char in enumerate(query):
+        low = np.maximum(i - window, 0)
+        high = np.minimum(i + window + 1, lengths)
+        allowed = (candidates == char) & ~used & (columns >= low[:, None]) & (columns < high[:, None])
+        first = allowed.argmax(axis=1)
+        found = allowed[rows, first]
+        used[rows[found], first[found]] = True
+        match_at[found, i] = first[found]
+
+    matched = match_at >= 0
+    matches = matched.sum(axis=1)
+    # Transpositions: matched characters in query order vs in candidate order
+    query_sequence = query[np.argsort(~matched, axis=1, kind="stable")]
+    candidate_positions = np.sort(np.where(matched, match_at, width), axis=1)
+    candidate_sequence = np.take_along_axis(candidates, np.minimum(candidate_positions, max(width - 1, 0)), axis=1)
+    in_sequence = np.arange(query_length) < matches[:, None]
+    transpositions = ((query_sequence != candidate_sequence) & in_sequence).sum(axis=1) / 2
+
+    safe_matches = np.maximum(matches, 1)
+    jaro = np.where(
+        matches > 0,
+        (matches / query_length + matches / np.maximum(lengths, 1) + (matches - transpositions) / safe_matches) / 3,
+        0.0
+    )
+
+    prefix_width = min(WINKLER_PREFIX, query_length, width)
+    same = candidates[:, :prefix_width] == query[:prefix_width]
+    prefix = np.cumprod(same, axis=1).sum(axis=1)
+    return jaro + prefix * WINKLER_SCALE * (1 - jaro)
+
+
+def _name_scores(
+    normalized: str, names_flat: np.ndarray, names_offsets: np.ndarray, sorted_flat: np.ndarray,
+    sorted_offsets: np.ndarray, rows: np.ndarray, row_tokens: List[List[str]]
+) -> np.ndarray:
+    """Best of the four similarities (see module docstring) of a normalized name to some rows of a name table"""
+    query_tokens = normalized.split()
+    query = np.frombuffer(normalized[:MAX_NAME_CHARS].encode("utf-32-le"), dtype=np.uint32)
+    sorted_query = " ".join(sorted(query_tokens))
+    sorted_codes = np.frombuffer(sorted_query[:MAX_NAME_CHARS].encode("utf-32-le"), dtype=np.uint32)
+    as_written = jaro_winkler_many(query, *_padded(names_flat, names_offsets, rows))
+    token_sorted = jaro_winkler_many(sorted_codes, *_padded(sorted_flat, sorted_offsets, rows))
+    query_set = frozenset(query_tokens)
+    token_set = np.fromiter(
+        (2 * len(query_set & set(tokens)) / (len(query_set) + len(set(tokens))) for tokens in row_tokens),
+        dtype=np.float64,
+        count=len(rows)
+    )
+    phonetic = np.fromiter(
+        (phonetic_similarity(query_tokens, tokens) for tokens in row_tokens),
+        dtype=np.float64,
+        count=len(rows)
+    ) * PHONETIC_SCORE_SCALE
+    return np.maximum(np.maximum(as_written, token_sorted), np.maximum(token_set, phonetic))
+
+
+def score_names(name: str, others: List[str]) -> np.ndarray:
+    """Similarity (0-1) of a name to each of other names, scored as watch-list candidates are"""
+    normalized = normalize_name(name)
+    names = [normalize_name(other) for other in others]
+    if not normalized or not names:
+        return np.zeros(len(names), dtype=np.float64)
+    names_flat, names_offsets = _codes(names)
+    sorted_flat, sorted_offsets = _codes([" ".join(sorted(other.split())) for other in names])
+    scores = _name_scores(
+        normalized, names_flat, names_offsets, sorted_flat, sorted_offsets,
+        np.arange(len(names), dtype=np.int64), [other.split() for other in names]
+    )
+    # Names that normalize to nothing match nothing
+    return np.where(np.fromiter((bool(other) for other in names), dtype=bool, count=len(names)), scores, 0.0)
+
+
+@dataclass
+class WatchlistEntry:
+    """One listed person or entity"""
+    entry_id: str
+    list_name: str  # e.g. "OFAC SDN List"
+    category: str  # sanctions or pep
+    name: str
+    aliases: List[str] = field(default_factory=list)
+    entity_type: str = "Individual"
+    programs: List[str] = field(default_factory=list)
+    countries: List[str] = field(default_factory=list)
+    provider: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WatchlistEntry":
+        return cls(
+            entry_id=str(data["id"]),
+            list_name=data["list"],
+            category=data.get("category", CATEGORY_SANCTIONS),
+            name=data["name"],
+            aliases=list(data.get("aliases") or []),
+            entity_type=data.get("entity_type") or "Individual",
+            programs=list(data.get("programs") or []),
+            countries=list(data.get("countries") or []),
+            provider=data.get("provider") or ""
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.entry_id,
+            "list": self.list_name,
+            "category": self.category,
+            "name": self.name,
+            "aliases": self.aliases,
+            "entity_type": self.entity_type,
+            "programs": self.programs,
+            "countries": self.countries,
+            "provider": self.provider
+        }
+
+
+def _aligned(size: int) -> int:
+    return -(-size // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+class ScreeningIndex:
+    """
+    Immutable trigram index over the names and aliases of a set of watch-list entries
+
+    All state is held in flat arrays (see SECTIONS), so an index is either built
+    in memory or memory-mapped from a file written by save(). Entries are stored
+    as a table of JSON records and decoded only for hits.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict[str, Any]):
+        self.alias_entries = arrays["alias_entries"]  # int32 entry of every alias
+        self.alias_categories = arrays["alias_categories"]  # int8 index into CATEGORIES
+        self.names_flat, self.names_offsets = arrays["names_flat"], arrays["names_offsets"]
+        self.sorted_flat, self.sorted_offsets = arrays["sorted_flat"], arrays["sorted_offsets"]
+        self.postings, self.indptr = arrays["postings"], arrays["indptr"]  # trigram bucket -> aliases (CSR)
+        self.key_postings, self.key_indptr = arrays["key_postings"], arrays["key_indptr"]  # key bucket -> aliases
+        self.entry_blob, self.entry_offsets = arrays["entry_blob"], arrays["entry_offsets"]
+        self.header = header
+        self.trigram_bits = header["trigram_bits"]
+        self.key_bits = header["key_bits"]
+        self.mapped_from: Optional[str] = None
+
+    @classmethod
+    def build(cls, entries: Iterable[WatchlistEntry], sources: Optional[List[str]] = None) -> "ScreeningIndex":
+        """Index entries, consuming them one at a time"""
+        names: List[str] = []
+        owners: List[int] = []
+        categories: List[int] = []
+        blob = io.BytesIO()
+        entry_offsets = [0]
+        lists: Dict[str, Dict[str, Any]] = {}
+        # The format is part of the version: a new normalization must not reuse results cached for the old one
+        digest = hashlib.sha256(f"format {FORMAT_VERSION}\n".encode("utf-8"))
+        for position, entry in enumerate(entries):
+            record = json.dumps(entry.to_dict(), ensure_ascii=False, sort_keys=True).encode("utf-8")
+            digest.update(record)
+            blob.write(record)
+            entry_offsets.append(blob.tell())
+            category = CATEGORIES.index(entry.category)
+            for alias in dict.fromkeys(normalize_name(name) for name in [entry.name, *entry.aliases]):
+                if alias:
+                    names.append(alias)
+                    owners.append(position)
+                    categories.append(category)
+            summary = lists.setdefault(entry.list_name, {
+                "name": entry.list_name,
+                "provider": entry.provider,
+                "category": entry.category,
+                "entries": 0
+            })
+            summary["entries"] += 1
+
+        names_flat, names_offsets = _codes(names)
+        sorted_flat, sorted_offsets = _codes([" ".join(sorted(name.split())) for name in names])
+        # Inverted indexes: unique (bucket, alias) pairs sorted by bucket
+        trigram_flat, trigram_offsets = _codes([_trigram_text(name) for name in names])
+        aliases, buckets = _trigram_buckets(trigram_flat, trigram_offsets, TRIGRAM_BITS)
+        postings, indptr = _csr(buckets, aliases, TRIGRAM_BITS)
+        alias_keys = [blocking_keys(name) for name in names]
+        key_owners = np.repeat(
+            np.arange(len(names), dtype=np.int64),
+            np.fromiter((len(keys) for keys in alias_keys), dtype=np.int64, count=len(names))
+        )
+        key_postings, key_indptr = _csr(
+            _key_buckets([key for keys in alias_keys for key in keys], KEY_BITS), key_owners, KEY_BITS
+        )
+        arrays = {
+            "alias_entries": np.asarray(owners, dtype=np.int32),
+            "alias_categories": np.asarray(categories, dtype=np.int8),
+            "names_flat": names_flat,
+            "names_offsets": names_offsets,
+            "sorted_flat": sorted_flat,
+            "sorted_offsets": sorted_offsets,
+            "postings": postings,
+            "indptr": indptr,
+            "key_postings": key_postings,
+            "key_indptr": key_indptr,
+            "entry_blob": np.frombuffer(blob.getvalue(), dtype=np.uint8),
+            "entry_offsets": np.asarray(entry_offsets, dtype=np.int64)
+        }
+        header = {
+            # Content version: changes whenever any entry changes
+            "list_version": digest.hexdigest()[:16],
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "lists": list(lists.values()),
+            "sources": sources or [],
+            "trigram_bits": TRIGRAM_BITS,
+            "key_bits": KEY_BITS
+        }
+        return cls(arrays, header)
+
+    def save(self, path: str):
+        """
+        Write the index to a file (atomically)
+
+        Layout: MAGIC, format version (uint32), header length (uint64), JSON header
+        (metadata and section table), then every section as raw little-endian
+        array data aligned to SECTION_ALIGNMENT bytes.
+        """
+        sections: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        for name in SECTIONS:
+            array = getattr(self, name)
+            sections[name] = {"dtype": array.dtype.str, "count": len(array), "offset": offset}
+            offset += _aligned(array.nbytes)
+        header = json.dumps({**self.header, "sections": sections}, ensure_ascii=False).encode("utf-8")
+        prefix = MAGIC + struct.pack("<IQ", FORMAT_VERSION, len(header))
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(prefix + header)
+            f.write(b"\0" * (_aligned(len(prefix) + len(header)) - len(prefix) - len(header)))
+            for name in SECTIONS:
+                data = np.ascontiguousarray(getattr(self, name)).tobytes()
+                f.write(data)
+                f.write(b"\0" * (_aligned(len(data)) - len(data)))
+        os.replace(temporary, path)
+
+    @classmethod
+    def open(cls, path: str) -> "ScreeningIndex":
+        """
+        Memory-map an index file written by save()
+
+        Nothing is parsed or copied: the arrays are views of the mapping, so
+        processes screening against the same file share its pages.
+        """
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapping[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a watch-list index file")
+        version, header_length = struct.unpack_from("<IQ", mapping, len(MAGIC))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {FORMAT_VERSION}")
+        start = len(MAGIC) + struct.calcsize("<IQ")
+        header = json.loads(mapping[start:start + header_length].decode("utf-8"))
+        data_start = _aligned(start + header_length)
+        arrays = {
+            name: np.frombuffer(
+                mapping, dtype=np.dtype(section["dtype"]), count=section["count"], offset=data_start + section["offset"]
+            )
+            for name, section in header.pop("sections").items()
+        }
+        index = cls(arrays, header)
+        index.mapped_from = path
+        return index
+
+    def __len__(self) -> int:
+        return len(self.alias_entries)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.entry_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in SECTIONS)
+
+    def entry(self, position: int) -> WatchlistEntry:
+        start, end = self.entry_offsets[position], self.entry_offsets[position + 1]
+        return WatchlistEntry.from_dict(json.loads(self.entry_blob[start:end].tobytes().decode("utf-8")))
+
+    def entry_digests(self) -> np.ndarray:
+        """64-bit content digest of every entry: an entry changed between two versions iff its digest did"""
+        blob, offsets = self.entry_blob, self.entry_offsets.tolist()
+        return np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(blob[start:end], digest_size=8).digest(), "little")
+                for start, end in zip(offsets, offsets[1:])
+            ),
+            dtype=np.uint64,
+            count=self.entry_count
+        )
+
+    def _candidates(self, normalized: str, category: Optional[int], limit: int) -> np.ndarray:
+        flat, offsets = _codes([_trigram_text(normalized)])
+        buckets = np.unique(_trigram_buckets(flat, offsets, self.trigram_bits)[1])
+        sizes = self.indptr[buckets + 1] - self.indptr[buckets]
+        required = max(1, math.ceil(MIN_TRIGRAM_OVERLAP * len(buckets)))
+        rarest = buckets[np.argsort(sizes, kind="stable")[:len(buckets) - required + 1]]
+        postings = [self.postings[self.indptr[bucket]:self.indptr[bucket + 1]] for bucket in rarest]
+        key_buckets = np.unique(_key_buckets(blocking_keys(normalized), self.key_bits))
+        key_sizes = self.key_indptr[key_buckets + 1] - self.key_indptr[key_buckets]
+        blocks = [
+            self.key_postings[self.key_indptr[bucket]:self.key_indptr[bucket + 1]]
+            for bucket in key_buckets[(key_sizes > 0) & (key_sizes <= MAX_KEY_BLOCK)]
+        ]
+        if not postings and not blocks:
+            return np.empty(0, dtype=np.int64)
+        trigram_hits = np.concatenate(postings) if postings else np.empty(0, dtype=np.int32)
+        candidates, inverse = np.unique(np.concatenate([trigram_hits, *blocks]), return_inverse=True)
+        weights = np.ones(len(inverse), dtype=np.int64)
+        weights[len(trigram_hits):] = KEY_WEIGHT
+        shared = np.bincount(inverse, weights=weights, minlength=len(candidates))
+        if category is not None:
+            in_category = self.alias_categories[candidates] == category
+            candidates, shared = candidates[in_category], shared[in_category]
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-shared, limit)[:limit]]
+        return candidates.astype(np.int64)
+
+    def search(
+        self, name: str, category: Optional[str], threshold: float, limit: int, max_candidates: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Entries of a category (None: any) whose best alias scores at least ``threshold`` against a name
+
+        Returns:
+            Up to ``limit`` hits, best first
+        """
+        return [
+            self._hit(self.entry(entry), alias, score)
+            for entry, alias, score in self.matches(name, category, threshold, limit, max_candidates)
+        ]
+
+    def matches(
+        self, name: str, category: Optional[str], threshold: float, limit: int, max_candidates: int
+    ) -> List[Tuple[int, int, float]]:
+        """Like search(), as (entry position, alias position, score) without decoding the entries"""
+        normalized = normalize_name(name)
+        if not normalized or len(self) == 0:
+            return []
+        category_code = CATEGORIES.index(category) if category is not None else None
+        candidates = self._candidates(normalized, category_code, max_candidates)
+        if len(candidates) == 0:
+            return []
+
+        alias_tokens = [self.alias_name(alias).split() for alias in candidates.tolist()]
+        scores = _name_scores(
+            normalized, self.names_flat, self.names_offsets, self.sorted_flat, self.sorted_offsets, candidates, alias_tokens
+        )
+
+        above = scores >= threshold
+        candidates, scores = candidates[above], scores[above]
+        hits: Dict[int, Tuple[float, int]] = {}
+        for alias, score in zip(candidates.tolist(), scores.tolist()):
+            entry = int(self.alias_entries[alias])
+            if entry not in hits or score > hits[entry][0]:
+                hits[entry] = (score, alias)
+        ranked = sorted(hits.items(), key=lambda item: -item[1][0])[:limit]
+        return [(entry, alias, score) for entry, (score, alias) in ranked]
+
+    def alias_name(self, alias: int) -> str:
+        start, end = self.names_offsets[alias], self.names_offsets[alias + 1]
+        return self.names_flat[start:end].tobytes().decode("utf-32-le")
+
+    def _hit(self, entry: WatchlistEntry, alias: int, score: float) -> Dict[str, Any]:
+        return {
+            "entry_id": entry.entry_id,
+            "name": entry.name,
+            "matched_alias": self.alias_name(alias),
+            "score": round(score, 3),
+            "list": entry.list_name,
+            "provider": entry.provider,
+            "entity_type": entry.entity_type,
+            "programs": entry.programs,
+            "countries": entry.countries
+        }
+
+
+def read_watchlist_file(path: str) -> Iterable[WatchlistEntry]:
+    """Entries of a JSON Lines watch-list file (one entry object per line)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield WatchlistEntry.from_dict(json.loads(line))
+
+
+class NameScreener:
+    """
+    Screens names against the currently loaded watch-lists
+
+    With SCREENING_INDEX_PATH set, the compiled index file is memory-mapped and
+    re-opened when a new version replaces it; otherwise the JSON Lines files in
+    SCREENING_WATCHLIST_PATHS are indexed in memory.
+    """
+
+    def __init__(self):
+        self._index: Optional[ScreeningIndex] = None
+        self._loaded_at: Optional[datetime] = None
+        self._load_seconds: Optional[float] = None
+        self._init_lock = threading.Lock()
+        self._reopen_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded = False
+        self._file_identity: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._screenings = 0
+        self._screening_seconds = 0.0
+
+    def _install(self, index: ScreeningIndex, start: float) -> int:
+        self._index = index
+        self._loaded = True
+        self._loaded_at = datetime.utcnow()
+        self._load_seconds = time.perf_counter() - start
+        source = f"mapped from {index.mapped_from}" if index.mapped_from else "indexed in memory"
+        logger.info(
+            f"Watch-lists {index.header['list_version']} {source}: {index.entry_count} entries, "
+            f"{len(index)} names and aliases in {self._load_seconds:.2f}s"
+        )
+        return len(index)
+
+    def load(self, entries: Iterable[WatchlistEntry]) -> int:
+        """
+        Replace the loaded watch-lists
+
+        Returns:
+            Number of indexed names and aliases
+        """
+        start = time.perf_counter()
+        return self._install(ScreeningIndex.build(entries), start)
+
+    def load_files(self, paths: Iterable[str]) -> int:
+        paths = list(paths)
+        start = time.perf_counter()
+        entries = (entry for path in paths for entry in read_watchlist_file(path))
+        return self._install(ScreeningIndex.build(entries, sources=paths), start)
+
+    def open_index(self, path: str) -> int:
+        """Memory-map a compiled index file (see watchlist_ingest.py)"""
+        start = time.perf_counter()
+        identity = self._identity(path)
+        index = ScreeningIndex.open(path)
+        self._file_identity = identity
+        return self._install(index, start)
+
+    def reload(self) -> int:
+        """Load the configured index file, or the configured JSON Lines files"""
+        if settings.SCREENING_INDEX_PATH:
+            return self.open_index(settings.SCREENING_INDEX_PATH)
+        paths = [path.strip() for path in settings.SCREENING_WATCHLIST_PATHS.split(",") if path.strip()]
+        return self.load_files(paths)
+
+    def ensure_loaded(self):
+        """Load the configured watch-lists on first use"""
+        if self._loaded:
+            return
+        with self._init_lock:
+            if not self._loaded:
+                self.reload()
+
+    @staticmethod
+    def _identity(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _reopen_if_replaced(self, force: bool = False):
+        """Pick up a new version of the index file (ingestion replaces it atomically)"""
+        path = settings.SCREENING_INDEX_PATH
+        now = time.monotonic()
+        if not path or (not force and now - self._checked_at < INDEX_CHECK_INTERVAL_SECONDS):
+            return
+        if not self._reopen_lock.acquire(blocking=force):
+            return
+        try:
+            self._checked_at = now
+            if self._identity(path) != self._file_identity:
+                self.open_index(path)
+        except Exception as e:
+            logger.warning(f"Watch-list index reload failed, keeping the loaded version: {e}")
+        finally:
+            self._reopen_lock.release()
+
+    def current_index(self) -> Optional[ScreeningIndex]:
+        """The latest watch-list index, re-opening the file first if it was replaced"""
+        self.ensure_loaded()
+        self._reopen_if_replaced(force=True)
+        return self._index
+
+    @property
+    def list_version(self) -> Optional[str]:
+        """Content version of the loaded watch-lists"""
+        self.ensure_loaded()
+        return self._index.header["list_version"] if self._index is not None else None
+
+    def lists(self, category: str) -> List[Dict[str, Any]]:
+        """Loaded watch-lists of a category"""
+        self.ensure_loaded()
+        index = self._index
+        lists = index.header["lists"] if index is not None else []
+        return [summary for summary in lists if summary["category"] == category]
+
+    def screen(self, name: str, category: str, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Screen one name against the loaded watch-lists of a category
+
+        Returns:
+            {"hits": ranked hits, "lists": watch-lists searched, "threshold",
+             "list_version", "elapsed_ms", "loaded_at"}
+        """
+        self.ensure_loaded()
+        self._reopen_if_replaced()
+        threshold = settings.SCREENING_MATCH_THRESHOLD if threshold is None else threshold
+        start = time.perf_counter()
+        index = self._index
+        hits = index.search(
+            name, category, threshold, settings.SCREENING_MAX_HITS, settings.SCREENING_MAX_CANDIDATES
+        ) if index is not None else []
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._screenings += 1
+            self._screening_seconds += elapsed
+        header = index.header if index is not None else {"lists": [], "list_version": None, "created_at": None}
+        return {
+            "hits": hits,
+            "lists": [summary for summary in header["lists"] if summary["category"] == category],
+            "threshold": threshold,
+            "list_version": header["list_version"],
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "loaded_at": header["created_at"]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index
+        with self._stats_lock:
+            screenings, screening_seconds = self._screenings, self._screening_seconds
+        header = index.header if index is not None else {}
+        return {
+            "loaded": self._loaded,
+            "list_version": header.get("list_version"),
+            "lists": header.get("lists", []),
+            "sources": header.get("sources", []),
+            "created_at": header.get("created_at"),
+            "mapped_from": index.mapped_from if index is not None else None,
+            "entries": index.entry_count if index is not None else 0,
+            "aliases": len(index) if index is not None else 0,
+            "postings": len(index.postings) if index is not None else 0,
+            "key_postings": len(index.key_postings) if index is not None else 0,
+            "index_mb": round(index.nbytes / (1024 * 1024), 2) if index is not None else 0,
+            "match_threshold": settings.SCREENING_MATCH_THRESHOLD,
+            "load_seconds": round(self._load_seconds, 3) if self._load_seconds is not None else None,
+            "loaded_at": self._loaded_at.isoformat() if self._loaded_at else None,
+            "screenings": screenings,
+            "mean_screening_ms": round(screening_seconds / screenings * 1000, 3) if screenings else None
+        }
+
+
+# Global name screener instance
+name_screener = NameScreener()
@@ -0,0 +1,213 @@
+"""
+Screening Result Cache
+Caches watch-list screenings (the engine's ranked hits for a name) with two
+tiers, like the LLM response cache:
+
+1. A bounded in-process LRU with TTL (microsecond lookups, per worker)
+2. A persistent table in the application database (survives restarts, shared by workers)
+
+Keys are a SHA-256 over the category, the normalized name, the watch-list version
+and the match settings, so "VIKTOR  BOUT" and "Viktor Bout" share an entry while
+a new list version never sees results of the previous one. The engine matches
+names only, so the jurisdictions are not part of the key: callers flag the hits
+against the client's jurisdictions after the lookup. The first lookup with a new
+version also drops the entries of older versions.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.screening_cache_entry import ScreeningCacheEntry
+from .llm_cache import LRUTTLCache
+from .name_screening import normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+class ScreeningCache:
+    """Two-tier (memory LRU + persistent table) cache for screening results"""
+
+    def __init__(self):
+        self.memory = LRUTTLCache(settings.SCREENING_CACHE_MAX_ENTRIES, settings.SCREENING_CACHE_TTL_SECONDS)
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.invalidations = 0
+        self._list_version: Optional[str] = None
+        self._version_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SCREENING_CACHE_ENABLED
+
+    @staticmethod
+    def make_key(category: str, name: str, list_version: str) -> str:
+        """Cache key of a name's screening"""
+        payload = json.dumps(
+            {
+                "category": category,
+                "name": normalize_name(name),
+                "list_version": list_version,
+                "threshold": settings.SCREENING_MATCH_THRESHOLD,
+                "max_hits": settings.SCREENING_MAX_HITS,
+                "max_candidates": settings.SCREENING_MAX_CANDIDATES
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _observe_version(self, list_version: str):
+        """Drop the entries of other list versions the first time a version is seen"""
+        if list_version == self._list_version:
+            return
+        with self._version_lock:
+            if list_version == self._list_version:
+                return
+            previous, self._list_version = self._list_version, list_version
+            self.memory.clear()
+            db = SessionLocal()
+            try:
+                deleted = (
+                    db.query(ScreeningCacheEntry)
+                    .filter(ScreeningCacheEntry.list_version != list_version)
+                    .delete(synchronize_session=False)
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning(f"Screening cache invalidation failed: {e}")
+                db.rollback()
+                return
+            finally:
+                db.close()
+            if previous is not None:
+                self.invalidations += 1
+            if previous is not None or deleted:
+                logger.info(f"Watch-lists now at version {list_version}: dropped {deleted} cached screening results")
+
+    def _get_persistent(self, key: str) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            entry = db.query(ScreeningCacheEntry).filter(ScreeningCacheEntry.cache_key == key).first()
+            if entry is None:
+                return None
+            if entry.expires_at <= datetime.utcnow():
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+            return entry.result
+        except Exception as e:
+            logger.warning(f"Screening cache read failed: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def _set_persistent(self, key: str, category: str, name: str, list_version: str, result: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            entry = db.query(ScreeningCacheEntry).filter(ScreeningCacheEntry.cache_key == key).first()
+            expires_at = datetime.utcnow() + timedelta(seconds=settings.SCREENING_CACHE_TTL_SECONDS)
+            if entry is None:
+                db.add(ScreeningCacheEntry(
+                    cache_key=key,
+                    list_version=list_version,
+                    category=category,
+                    normalized_name=normalize_name(name)[:255],
+                    result=result,
+                    hit_count=0,
+                    expires_at=expires_at
+                ))
+            else:
+                entry.result = result
+                entry.expires_at = expires_at
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Screening cache write failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def get(self, key: str, list_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result in memory, then in the persistent tier (promoting hits)
+
+        Returns:
+            A copy of the cached result (callers may modify it), or None
+        """
+        self._observe_version(list_version)
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(result)
+        result = self._get_persistent(key)
+        if result is not None:
+            self.persistent_hits += 1
+            self.memory.set(key, result)
+            return copy.deepcopy(result)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, category: str, name: str, list_version: str, result: Dict[str, Any]):
+        """Store a result in both tiers"""
+        self._observe_version(list_version)
+        result = copy.deepcopy(result)
+        self.memory.set(key, result)
+        self._set_persistent(key, category, name, list_version, result)
+        self.writes += 1
+
+    def purge(self) -> int:
+        """
+        Remove every cached result from both tiers
+
+        Returns:
+            Number of persistent entries deleted
+        """
+        self.memory.clear()
+        db = SessionLocal()
+        try:
+            deleted = db.query(ScreeningCacheEntry).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        hits = self.memory_hits + self.persistent_hits
+        lookups = hits + self.misses
+        db = SessionLocal()
+        try:
+            persistent_entries = db.query(ScreeningCacheEntry).count()
+        finally:
+            db.close()
+        return {
+            "enabled": self.enabled,
+            "list_version": self._list_version,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "version_invalidations": self.invalidations,
+            "memory_entries": len(self.memory),
+            "memory_capacity": self.memory.max_entries,
+            "memory_evictions": self.memory.evictions,
+            "persistent_entries": persistent_entries,
+            "ttl_seconds": settings.SCREENING_CACHE_TTL_SECONDS
+        }
+
+
+# Global instance
+screening_cache = ScreeningCache()
@@ -0,0 +1,868 @@
+"""
+Similarity Index
+Local, CPU-only vector index over historical KYC reviews, used as the retrieval
+step of the Risk Assessor's RAG context.
+
+Each KYCRecord (with its client's profile) is embedded with signed feature hashing
+of word unigrams, word bigrams and character trigrams into a fixed number of
+dimensions, L2-normalized and stored in one contiguous float32 matrix. A query is
+embedded the same way and scored against the matrix with a single matrix-vector
+product (cosine similarity), followed by an argpartition top-k.
+
+Large corpora are additionally partitioned with spherical k-means (an inverted
+file): rows are stored grouped by partition and a query only scans the
+SIMILARITY_INDEX_NPROBE partitions whose centroids are closest, which keeps
+queries in the low milliseconds at millions of rows.
+
+The index is maintained incrementally: committed KYC, case and alert writes
+schedule a refresh of the affected clients, which re-embeds their records into an
+append-only delta segment (searched exactly) and tombstones the superseded rows of
+the base segment. When the delta reaches SIMILARITY_INDEX_MERGE_ROWS it is merged
+into the base in the background, and every new base is saved as a snapshot so a
+restart loads it and only re-embeds the clients written since.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple, Set
+
+import numpy as np
+from sqlalchemy import or_
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.case import Case
+from ..models.client import Client
+from ..models.kyc_record import KYCRecord
+from ..models.risk_alert import RiskAlert
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Weight of each feature family: w = word, b = word bigram, c = character trigram
+FEATURE_WEIGHTS = {"w": 1.0, "b": 0.7, "c": 0.3}
+
+# Rows embedded per batch while building
+BUILD_BATCH_SIZE = 10000
+
+# k-means: training sample per partition, iterations, rows scored per assignment chunk
+KMEANS_SAMPLE_PER_LIST = 32
+KMEANS_ITERATIONS = 8
+ASSIGN_CHUNK_ROWS = 65536
+
+# Candidates fetched per requested result (room for per-client dedup and exclusions)
+CANDIDATE_FACTOR = 4
+
+# Clients re-indexed per query during a refresh
+REFRESH_CHUNK_CLIENTS = 500
+
+# Snapshot file format, and the margin by which catch-up looks further back than
+# the snapshot's watermark (commits land slightly after their row timestamps)
+SNAPSHOT_VERSION = 1
+CATCH_UP_SLACK_SECONDS = 300
+
+RISK_LEVEL_SCORES = {"Low": 25, "Medium": 50, "High": 80}
+CLIENT_STATUS_OUTCOMES = {"Active": "Approved", "Onboarding": "Pending approval", "Under Review": "Under review"}
+
+
+def _features(text: str) -> Counter:
+    """Weighted hashed-feature counts of one text"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    counts: Counter = Counter()
+    for token in tokens:
+        counts["w:" + token] += 1
+        if len(token) > 3:
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                counts["c:" + padded[i:i + 3]] += 1
+    for first, second in zip(tokens, tokens[1:]):
+        counts[f"b:{first} {second}"] += 1
+    return counts
+
+
+def embed_texts(texts: Iterable[str], dim: int) -> np.ndarray:
+    """
+    Embed texts with signed feature hashing
+
+    Returns:
+        float32 matrix (len(texts), dim) with L2-normalized rows (all-zero rows for empty texts)
+    """
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[float] = []
+    count = 0
+    for row, text in enumerate(texts):
+        count += 1
+        for feature, occurrences in _features(text or "").items():
+            digest = zlib.crc32(feature.encode("utf-8"))
+            rows.append(row)
+            columns.append(digest % dim)
+            sign = 1.0 if (digest >> 31) & 1 else -1.0
+            values.append(sign * FEATURE_WEIGHTS[feature[0]] * (1.0 + math.log(occurrences)))
+
+    flat = np.asarray(rows, dtype=np.int64) * dim + np.asarray(columns, dtype=np.int64)
+    matrix = np.bincount(flat, weights=np.asarray(values, dtype=np.float64), minlength=count * dim)
+    matrix = matrix.reshape(count, dim).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+def _train_partitions(matrix: np.ndarray, lists: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means centroids (lists, dim) trained on a sample of the rows"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(matrix), lists * KMEANS_SAMPLE_PER_LIST)
+    sample = matrix[rng.choice(len(matrix), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        sizes = np.bincount(assignment, minlength=lists)
+        filled = np.flatnonzero(sizes)
+        starts = np.concatenate(([0], np.cumsum(sizes[filled])[:-1]))
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+        empty = sizes == 0
+        if empty.any():
+            # Reseed empty partitions with random sample rows
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+    return centroids
+
+
+def _assign_partitions(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Closest centroid of every row, computed in bounded chunks"""
+    assignment = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), ASSIGN_CHUNK_ROWS):
+        chunk = matrix[start:start + ASSIGN_CHUNK_ROWS]
+        assignment[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignment
+
+
+@dataclass
+class IndexSegment:
+    """
+    Immutable block of indexed rows
+
+    When ``centroids`` is set, rows are ordered by partition and partition i
+    occupies rows offsets[i]:offsets[i + 1].
+    """
+    matrix: np.ndarray  # float32 (rows, dim), C-contiguous
+    record_ids: np.ndarray  # int64 KYCRecord ids
+    client_ids: np.ndarray  # int64
+    centroids: Optional[np.ndarray] = None
+    offsets: Optional[np.ndarray] = None
+    trained_rows: int = 0  # Rows the centroids were trained on
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    @classmethod
+    def create(cls, matrix: np.ndarray, record_ids: np.ndarray, client_ids: np.ndarray, partition_min_rows: int) -> "IndexSegment":
+        """Build a segment, partitioning it when it has at least ``partition_min_rows`` rows"""
+        if len(matrix) < max(partition_min_rows, 1):
+            return cls(np.ascontiguousarray(matrix), record_ids, client_ids)
+        lists = max(1, int(math.sqrt(len(matrix))))
+        centroids = _train_partitions(matrix, lists)
+        assignment = _assign_partitions(matrix, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).astype(np.int64)
+        return cls(
+            np.ascontiguousarray(matrix[order]),
+            record_ids[order],
+            client_ids[order],
+            centroids.astype(np.float32),
+            offsets,
+            len(matrix)
+        )
+
+    def merge(
+        self, keep: np.ndarray, matrix: np.ndarray, record_ids: np.ndarray, client_ids: np.ndarray, partition_min_rows: int
+    ) -> "IndexSegment":
+        """
+        New segment with this segment's ``keep`` rows followed by extra rows
+
+        Existing partitions are reused (new rows go to their closest centroid)
+        until the segment has doubled since the centroids were trained.
+        """
+        merged = np.concatenate((self.matrix[keep], matrix))
+        merged_records = np.concatenate((self.record_ids[keep], record_ids))
+        merged_clients = np.concatenate((self.client_ids[keep], client_ids))
+        if self.centroids is None or len(merged) > 2 * self.trained_rows:
+            return IndexSegment.create(merged, merged_records, merged_clients, partition_min_rows)
+
+        lists = len(self.centroids)
+        assignment = np.concatenate((
+            np.repeat(np.arange(lists, dtype=np.int32), np.diff(self.offsets))[keep],
+            _assign_partitions(matrix, self.centroids)
+        ))
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(lists + 1)).astype(np.int64)
+        return IndexSegment(
+            np.ascontiguousarray(merged[order]),
+            merged_records[order],
+            merged_clients[order],
+            self.centroids,
+            offsets,
+            self.trained_rows
+        )
+
+    def search(self, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k (row positions, cosine scores) for a normalized query vector"""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.centroids is None:
+            scores = self.matrix @ query
+            best = _top_k(scores, k)
+            return best, scores[best]
+
+        probes = _top_k(self.centroids @ query, nprobe)
+        positions = []
+        scores = []
+        for partition in probes:
+            start, end = self.offsets[partition], self.offsets[partition + 1]
+            if end > start:
+                positions.append(np.arange(start, end))
+                scores.append(self.matrix[start:end] @ query)
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        positions = np.concatenate(positions)
+        scores = np.concatenate(scores)
+        best = _top_k(scores, k)
+        return positions[best], scores[best]
+
+
+class DeltaSegment:
+    """
+    Append-only block of rows written since the last merge, searched exactly
+
+    Re-indexing a record appends a new row and marks its previous row dead.
+    Callers serialize access with the owning index's lock.
+    """
+
+    def __init__(self, dim: int, capacity: int = 256):
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.record_ids = np.zeros(capacity, dtype=np.int64)
+        self.client_ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0
+        self._positions: Dict[int, int] = {}  # record_id -> row of its latest version
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def live(self) -> int:
+        return len(self._positions)
+
+    def append(self, matrix: np.ndarray, record_ids: np.ndarray, client_ids: np.ndarray):
+        end = self.size + len(matrix)
+        if end > len(self.alive):
+            capacity = max(end, 2 * len(self.alive))
+            for name in ("matrix", "record_ids", "client_ids", "alive"):
+                current = getattr(self, name)
+                grown = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+                grown[:self.size] = current[:self.size]
+                setattr(self, name, grown)
+        self.remove(record_ids.tolist())
+        self.matrix[self.size:end] = matrix
+        self.record_ids[self.size:end] = record_ids
+        self.client_ids[self.size:end] = client_ids
+        self.alive[self.size:end] = True
+        for offset, record_id in enumerate(record_ids.tolist()):
+            self._positions[record_id] = self.size + offset
+        self.size = end
+
+    def remove(self, record_ids: Iterable[int]):
+        for record_id in record_ids:
+            position = self._positions.pop(record_id, None)
+            if position is not None:
+                self.alive[position] = False
+
+    def live_rows(self, start: int = 0, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Copies of the live rows in [start, end)"""
+        end = self.size if end is None else end
+        rows = start + np.flatnonzero(self.alive[start:end])
+        return self.matrix[rows], self.record_ids[rows], self.client_ids[rows]
+
+    def live_records(self, client_ids: np.ndarray) -> Set[int]:
+        rows = np.flatnonzero(self.alive[:self.size] & np.isin(self.client_ids[:self.size], client_ids))
+        return set(self.record_ids[rows].tolist())
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, int, float]]:
+        """Top-k live (record_id, client_id, cosine score), best first"""
+        if self.live == 0:
+            return []
+        scores = self.matrix[:self.size] @ query
+        scores[~self.alive[:self.size]] = -np.inf
+        best = _top_k(scores, min(k, self.live))
+        return [
+            (int(self.record_ids[row]), int(self.client_ids[row]), float(scores[row]))
+            for row in best
+        ]
+
+
+def kyc_document_text(record: Any, history: str = "") -> str:
+    """
+    Indexed text of one KYC review: the client profile plus the review's summary
+    and rationale, and the client's investigation history (alerts and cases)
+    """
+    return " ".join(part for part in (
+        record.nationality,
+        record.residency_country,
+        record.source_of_wealth,
+        record.business_activity,
+        record.kyc_summary,
+        record.risk_rationale,
+        record.raw_kyc_notes,
+        history
+    ) if part)
+
+
+def client_histories(db, client_ids: Optional[List[int]] = None) -> Dict[int, str]:
+    """Indexed investigation history per client: alert risk tags, case types and case conclusions"""
+    parts: Dict[int, List[str]] = defaultdict(list)
+    alerts = db.query(RiskAlert.client_id, RiskAlert.risk_tags).filter(RiskAlert.client_id.isnot(None))
+    cases = db.query(Case.client_id, Case.case_type, Case.conclusion).filter(Case.client_id.isnot(None))
+    if client_ids is not None:
+        alerts = alerts.filter(RiskAlert.client_id.in_(client_ids))
+        cases = cases.filter(Case.client_id.in_(client_ids))
+    for client_id, risk_tags in alerts.yield_per(BUILD_BATCH_SIZE):
+        if isinstance(risk_tags, list):
+            parts[client_id].extend(str(tag) for tag in risk_tags)
+    for client_id, case_type, conclusion in cases.yield_per(BUILD_BATCH_SIZE):
+        parts[client_id].extend(part for part in (case_type, conclusion) if part)
+    return {client_id: " ".join(texts) for client_id, texts in parts.items()}
+
+
+def _database_key() -> str:
+    """Identifies the database a snapshot was built from (without storing credentials)"""
+    return hashlib.sha256(settings.DATABASE_URL.encode("utf-8")).hexdigest()[:16]
+
+
+def kyc_query_text(kyc_data: Dict[str, Any]) -> str:
+    """Query text for a client being assessed (same fields as kyc_document_text)"""
+    return " ".join(str(kyc_data[key]) for key in (
+        "nationality", "residency_country", "source_of_wealth", "business_activity", "kyc_notes"
+    ) if kyc_data.get(key))
+
+
+class SimilarityIndex:
+    """In-memory similarity index over KYC review history"""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self._segment = IndexSegment(
+            np.zeros((0, dim), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        )
+        self._delta = DeltaSegment(dim)
+        # Records whose base rows are superseded or deleted, with the time each write was requested
+        self._tombstones: frozenset = frozenset()
+        self._tombstone_log: List[Tuple[int, float]] = []
+        # Everything committed before this time is in the base segment
+        self._watermark: Optional[float] = None
+        self._built = False
+        self._building = False
+        self._merging = False
+        self._build_lock = threading.Lock()  # Build, merge and snapshot load replace the base one at a time
+        self._init_lock = threading.Lock()
+        self._lock = threading.Lock()  # Delta segment, tombstones and pending refreshes
+        self._stats_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="similarity-index")
+        self._pending: Set[int] = set()
+        self._pending_since: Optional[float] = None
+        self._inflight_since: Optional[float] = None
+        self._build_seconds: Optional[float] = None
+        self._built_at: Optional[datetime] = None
+        self._snapshot_loaded_at: Optional[datetime] = None
+        self._queries = 0
+        self._query_seconds = 0.0
+        self._refreshed_rows = 0
+        self._merges = 0
+        self._merge_seconds: Optional[float] = None
+
+    def _document_query(self, db):
+        return (
+            db.query(
+                KYCRecord.id, KYCRecord.client_id, KYCRecord.kyc_summary, KYCRecord.risk_rationale,
+                KYCRecord.raw_kyc_notes, Client.nationality, Client.residency_country,
+                Client.source_of_wealth, Client.business_activity
+            )
+            .join(Client, Client.id == KYCRecord.client_id)
+        )
+
+    def build(self) -> int:
+        """
+        (Re)build the index from the database
+
+        Returns:
+            Number of indexed KYC records
+        """
+        with self._build_lock:
+            start = time.perf_counter()
+            watermark = time.time()
+            with self._lock:
+                self._building = True
+                delta_start, log_start = len(self._delta), len(self._tombstone_log)
+            try:
+                matrices, record_ids, client_ids = [], [], []
+                db = SessionLocal()
+                try:
+                    histories = client_histories(db)
+                    batch = []
+                    for row in self._document_query(db).order_by(KYCRecord.id).yield_per(BUILD_BATCH_SIZE):
+                        batch.append(row)
+                        if len(batch) >= BUILD_BATCH_SIZE:
+                            self._embed_batch(batch, histories, matrices, record_ids, client_ids)
+                            batch = []
+                    if batch:
+                        self._embed_batch(batch, histories, matrices, record_ids, client_ids)
+                finally:
+                    db.close()
+
+                matrix = np.concatenate(matrices) if matrices else np.zeros((0, self.dim), dtype=np.float32)
+                segment = IndexSegment.create(
+                    matrix,
+                    np.asarray(record_ids, dtype=np.int64),
+                    np.asarray(client_ids, dtype=np.int64),
+                    settings.SIMILARITY_INDEX_PARTITION_MIN_ROWS
+                )
+                # Refreshes applied while reading may predate what was read; keep them
+                self._install(segment, delta_start, log_start, watermark)
+            finally:
+                self._building = False
+            self._built = True
+            self._build_seconds = time.perf_counter() - start
+            self._built_at = datetime.utcnow()
+            logger.info(f"Similarity index built: {len(segment)} KYC records in {self._build_seconds:.2f}s")
+            self.save_snapshot()
+            return len(segment)
+
+    def _embed_batch(
+        self, batch: List[Any], histories: Dict[int, str], matrices: List[np.ndarray], record_ids: List[int], client_ids: List[int]
+    ):
+        matrices.append(embed_texts((kyc_document_text(row, histories.get(row.client_id, "")) for row in batch), self.dim))
+        record_ids.extend(row.id for row in batch)
+        client_ids.extend(row.client_id for row in batch)
+
+    def _install(self, segment: IndexSegment, delta_start: int, log_start: int, watermark: float):
+        """
+        Replace the base segment with one that reflects the delta rows before
+        ``delta_start`` and the tombstones before ``log_start``; later writes are
+        carried over into a fresh delta
+        """
+        with self._lock:
+            delta = DeltaSegment(self.dim)
+            delta.append(*self._delta.live_rows(delta_start))
+            self._delta = delta
+            self._tombstone_log = self._tombstone_log[log_start:]
+            self._tombstones = frozenset(record_id for record_id, _ in self._tombstone_log)
+            self._segment = segment
+            # Writes carried over or still queued are not in the new base
+            unapplied = [requested_at for _, requested_at in self._tombstone_log]
+            unapplied += [since for since in (self._pending_since, self._inflight_since) if since is not None]
+            self._watermark = min(unapplied + [watermark])
+
+    def ensure_built(self):
+        """Load the snapshot, or build, on first use"""
+        if self._built:
+            return
+        with self._init_lock:
+            if not self._built and not self.load_snapshot():
+                self.build()
+
+    def schedule_refresh(self, client_ids: Iterable[Optional[int]]):
+        """
+        Queue re-indexing of clients after a committed write
+
+        Non-blocking: refreshes run in order on a background thread, and clients
+        queued while one is running are coalesced into the next.
+        """
+        client_ids = {client_id for client_id in client_ids if client_id is not None}
+        if not client_ids or not settings.SIMILARITY_INDEX_ENABLED:
+            return
+        with self._lock:
+            if not self._pending:
+                self._pending_since = time.time()
+                self._writer.submit(self._drain)
+            self._pending |= client_ids
+
+    def _drain(self):
+        with self._lock:
+            client_ids, self._pending = self._pending, set()
+            self._inflight_since, self._pending_since = self._pending_since, None
+        try:
+            self.refresh_clients(client_ids, self._inflight_since)
+        except Exception as e:
+            logger.warning(f"Similarity index refresh failed ({len(client_ids)} clients): {e}")
+        finally:
+            with self._lock:
+                self._inflight_since = None
+
+    def refresh_clients(self, client_ids: Iterable[int], requested_at: Optional[float] = None) -> int:
+        """
+        Re-index the KYC records of clients from the database
+
+        Their current records are appended to the delta segment and their indexed
+        records that no longer exist are removed. Nothing happens before the index
+        is first built (the build reads the same rows).
+
+        Returns:
+            Number of rows written to the delta segment
+        """
+        if not (self._built or self._building):
+            return 0
+        requested_at = requested_at or time.time()
+        client_ids = sorted(set(client_ids))
+        written = 0
+        merge_due = False
+        for start in range(0, len(client_ids), REFRESH_CHUNK_CLIENTS):
+            chunk = client_ids[start:start + REFRESH_CHUNK_CLIENTS]
+            db = SessionLocal()
+            try:
+                rows = self._document_query(db).filter(KYCRecord.client_id.in_(chunk)).all()
+                histories = client_histories(db, chunk)
+            finally:
+                db.close()
+            matrix = embed_texts((kyc_document_text(row, histories.get(row.client_id, "")) for row in rows), self.dim)
+            record_ids = np.asarray([row.id for row in rows], dtype=np.int64)
+            row_clients = np.asarray([row.client_id for row in rows], dtype=np.int64)
+
+            chunk_ids = np.asarray(chunk, dtype=np.int64)
+            with self._lock:
+                segment = self._segment
+                indexed = set(segment.record_ids[np.isin(segment.client_ids, chunk_ids)].tolist()) - self._tombstones
+                indexed |= self._delta.live_records(chunk_ids)
+                deleted = indexed - set(record_ids.tolist())
+                self._delta.append(matrix, record_ids, row_clients)
+                self._delta.remove(deleted)
+                touched = record_ids.tolist() + sorted(deleted)
+                self._tombstone_log.extend((record_id, requested_at) for record_id in touched)
+                self._tombstones = self._tombstones.union(touched)
+                merge_due = len(self._delta) >= settings.SIMILARITY_INDEX_MERGE_ROWS
+            written += len(rows)
+        with self._stats_lock:
+            self._refreshed_rows += written
+        if merge_due:
+            self._start_merge()
+        return written
+
+    def _start_merge(self):
+        with self._lock:
+            if self._merging:
+                return
+            self._merging = True
+        threading.Thread(target=self._merge, name="similarity-index-merge", daemon=True).start()
+
+    def _merge(self):
+        """Fold the delta segment and tombstones into a new base segment"""
+        try:
+            with self._build_lock:
+                start = time.perf_counter()
+                with self._lock:
+                    base, tombstones = self._segment, self._tombstones
+                    delta_start, log_start = len(self._delta), len(self._tombstone_log)
+                    matrix, record_ids, client_ids = self._delta.live_rows(0, delta_start)
+                if delta_start == 0 and log_start == 0:
+                    return
+                keep = ~np.isin(base.record_ids, np.fromiter(tombstones, dtype=np.int64, count=len(tombstones)))
+                segment = base.merge(keep, matrix, record_ids, client_ids, settings.SIMILARITY_INDEX_PARTITION_MIN_ROWS)
+                self._install(segment, delta_start, log_start, time.time())
+                self._merge_seconds = time.perf_counter() - start
+                self._merges += 1
+                logger.info(
+                    f"Similarity index merged {len(matrix)} delta rows: {len(segment)} KYC records in {self._merge_seconds:.2f}s"
+                )
+                self.save_snapshot()
+        except Exception as e:
+            logger.error(f"Similarity index merge failed: {e}")
+        finally:
+            with self._lock:
+                self._merging = False
+
+    def save_snapshot(self):
+        """
+        Write the base segment to SIMILARITY_INDEX_SNAPSHOT_PATH (atomically)
+
+        The snapshot records the database it was built from and the creation time
+        of its newest record, so a snapshot of another or a re-seeded database is
+        never loaded.
+        """
+        path = settings.SIMILARITY_INDEX_SNAPSHOT_PATH
+        segment, watermark = self._segment, self._watermark
+        if not path or watermark is None:
+            return
+        try:
+            anchor_id = int(segment.record_ids.max()) if len(segment) else 0
+            anchor_created = ""
+            if anchor_id:
+                db = SessionLocal()
+                try:
+                    created_at = db.query(KYCRecord.created_at).filter(KYCRecord.id == anchor_id).scalar()
+                finally:
+                    db.close()
+                anchor_created = created_at.isoformat() if created_at else ""
+            arrays = {
+                "version": np.int64(SNAPSHOT_VERSION),
+                "database": np.str_(_database_key()),
+                "dim": np.int64(self.dim),
+                "watermark": np.float64(watermark),
+                "anchor_id": np.int64(anchor_id),
+                "anchor_created": np.str_(anchor_created),
+                "matrix": segment.matrix,
+                "record_ids": segment.record_ids,
+                "client_ids": segment.client_ids,
+                "trained_rows": np.int64(segment.trained_rows)
+            }
+            if segment.centroids is not None:
+                arrays["centroids"] = segment.centroids
+                arrays["offsets"] = segment.offsets
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            temporary = f"{path}.tmp"
+            with open(temporary, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temporary, path)
+            logger.info(f"Similarity index snapshot saved: {len(segment)} KYC records to {path}")
+        except Exception as e:
+            logger.warning(f"Similarity index snapshot save failed: {e}")
+
+    def load_snapshot(self) -> bool:
+        """
+        Start from the saved snapshot and catch up on the clients written since
+
+        Returns:
+            False if there is no usable snapshot (the caller builds instead)
+        """
+        path = settings.SIMILARITY_INDEX_SNAPSHOT_PATH
+        if not path or not os.path.exists(path):
+            return False
+        start = time.perf_counter()
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if (
+                    int(data["version"]) != SNAPSHOT_VERSION
+                    or str(data["database"]) != _database_key()
+                    or int(data["dim"]) != self.dim
+                ):
+                    logger.info("Similarity index snapshot is for another database or format, rebuilding")
+                    return False
+                watermark = float(data["watermark"])
+                anchor_id, anchor_created = int(data["anchor_id"]), str(data["anchor_created"])
+                segment = IndexSegment(
+                    data["matrix"],
+                    data["record_ids"],
+                    data["client_ids"],
+                    data["centroids"] if "centroids" in data.files else None,
+                    data["offsets"] if "offsets" in data.files else None,
+                    int(data["trained_rows"])
+                )
+        except Exception as e:
+            logger.warning(f"Similarity index snapshot load failed, rebuilding: {e}")
+            return False
+
+        with self._build_lock:
+            db = SessionLocal()
+            try:
+                if anchor_id:
+                    created_at = db.query(KYCRecord.created_at).filter(KYCRecord.id == anchor_id).scalar()
+                    if created_at is None or created_at.isoformat() != anchor_created:
+                        logger.info("Similarity index snapshot does not match the database, rebuilding")
+                        return False
+                stale_clients = self._changed_clients(db, segment, watermark)
+            finally:
+                db.close()
+
+            self._building = True
+            try:
+                with self._lock:
+                    self._segment = segment
+                    self._watermark = watermark
+                self.refresh_clients(stale_clients, watermark)
+            finally:
+                self._building = False
+            self._built = True
+            self._build_seconds = time.perf_counter() - start
+            self._built_at = datetime.utcnow()
+            self._snapshot_loaded_at = self._built_at
+        logger.info(
+            f"Similarity index loaded from snapshot: {len(segment)} KYC records, "
+            f"{len(stale_clients)} clients caught up in {self._build_seconds:.2f}s"
+        )
+        return True
+
+    @staticmethod
+    def _changed_clients(db, segment: IndexSegment, watermark: float) -> Set[int]:
+        """Clients written since a snapshot's watermark, or whose indexed records were deleted since"""
+        since = datetime.utcfromtimestamp(watermark - CATCH_UP_SLACK_SECONDS)
+        newest = int(segment.record_ids.max()) if len(segment) else 0
+        changed = {client_id for client_id, in db.query(Client.id).filter(Client.updated_at >= since)}
+        changed.update(client_id for client_id, in db.query(KYCRecord.client_id).filter(
+            or_(KYCRecord.id > newest, KYCRecord.created_at >= since)
+        ))
+        changed.update(client_id for client_id, in db.query(RiskAlert.client_id).filter(
+            RiskAlert.client_id.isnot(None), RiskAlert.created_at >= since
+        ))
+        changed.update(client_id for client_id, in db.query(Case.client_id).filter(
+            Case.client_id.isnot(None), Case.updated_at >= since
+        ))
+        existing = np.fromiter(
+            (record_id for record_id, in db.query(KYCRecord.id).yield_per(BUILD_BATCH_SIZE)), dtype=np.int64
+        )
+        deleted = ~np.isin(segment.record_ids, existing)
+        changed.update(segment.client_ids[deleted].tolist())
+        return changed
+
+    def search(self, text: str, k: int) -> List[Tuple[int, int, float]]:
+        """
+        Most similar KYC records to a text, at most one per client
+
+        Returns:
+            (record_id, client_id, cosine score) tuples, best first
+        """
+        self.ensure_built()
+        start = time.perf_counter()
+        query = embed_texts([text], self.dim)[0]
+        if not query.any():
+            return []
+        candidates = k * CANDIDATE_FACTOR
+        with self._lock:
+            segment, tombstones = self._segment, self._tombstones
+            hits = self._delta.search(query, candidates)
+        # Fetch enough base rows that tombstoned ones cannot crowd out live ones
+        positions, scores = segment.search(query, candidates + len(tombstones), settings.SIMILARITY_INDEX_NPROBE)
+        for position, score in zip(positions, scores):
+            record_id = int(segment.record_ids[position])
+            if record_id not in tombstones:
+                hits.append((record_id, int(segment.client_ids[position]), float(score)))
+        hits.sort(key=lambda hit: -hit[2])
+
+        results = []
+        seen_clients = set()
+        for record_id, client_id, score in hits[:candidates]:
+            if client_id in seen_clients:
+                continue
+            seen_clients.add(client_id)
+            results.append((record_id, client_id, score))
+        with self._stats_lock:
+            self._queries += 1
+            self._query_seconds += time.perf_counter() - start
+        return results
+
+    def similar_cases(self, kyc_data: Dict[str, Any], k: int) -> List[Dict[str, Any]]:
+        """
+        Historical KYC reviews most similar to a client profile, as RAG case dictionaries
+
+        Reviews of a client with the same name as the query are skipped (they are
+        the client's own history, not comparable cases).
+        """
+        hits = [
+            hit for hit in self.search(kyc_query_text(kyc_data), k + CANDIDATE_FACTOR)
+            if hit[2] >= settings.SIMILARITY_INDEX_MIN_SCORE
+        ]
+        if not hits:
+            return []
+
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(KYCRecord, Client)
+                .join(Client, Client.id == KYCRecord.client_id)
+                .filter(KYCRecord.id.in_([record_id for record_id, _, _ in hits]))
+                .all()
+            )
+        finally:
+            db.close()
+        by_id = {record.id: (record, client) for record, client in rows}
+
+        name = (kyc_data.get("full_name") or "").strip().lower()
+        cases = []
+        for record_id, _, score in hits:
+            if record_id not in by_id:
+                continue  # Deleted since the index was built
+            record, client = by_id[record_id]
+            if name and client.full_name.strip().lower() == name:
+                continue
+            cases.append(self._case(record, client, score))
+            if len(cases) == k:
+                break
+        return cases
+
+    @staticmethod
+    def _case(record: KYCRecord, client: Client, score: float) -> Dict[str, Any]:
+        """Case dictionary in the shape consumed by the Risk Assessor and the frontend"""
+        reviewed = record.review_date or (record.created_at.date() if record.created_at else None)
+        jurisdictions = [country for country in dict.fromkeys((client.nationality, client.residency_country)) if country]
+        summary = record.kyc_summary or client.kyc_summary or ""
+        return {
+            "case_id": f"KYC-{reviewed.year if reviewed else 0:04d}-{record.id:04d}",
+            "client_name": client.full_name,
+            "client_type": client.business_activity or "Private client",
+            "summary": summary[:200] if summary else f"{record.risk_score or 'Unrated'} risk KYC review",
+            "details": record.risk_rationale or record.raw_kyc_notes or "",
+            "risk_level": record.risk_score or "Unknown",
+            "risk_score": RISK_LEVEL_SCORES.get(record.risk_score, 50),
+            "jurisdictions": jurisdictions,
+            "wealth_source": client.source_of_wealth or "",
+            "pep_status": bool(record.pep_flag),
+            "sanctions_status": bool(record.sanctions_flag),
+            "relevance": round(score, 2),
+            "outcome": CLIENT_STATUS_OUTCOMES.get(client.status, client.status or "Unknown"),
+            "approval_date": reviewed.isoformat() if reviewed else None,
+            "monitoring_level": "Enhanced" if record.edd_required else "Standard"
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            segment = self._segment
+            delta_rows, delta_live, tombstones = len(self._delta), self._delta.live, len(self._tombstones)
+            pending = len(self._pending)
+            watermark = self._watermark
+        with self._stats_lock:
+            queries, query_seconds = self._queries, self._query_seconds
+            refreshed_rows = self._refreshed_rows
+        return {
+            "built": self._built,
+            "records": len(segment) - tombstones + delta_live,
+            "dim": self.dim,
+            "matrix_mb": round(segment.matrix.nbytes / (1024 * 1024), 2),
+            "partitions": len(segment.centroids) if segment.centroids is not None else 0,
+            "nprobe": settings.SIMILARITY_INDEX_NPROBE,
+            "build_seconds": round(self._build_seconds, 3) if self._build_seconds is not None else None,
+            "built_at": self._built_at.isoformat() if self._built_at else None,
+            "snapshot_loaded_at": self._snapshot_loaded_at.isoformat() if self._snapshot_loaded_at else None,
+            "base_records": len(segment),
+            "delta_rows": delta_rows,
+            "tombstones": tombstones,
+            "pending_refreshes": pending,
+            "refreshed_rows": refreshed_rows,
+            "merges": self._merges,
+            "merge_seconds": round(self._merge_seconds, 3) if self._merge_seconds is not None else None,
+            "watermark": datetime.utcfromtimestamp(watermark).isoformat() if watermark is not None else None,
+            "queries": queries,
+            "mean_query_ms": round(query_seconds / queries * 1000, 3) if queries else None
+        }
+
+
+# Global similarity index instance
+similarity_index = SimilarityIndex(settings.SIMILARITY_INDEX_DIM)
@@ -0,0 +1,75 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight call instead of each
+issuing their own. Used by the LLM gateway so that duplicate analyses (two browser
+tabs, a batch job overlapping an interactive request) cost one model round-trip.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Awaitable, Callable, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicates concurrent async calls that share a key"""
+
+    def __init__(self):
+        # Keyed by (event loop id, key): tasks are bound to the loop that created them
+        self._inflight: Dict[Tuple[int, str], "asyncio.Task[Any]"] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` once per key among concurrent callers
+
+        The shared call runs as its own task, so a caller that is cancelled (e.g. a
+        client disconnect) does not cancel the call for the other waiters.
+
+        Args:
+            key: Fingerprint identifying equivalent calls
+            fn: Zero-argument coroutine factory performing the call
+
+        Returns:
+            Result of the shared call (exceptions propagate to every waiter)
+        """
+        flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._inflight.get(flight_key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[flight_key] = task
+        self.executed += 1
+        task.add_done_callback(lambda t: self._finish(flight_key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, flight_key: Tuple[int, str], task: "asyncio.Task[Any]"):
+        if self._inflight.get(flight_key) is task:
+            del self._inflight[flight_key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight call failed: {task.exception()}")
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        """Executed vs coalesced call counters"""
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0
+        }
+
+
+# Global instance shared by all LLM call paths
+llm_single_flight = SingleFlight()
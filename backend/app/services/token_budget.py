@@ -0,0 +1,110 @@
+"""
+Token Budgeting
+Token counting and chunking for prompt inputs that exceed the per-field budget.
+
+Uses tiktoken for exact counts when it is installed and falls back to a
+characters-per-token estimate otherwise.
+"""
+
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Fallback estimate when tiktoken is unavailable (English prose averages ~4 chars/token)
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: Optional[str], model: str = "gpt-4o") -> int:
+    """Count (or estimate) the tokens in a piece of text"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _split_oversized(text: str, max_tokens: int, model: str) -> List[str]:
+    """Hard-split a single line/paragraph that alone exceeds the chunk budget"""
+    encoding = _encoding(model)
+    if encoding is None:
+        step = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def split_into_chunks(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    model: str = "gpt-4o"
+) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` tokens
+
+    Splits on line boundaries so individual transactions/log entries stay intact,
+    hard-splitting only lines that alone exceed the budget. Each chunk after the
+    first starts with up to ``overlap_tokens`` of trailing lines from the previous
+    chunk so patterns spanning a boundary are still visible.
+
+    Args:
+        text: Input text
+        max_tokens: Token budget per chunk
+        overlap_tokens: Token budget for context carried over between chunks
+        model: Model whose tokenizer to use
+
+    Returns:
+        List of chunk strings (a single chunk if the text fits)
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    lines: List[str] = []
+    for line in text.splitlines():
+        if count_tokens(line, model) > max_tokens:
+            lines.extend(_split_oversized(line, max_tokens, model))
+        else:
+            lines.append(line)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for line in lines:
+        line_tokens = count_tokens(line, model) + 1  # + newline
+        if current and current_tokens + line_tokens > max_tokens:
+            chunks.append("\n".join(current))
+            # Carry trailing lines over as overlap
+            overlap: List[str] = []
+            overlap_size = 0
+            for previous in reversed(current):
+                previous_tokens = count_tokens(previous, model) + 1
+                if overlap_size + previous_tokens > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += previous_tokens
+            if overlap_size + line_tokens > max_tokens:
+                overlap, overlap_size = [], 0
+            current, current_tokens = overlap, overlap_size
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
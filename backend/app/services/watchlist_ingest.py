@@ -0,0 +1,275 @@
+"""
+Watch-list Ingestion
+Streams sanctions and PEP list files into the compiled screening index file that
+screening processes memory-map (see name_screening.py).
+
+Supported inputs (detected from the file, or named explicitly):
+- ofac: OFAC SDN XML (sdnList / sdnEntry)
+- un: UN Security Council consolidated list XML (CONSOLIDATED_LIST)
+- eu: EU financial sanctions file XML (export / sanctionEntity)
+- uk: UK HMT consolidated list CSV (ConList.csv, one row per name, grouped by Group ID)
+- jsonl: JSON Lines, one WatchlistEntry object per line (PEP lists and custom lists)
+
+XML files are parsed incrementally with iterparse and every record element is
+cleared once converted, so memory does not grow with the size of the file.
+"""
+
+import csv
+import logging
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Callable
+
+from .name_screening import ScreeningIndex, WatchlistEntry, read_watchlist_file, CATEGORY_SANCTIONS
+
+logger = logging.getLogger(__name__)
+
+OFAC_LIST = ("OFAC SDN List", "US Treasury")
+UN_LIST = ("UN Consolidated Sanctions", "United Nations")
+EU_LIST = ("EU Sanctions List", "European Union")
+UK_LIST = ("UK HMT Sanctions", "UK Treasury")
+
+
+def _local(tag: str) -> str:
+    """Tag name without its XML namespace"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _children(element: ElementTree.Element, name: str) -> List[ElementTree.Element]:
+    return [child for child in element if _local(child.tag) == name]
+
+
+def _text(element: Optional[ElementTree.Element], name: str) -> str:
+    """Stripped text of the first direct child called ``name``"""
+    if element is None:
+        return ""
+    for child in element:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+def _join(*parts: str) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def _records(path: str, record_tags: Iterable[str]) -> Iterator[ElementTree.Element]:
+    """Completed record elements of an XML file, discarded after the caller has used them"""
+    record_tags = set(record_tags)
+    root = None
+    for event, element in ElementTree.iterparse(path, events=("start", "end")):
+        if root is None:
+            root = element
+        elif event == "end" and _local(element.tag) in record_tags:
+            yield element
+            # Drop the record and its (emptied) siblings from the tree built so far
+            element.clear()
+            root.clear()
+
+
+def parse_ofac_sdn(path: str) -> Iterator[WatchlistEntry]:
+    list_name, provider = OFAC_LIST
+    for record in _records(path, ["sdnEntry"]):
+        name = _join(_text(record, "firstName"), _text(record, "lastName"))
+        if not name:
+            continue
+        aliases = [
+            _join(_text(aka, "firstName"), _text(aka, "lastName"))
+            for aka_list in _children(record, "akaList") for aka in _children(aka_list, "aka")
+        ]
+        programs = [
+            (program.text or "").strip()
+            for program_list in _children(record, "programList") for program in _children(program_list, "program")
+        ]
+        countries = [
+            _text(item, "country")
+            for group, item_name in (("nationalityList", "nationality"), ("citizenshipList", "citizenship"), ("addressList", "address"))
+            for items in _children(record, group) for item in _children(items, item_name)
+        ]
+        sdn_type = _text(record, "sdnType")
+        yield WatchlistEntry(
+            entry_id=f"OFAC-{_text(record, 'uid')}",
+            list_name=list_name,
+            category=CATEGORY_SANCTIONS,
+            name=name,
+            aliases=[alias for alias in aliases if alias],
+            entity_type="Individual" if sdn_type == "Individual" else (sdn_type or "Entity"),
+            programs=[program for program in programs if program],
+            countries=list(dict.fromkeys(country for country in countries if country)),
+            provider=provider
+        )
+
+
+def parse_un_consolidated(path: str) -> Iterator[WatchlistEntry]:
+    list_name, provider = UN_LIST
+    for record in _records(path, ["INDIVIDUAL", "ENTITY"]):
+        individual = _local(record.tag) == "INDIVIDUAL"
+        name = _join(*(_text(record, part) for part in ("FIRST_NAME", "SECOND_NAME", "THIRD_NAME", "FOURTH_NAME")))
+        if not name:
+            continue
+        alias_tag = "INDIVIDUAL_ALIAS" if individual else "ENTITY_ALIAS"
+        address_tag = "INDIVIDUAL_ADDRESS" if individual else "ENTITY_ADDRESS"
+        aliases = [_text(alias, "ALIAS_NAME") for alias in _children(record, alias_tag)]
+        aliases.append(_text(record, "NAME_ORIGINAL_SCRIPT"))
+        countries = [_text(nationality, "VALUE") for nationality in _children(record, "NATIONALITY")]
+        countries += [_text(address, "COUNTRY") for address in _children(record, address_tag)]
+        reference = _text(record, "REFERENCE_NUMBER") or _text(record, "DATAID")
+        yield WatchlistEntry(
+            entry_id=f"UN-{reference}",
+            list_name=list_name,
+            category=CATEGORY_SANCTIONS,
+            name=name,
+            aliases=[alias for alias in aliases if alias],
+            entity_type="Individual" if individual else "Entity",
+            programs=[program for program in [_text(record, "UN_LIST_TYPE")] if program],
+            countries=list(dict.fromkeys(country for country in countries if country)),
+            provider=provider
+        )
+
+
+def parse_eu_fsf(path: str) -> Iterator[WatchlistEntry]:
+    list_name, provider = EU_LIST
+    for record in _records(path, ["sanctionEntity"]):
+        names = [
+            alias.get("wholeName") or _join(alias.get("firstName", ""), alias.get("middleName", ""), alias.get("lastName", ""))
+            for alias in _children(record, "nameAlias")
+        ]
+        names = [name.strip() for name in names if name and name.strip()]
+        if not names:
+            continue
+        subject = _children(record, "subjectType")
+        code = subject[0].get("code", "") if subject else ""
+        countries = [
+            element.get("countryDescription", "")
+            for tag in ("citizenship", "address", "birthdate")
+            for element in _children(record, tag)
+        ]
+        programs = [regulation.get("programme", "") for regulation in _children(record, "regulation")]
+        yield WatchlistEntry(
+            entry_id=f"EU-{record.get('logicalId') or record.get('euReferenceNumber')}",
+            list_name=list_name,
+            category=CATEGORY_SANCTIONS,
+            name=names[0],
+            aliases=names[1:],
+            entity_type="Individual" if code == "person" else "Entity",
+            programs=list(dict.fromkeys(program for program in programs if program)),
+            countries=list(dict.fromkeys(country.title() for country in countries if country and country != "UNKNOWN")),
+            provider=provider
+        )
+
+
+def parse_uk_hmt(path: str) -> Iterator[WatchlistEntry]:
+    """
+    UK HMT consolidated list CSV
+
+    Each row is one name of a group (Group ID); rows are merged per group, so the
+    groups (not the rows) are held in memory until the end of the file.
+    """
+    list_name, provider = UK_LIST
+    groups: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header: Optional[List[str]] = None
+        for row in reader:
+            if header is None:
+                # The file starts with a "Last Updated" line before the column names
+                if "Group ID" in row:
+                    header = row
+                continue
+            values = dict(zip(header, row))
+            group_id = values.get("Group ID", "").strip()
+            name = _join(*(values.get(f"Name {i}", "").strip() for i in range(1, 7)))
+            if not group_id or not name:
+                continue
+            group = groups.setdefault(group_id, {
+                "names": [], "primary": None, "programs": [], "countries": [], "type": values.get("Group Type", "")
+            })
+            group["names"].append(name)
+            if values.get("Alias Type", "").strip().lower() == "primary name" and group["primary"] is None:
+                group["primary"] = name
+            non_latin = values.get("Name Non-Latin Script", "").strip()
+            if non_latin:
+                group["names"].append(non_latin)
+            for key, target in (("Regime", "programs"), ("Country", "countries"), ("Nationality", "countries")):
+                value = values.get(key, "").strip()
+                if value:
+                    group[target].append(value)
+
+    for group_id, group in groups.items():
+        primary = group["primary"] or group["names"][0]
+        yield WatchlistEntry(
+            entry_id=f"UKHMT-{group_id}",
+            list_name=list_name,
+            category=CATEGORY_SANCTIONS,
+            name=primary,
+            aliases=[name for name in dict.fromkeys(group["names"]) if name != primary],
+            entity_type="Individual" if group["type"].strip().lower() == "individual" else (group["type"].strip() or "Entity"),
+            programs=list(dict.fromkeys(group["programs"])),
+            countries=list(dict.fromkeys(group["countries"])),
+            provider=provider
+        )
+
+
+PARSERS: Dict[str, Callable[[str], Iterator[WatchlistEntry]]] = {
+    "ofac": parse_ofac_sdn,
+    "un": parse_un_consolidated,
+    "eu": parse_eu_fsf,
+    "uk": parse_uk_hmt,
+    "jsonl": read_watchlist_file
+}
+
+_XML_ROOTS = {"sdnList": "ofac", "CONSOLIDATED_LIST": "un", "export": "eu"}
+
+
+def detect_format(path: str) -> str:
+    """Format of a list file, from its extension and (for XML) its root element"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".json", ".ndjson"):
+        return "jsonl"
+    if extension == ".csv":
+        return "uk"
+    for _, element in ElementTree.iterparse(path, events=("start",)):
+        root = _local(element.tag)
+        if root in _XML_ROOTS:
+            return _XML_ROOTS[root]
+        break
+    raise ValueError(f"Unrecognized watch-list file: {path}")
+
+
+def read_watchlists(sources: List[str]) -> Iterator[WatchlistEntry]:
+    """
+    Entries of several list files, in order
+
+    Args:
+        sources: file paths, optionally prefixed with their format ("uk:ConList.csv")
+    """
+    for source in sources:
+        prefix, _, rest = source.partition(":")
+        fmt, path = (prefix, rest) if prefix in PARSERS and rest else (detect_format(source), source)
+        count = 0
+        for entry in PARSERS[fmt](path):
+            count += 1
+            yield entry
+        logger.info(f"Parsed {count} entries from {path} ({fmt})")
+
+
+def ingest(sources: List[str], output: str) -> Dict[str, Any]:
+    """
+    Parse list files and write the compiled index file
+
+    The file is replaced atomically, so running screening processes pick up the
+    new version on their next check (see NameScreener).
+
+    Returns:
+        Header of the written file (list version, per-list entry counts, ...)
+    """
+    start = time.perf_counter()
+    index = ScreeningIndex.build(read_watchlists(sources), sources=sources)
+    index.save(output)
+    logger.info(
+        f"Wrote watch-list index {index.header['list_version']} to {output}: {index.entry_count} entries, "
+        f"{len(index)} names and aliases, {os.path.getsize(output) / (1024 * 1024):.1f} MB "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return {**index.header, "entries": index.entry_count, "aliases": len(index)}
@@ -0,0 +1,370 @@
+"""
+Watch-list Re-screening
+Re-screens the whole client book when a new watch-list version is loaded, without
+running the KYC workflow (or any LLM call) per client.
+
+Each succeeded run stores the content digest of every entry of the version it
+screened. The next run diffs the new version against them and screens only the
+entries that were added or changed:
+
+- delta: the changed entries' names and aliases are searched in a trigram index
+  built over all client names (the same engine, in the reverse direction), so
+  the cost grows with the size of the list update, not with the client book
+- full: the first run, or an update larger than the client book, screens every
+  client name against the lists instead
+
+Hits are kept as ScreeningMatch rows. A match seen for the first time sets the
+client's sanctions_flag/pep_flag and raises an Open RiskAlert; a match already on
+record is only refreshed. Matches whose entry left the lists are marked Delisted
+(the client's flags are left for the reviewer to clear).
+"""
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Callable
+
+import numpy as np
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.client import Client
+from ..models.risk_alert import RiskAlert
+from ..models.screening_run import ScreeningRun, ScreeningMatch
+from .name_screening import (
+    name_screener, normalize_name, ScreeningIndex, WatchlistEntry, CATEGORIES, CATEGORY_SANCTIONS, CATEGORY_PEP
+)
+from .similarity_index import similarity_index
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "Running"
+RUN_SUCCEEDED = "Succeeded"
+RUN_FAILED = "Failed"
+
+MODE_DELTA = "delta"
+MODE_FULL = "full"
+
+MATCH_ACTIVE = "Active"
+MATCH_DELISTED = "Delisted"
+
+# Clients read (and hits written) per database round trip
+CLIENT_BATCH_SIZE = 5000
+
+# Progress reported every this many screened names
+PROGRESS_INTERVAL = 10000
+
+CATEGORY_ALERTS = {
+    CATEGORY_SANCTIONS: {"flag": "sanctions_flag", "severity": "Critical", "tag": "Sanctions Match"},
+    CATEGORY_PEP: {"flag": "pep_flag", "severity": "High", "tag": "PEP Match"}
+}
+
+# (client id, entry position) -> (score, matched list name or alias)
+Hits = Dict[Tuple[int, int], Tuple[float, str]]
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _chunks(values: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class WatchlistRescreener:
+    """Screens the client book against the changes of each new watch-list version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # One run at a time per process
+
+    def run(self, progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+        """
+        Re-screen all clients against the currently loaded watch-list version
+
+        Skipped if that version was already screened, so the run is safe to retry.
+
+        Returns:
+            Run summary: list versions, mode, changed entries, hits, new alerts, ...
+        """
+        with self._lock:
+            index = name_screener.current_index()
+            if index is None or index.entry_count == 0:
+                return {"status": "Skipped", "reason": "No watch-lists loaded"}
+            version = index.header["list_version"]
+
+            db = SessionLocal()
+            try:
+                previous = self.last_run(db)
+                if previous is not None and previous.list_version == version:
+                    return {"status": "Skipped", "reason": "Version already screened", "list_version": version}
+                run = ScreeningRun(
+                    list_version=version,
+                    previous_version=previous.list_version if previous is not None else None,
+                    status=RUN_RUNNING
+                )
+                db.add(run)
+                db.commit()
+                try:
+                    stats = self._screen(db, index, previous, progress)
+                except Exception as e:
+                    db.rollback()
+                    run.status = RUN_FAILED
+                    run.error = str(e) or type(e).__name__
+                    run.finished_at = datetime.utcnow()
+                    db.commit()
+                    raise
+                run.status = RUN_SUCCEEDED
+                run.mode = stats["mode"]
+                run.entry_digests = np.sort(stats.pop("digests")).tobytes()
+                run.stats = stats
+                run.finished_at = datetime.utcnow()
+                db.commit()
+                logger.info(
+                    f"Re-screened {stats['clients']} clients against watch-lists {version} ({stats['mode']}, "
+                    f"{stats['entries_changed']} changed entries): {stats['new_matches']} new matches "
+                    f"in {stats['elapsed_seconds']}s"
+                )
+                return {"status": RUN_SUCCEEDED, "run_id": run.id, "list_version": version,
+                        "previous_version": run.previous_version, **stats}
+            finally:
+                db.close()
+
+    @staticmethod
+    def last_run(db) -> Optional[ScreeningRun]:
+        """Latest succeeded run (its digests are the baseline of the next one)"""
+        return (
+            db.query(ScreeningRun)
+            .filter(ScreeningRun.status == RUN_SUCCEEDED)
+            .order_by(ScreeningRun.id.desc())
+            .first()
+        )
+
+    def _screen(
+        self,
+        db,
+        index: ScreeningIndex,
+        previous: Optional[ScreeningRun],
+        progress: Optional[ProgressCallback]
+    ) -> Dict[str, Any]:
+        start = time.perf_counter()
+        digests = index.entry_digests()
+        baseline = np.frombuffer(previous.entry_digests, dtype=np.uint64) if previous is not None and previous.entry_digests else None
+        if baseline is None:
+            changed = np.arange(index.entry_count)
+            removed = 0
+        else:
+            changed = np.flatnonzero(~np.isin(digests, baseline))
+            removed = int((~np.isin(baseline, digests)).sum())
+        changed_aliases = int(np.isin(index.alias_entries, changed).sum())
+        client_count = db.query(Client.id).count()
+
+        # Delta: one search per changed alias; full: one search per client and category
+        if baseline is not None and changed_aliases <= len(CATEGORIES) * client_count:
+            mode = MODE_DELTA
+            hits = self._match_changed_entries(db, index, changed, progress)
+        else:
+            mode = MODE_FULL
+            hits = self._match_clients(db, index, progress)
+
+        entries = {position: index.entry(position) for position in {position for _, position in hits}}
+        new_matches, confirmed = self._record_matches(db, hits, entries, digests, index.header["list_version"])
+        delisted = self._delist(db, index, digests, changed)
+        return {
+            "mode": mode,
+            "digests": digests,
+            "entries": index.entry_count,
+            "entries_changed": len(changed),
+            "entries_removed_or_replaced": removed,
+            "aliases_screened": changed_aliases if mode == MODE_DELTA else None,
+            "clients": client_count,
+            "hits": len(hits),
+            "new_matches": new_matches,
+            "confirmed_matches": confirmed,
+            "delisted_matches": delisted,
+            "elapsed_seconds": round(time.perf_counter() - start, 3)
+        }
+
+    @staticmethod
+    def _client_index(db) -> Tuple[ScreeningIndex, np.ndarray]:
+        """Trigram index over every client name, with the client id of every index entry"""
+        rows = (
+            db.query(Client.id, Client.full_name, Client.nationality, Client.residency_country)
+            .yield_per(CLIENT_BATCH_SIZE)
+        )
+        client_ids: List[int] = []
+
+        def entries() -> Iterator[WatchlistEntry]:
+            for row in rows:
+                client_ids.append(row.id)
+                yield WatchlistEntry(
+                    entry_id=str(row.id),
+                    list_name="Clients",
+                    category=CATEGORY_SANCTIONS,
+                    name=row.full_name,
+                    countries=[country for country in (row.nationality, row.residency_country) if country]
+                )
+
+        index = ScreeningIndex.build(entries())
+        return index, np.asarray(client_ids, dtype=np.int64)
+
+    def _match_changed_entries(
+        self, db, index: ScreeningIndex, changed: np.ndarray, progress: Optional[ProgressCallback]
+    ) -> Hits:
+        """Search the names of changed entries in the client name index"""
+        clients, client_ids = self._client_index(db)
+        hits: Hits = {}
+        for done, position in enumerate(changed.tolist(), 1):
+            entry = index.entry(position)
+            for name in dict.fromkeys([entry.name, *entry.aliases]):
+                for client, _, score in clients.matches(
+                    name, None, settings.SCREENING_MATCH_THRESHOLD,
+                    settings.SCREENING_RESCREEN_MAX_CLIENT_HITS, settings.SCREENING_MAX_CANDIDATES
+                ):
+                    key = (int(client_ids[client]), position)
+                    if key not in hits or score > hits[key][0]:
+                        hits[key] = (score, normalize_name(name))
+            if progress and done % PROGRESS_INTERVAL == 0:
+                progress({"stage": "delta", "entries_screened": done, "entries_changed": len(changed), "hits": len(hits)})
+        return hits
+
+    @staticmethod
+    def _match_clients(db, index: ScreeningIndex, progress: Optional[ProgressCallback]) -> Hits:
+        """Screen every client name against the lists of every category"""
+        hits: Hits = {}
+        rows = db.query(Client.id, Client.full_name).yield_per(CLIENT_BATCH_SIZE)
+        for done, row in enumerate(rows, 1):
+            for category in CATEGORIES:
+                for position, alias, score in index.matches(
+                    row.full_name, category, settings.SCREENING_MATCH_THRESHOLD,
+                    settings.SCREENING_MAX_HITS, settings.SCREENING_MAX_CANDIDATES
+                ):
+                    hits[(row.id, position)] = (score, index.alias_name(alias))
+            if progress and done % PROGRESS_INTERVAL == 0:
+                progress({"stage": "full", "clients_screened": done, "hits": len(hits)})
+        return hits
+
+    def _record_matches(
+        self,
+        db,
+        hits: Hits,
+        entries: Dict[int, WatchlistEntry],
+        digests: np.ndarray,
+        version: str
+    ) -> Tuple[int, int]:
+        """
+        Store hits as matches; new (or relisted) ones flag the client and raise an alert
+
+        Returns:
+            (new matches, confirmed existing matches)
+        """
+        new_matches = confirmed = 0
+        by_client: Dict[int, List[Tuple[int, float, str]]] = {}
+        for (client_id, position), (score, alias) in hits.items():
+            by_client.setdefault(client_id, []).append((position, score, alias))
+
+        for batch in _chunks(sorted(by_client), CLIENT_BATCH_SIZE):
+            clients = {client.id: client for client in db.query(Client).filter(Client.id.in_(batch))}
+            existing = {
+                (match.client_id, match.entry_id): match
+                for match in db.query(ScreeningMatch).filter(ScreeningMatch.client_id.in_(batch))
+            }
+            alerted = set()
+            for client_id in batch:
+                client = clients.get(client_id)
+                if client is None:
+                    continue
+                for position, score, alias in by_client[client_id]:
+                    entry = entries[position]
+                    match = existing.get((client_id, entry.entry_id))
+                    is_new = match is None or match.status != MATCH_ACTIVE
+                    if match is None:
+                        match = ScreeningMatch(client_id=client_id, entry_id=entry.entry_id)
+                        db.add(match)
+                        existing[(client_id, entry.entry_id)] = match
+                    match.category = entry.category
+                    match.list_name = entry.list_name
+                    match.entry_name = entry.name
+                    match.matched_alias = alias
+                    match.score = round(score, 3)
+                    match.status = MATCH_ACTIVE
+                    match.entry_digest = f"{int(digests[position]):016x}"
+                    match.list_version = version
+                    if not is_new:
+                        confirmed += 1
+                        continue
+                    new_matches += 1
+                    alerted.add(client_id)
+                    setattr(client, CATEGORY_ALERTS[entry.category]["flag"], True)
+                    match.alert = self._alert(client, entry, alias, score)
+                    db.add(match.alert)
+            db.commit()
+            if alerted:
+                similarity_index.schedule_refresh(sorted(alerted))
+        return new_matches, confirmed
+
+    @staticmethod
+    def _alert(client: Client, entry: WatchlistEntry, alias: str, score: float) -> RiskAlert:
+        category = CATEGORY_ALERTS[entry.category]
+        return RiskAlert(
+            client_id=client.id,
+            severity=category["severity"],
+            risk_tags=[category["tag"], entry.list_name, *entry.programs],
+            summary=(
+                f"Watch-list re-screening: {client.full_name} matches {entry.name} on {entry.list_name} "
+                f"(alias '{alias}', name similarity {score:.2f})"
+            ),
+            next_steps=(
+                "Compare the listed entry with the client's identifying details (date of birth, nationality, "
+                "residency), then confirm or discount the match and update the client's risk assessment."
+            ),
+            priority=category["severity"],
+            status="Open",
+            sla_due_date=datetime.utcnow() + timedelta(hours=settings.SCREENING_ALERT_SLA_HOURS),
+            raw_activity_log=json.dumps(entry.to_dict(), ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _delist(db, index: ScreeningIndex, digests: np.ndarray, changed: np.ndarray) -> int:
+        """Mark active matches whose entry is no longer listed, unchanged or changed"""
+        current = set(digests.tolist())
+        stale = [
+            match for match in db.query(ScreeningMatch).filter(ScreeningMatch.status == MATCH_ACTIVE)
+            if not match.entry_digest or int(match.entry_digest, 16) not in current
+        ]
+        if not stale:
+            return 0
+        # The entry changed if its id is still listed; only changed entries can carry it
+        listed_ids = {index.entry(position).entry_id for position in changed.tolist()}
+        delisted = 0
+        for match in stale:
+            if match.entry_id not in listed_ids:
+                match.status = MATCH_DELISTED
+                delisted += 1
+        db.commit()
+        return delisted
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recent runs, newest first"""
+        db = SessionLocal()
+        try:
+            runs = db.query(ScreeningRun).order_by(ScreeningRun.id.desc()).limit(limit).all()
+            return [
+                {
+                    "run_id": run.id,
+                    "list_version": run.list_version,
+                    "previous_version": run.previous_version,
+                    "status": run.status,
+                    "mode": run.mode,
+                    "stats": run.stats,
+                    "error": run.error,
+                    "created_at": run.created_at.isoformat() if run.created_at else None,
+                    "finished_at": run.finished_at.isoformat() if run.finished_at else None
+                }
+                for run in runs
+            ]
+        finally:
+            db.close()
+
+
+# Global re-screener instance
+watchlist_rescreener = WatchlistRescreener()
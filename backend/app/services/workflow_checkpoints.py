@@ -0,0 +1,284 @@
+"""
+Workflow Checkpoint Store
+Persists agent workflow runs and the output of every step, so a failed run can be
+resumed from its first incomplete step and a run with identical inputs can reuse
+completed steps instead of paying for the model calls again.
+
+All methods are blocking (database I/O). Async callers run reads via
+asyncio.to_thread and queue writes with submit(), which executes them in order on
+a single writer thread so concurrent runs never contend for the database lock.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Callable
+
+from sqlalchemy import case, or_
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.workflow_run import WorkflowRun, WorkflowStep
+
+logger = logging.getLogger(__name__)
+
+RUN_RUNNING = "Running"
+RUN_COMPLETED = "Completed"
+RUN_INCOMPLETE = "Incomplete"
+RUN_FAILED = "Failed"
+
+STEP_COMPLETED = "Completed"
+STEP_INCOMPLETE = "Incomplete"
+
+# Fields of step inputs that describe how a result was obtained, not the result
+# (screening timings, cache hits, list load times): left out of step hashes
+VOLATILE_FIELDS = frozenset({"execution_time_ms", "cached", "last_updated"})
+
+
+def to_json(value: Any) -> Any:
+    """JSON-safe copy of a step input/output (as it will read back from the database)"""
+    return json.loads(json.dumps(value, default=str))
+
+
+def fingerprint(value: Any) -> str:
+    """SHA-256 of a JSON-serializable value, independent of key order"""
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _without_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _without_volatile(item) for key, item in value.items() if key not in VOLATILE_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [_without_volatile(item) for item in value]
+    return value
+
+
+class WorkflowCheckpointStore:
+    """Database-backed run and step checkpoints"""
+
+    def __init__(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-checkpoints")
+
+    @property
+    def enabled(self) -> bool:
+        return settings.WORKFLOW_CHECKPOINTS_ENABLED
+
+    def submit(self, fn: Callable[..., Any], *args) -> asyncio.Future:
+        """Queue a write method on the writer thread (writes execute in submission order)"""
+        # Carry the caller's context variables into the thread, as asyncio.to_thread does
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return asyncio.get_running_loop().run_in_executor(self._writer, call)
+
+    def step_hash(self, step_name: str, inputs: Dict[str, Any]) -> str:
+        """Checkpoint key of a step: its name, the model and its inputs (without VOLATILE_FIELDS)"""
+        return fingerprint({"step": step_name, "model": settings.OPENAI_MODEL, "inputs": _without_volatile(inputs)})
+
+    def start_run(self, run_id: str, workflow_type: str, input_data: Dict[str, Any]):
+        """Create the run, or mark an existing one as running again (resume)"""
+        db = SessionLocal()
+        try:
+            run = db.query(WorkflowRun).filter(WorkflowRun.run_id == run_id).first()
+            if run is None:
+                db.add(WorkflowRun(
+                    run_id=run_id,
+                    workflow_type=workflow_type,
+                    input_hash=fingerprint(input_data),
+                    input_data=to_json(input_data),
+                    status=RUN_RUNNING
+                ))
+            else:
+                run.status = RUN_RUNNING
+                run.error = None
+                run.completed_at = None
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Workflow checkpoint write failed (run {run_id}): {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def find_step(
+        self,
+        run_id: str,
+        step_name: str,
+        input_hash: str,
+        other_runs: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Latest completed checkpoint of a step with the same inputs
+
+        The run's own checkpoint (resume) is preferred; otherwise, unless
+        other_runs is False, any run's checkpoint younger than
+        WORKFLOW_CHECKPOINT_TTL_SECONDS is reused.
+        """
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=settings.WORKFLOW_CHECKPOINT_TTL_SECONDS)
+            own_run = WorkflowStep.run_id == run_id
+            step = (
+                db.query(WorkflowStep)
+                .filter(
+                    WorkflowStep.step_name == step_name,
+                    WorkflowStep.input_hash == input_hash,
+                    WorkflowStep.status == STEP_COMPLETED,
+                    or_(own_run, WorkflowStep.created_at >= cutoff) if other_runs else own_run
+                )
+                .order_by(case((own_run, 0), else_=1), WorkflowStep.created_at.desc())
+                .first()
+            )
+            if step is None:
+                return None
+            return {
+                "run_id": step.run_id,
+                "origin_run_id": step.reused_from or step.run_id,
+                "output": step.output,
+                "events": step.events or [],
+                "execution_time": step.execution_time,
+                "created_at": step.created_at
+            }
+        except Exception as e:
+            logger.warning(f"Workflow checkpoint read failed ({step_name}): {e}")
+            return None
+        finally:
+            db.close()
+
+    def save_step(
+        self,
+        run_id: str,
+        step_name: str,
+        input_hash: str,
+        status: str,
+        output: Any,
+        events: List[Any],
+        execution_time: float,
+        error: Optional[str] = None,
+        reused_from: Optional[str] = None,
+        created_at: Optional[datetime] = None
+    ):
+        """
+        Insert or replace the run's checkpoint for a step
+
+        A reused checkpoint keeps the creation time of the original, so reuse
+        never extends its TTL.
+        """
+        db = SessionLocal()
+        try:
+            step = db.query(WorkflowStep).filter(
+                WorkflowStep.run_id == run_id,
+                WorkflowStep.step_name == step_name
+            ).first()
+            if step is None:
+                step = WorkflowStep(run_id=run_id, step_name=step_name)
+                db.add(step)
+            step.input_hash = input_hash
+            step.status = status
+            step.output = to_json(output)
+            step.events = to_json(events)
+            step.execution_time = execution_time
+            step.error = error
+            step.reused_from = reused_from
+            step.created_at = created_at or datetime.utcnow()
+            # Activity of a running run (see claim_resume)
+            db.query(WorkflowRun).filter(WorkflowRun.run_id == run_id).update(
+                {WorkflowRun.updated_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Workflow checkpoint write failed ({run_id}/{step_name}): {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def claim_resume(self, run_id: str) -> bool:
+        """
+        Atomically mark a run as running again for a resume
+
+        Only runs that are not running can be claimed, or runs still marked as
+        running whose last checkpoint write is older than WORKFLOW_RUN_STALE_SECONDS
+        (the process executing them died). Of concurrent resumes, one wins.
+
+        Returns:
+            True when the caller may resume the run
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.WORKFLOW_RUN_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            claimed = (
+                db.query(WorkflowRun)
+                .filter(
+                    WorkflowRun.run_id == run_id,
+                    or_(WorkflowRun.status != RUN_RUNNING, WorkflowRun.updated_at < stale_before)
+                )
+                .update(
+                    {WorkflowRun.status: RUN_RUNNING, WorkflowRun.updated_at: datetime.utcnow()},
+                    synchronize_session=False
+                )
+            )
+            db.commit()
+            return claimed == 1
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def finish_run(self, run_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Record the final status (and result) of a run"""
+        db = SessionLocal()
+        try:
+            run = db.query(WorkflowRun).filter(WorkflowRun.run_id == run_id).first()
+            if run is None:
+                return
+            run.status = status
+            run.result = to_json(result) if result is not None else None
+            run.error = error
+            run.completed_at = datetime.utcnow()
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Workflow checkpoint write failed (run {run_id}): {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def get_run(self, run_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Run status with a summary of its step checkpoints"""
+        db = SessionLocal()
+        try:
+            run = db.query(WorkflowRun).filter(WorkflowRun.run_id == run_id).first()
+            if run is None:
+                return None
+            return {
+                "run_id": run.run_id,
+                "workflow_type": run.workflow_type,
+                "status": run.status,
+                "input_data": run.input_data,
+                "error": run.error,
+                "created_at": run.created_at.isoformat() if run.created_at else None,
+                "updated_at": run.updated_at.isoformat() if run.updated_at else None,
+                "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+                "steps": [
+                    {
+                        "step_name": step.step_name,
+                        "status": step.status,
+                        "input_hash": step.input_hash,
+                        "execution_time": step.execution_time,
+                        "reused_from": step.reused_from,
+                        "error": step.error,
+                        "created_at": step.created_at.isoformat() if step.created_at else None
+                    }
+                    for step in run.steps
+                ],
+                "result": run.result if include_result else None
+            }
+        finally:
+            db.close()
+
+
+# Global checkpoint store instance
+workflow_checkpoints = WorkflowCheckpointStore()
@@ -0,0 +1,61 @@
+"""
+Background Job Worker
+Executes queued agent workflows in a separate process, using the database as the
+queue. Run any number of these next to the API (with JOB_WORKER_CONCURRENCY=0 on
+the API servers so only the workers execute jobs):
+
+    python -m app.worker --concurrency 4
+
+SIGINT/SIGTERM stop the workers gracefully: jobs in progress are released back to
+the queue for another worker.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from .config import settings
+from .database import init_db
+from .services.job_queue import job_worker_pool
+from .services.llm_gateway import llm_gateway
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int):
+    """Run workers until a termination signal arrives"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_worker_pool.start(concurrency)
+    try:
+        await stop.wait()
+        logger.info("Shutting down job workers...")
+    finally:
+        await job_worker_pool.stop()
+        await llm_gateway.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background worker for queued agent workflows")
+    parser.add_argument(
+        "--concurrency", type=int, default=max(settings.JOB_WORKER_CONCURRENCY, 1),
+        help="Jobs executed concurrently by this process"
+    )
+    args = parser.parse_args()
+
+    init_db()
+    if not settings.OPENAI_API_KEY:
+        logger.warning("No OpenAI API key configured - running in MOCK MODE")
+    asyncio.run(run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
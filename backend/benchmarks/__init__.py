@@ -0,0 +1,7 @@
+"""
+Backend Benchmarks
+End-to-end HTTP load tests for the FastAPI backend against a deterministic stub LLM.
+
+Run from backend/:
+    python -m benchmarks.run --scales 100,1000,10000 --baseline benchmarks/baseline.json
+"""
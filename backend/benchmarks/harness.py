@@ -0,0 +1,154 @@
+"""
+Benchmark Harness
+Load generation, latency statistics and per-request database query counting.
+"""
+
+import asyncio
+import contextvars
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Header used to attribute server-side query counts to a benchmark endpoint
+LABEL_HEADER = "x-benchmark-endpoint"
+
+_query_counter: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("benchmark_query_counter", default=None)
+
+
+class QueryCounter:
+    """
+    Counts SQL statements executed while serving each labelled request
+
+    The ASGI wrapper stores a counter in a context variable for the duration of the
+    request; sync endpoints run in a threadpool that copies the context, so their
+    queries are attributed to the same request.
+    """
+
+    def __init__(self, engine: Engine):
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    @staticmethod
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    def wrap(self, app):
+        """ASGI middleware recording the query count of every labelled HTTP request"""
+        async def wrapped(scope, receive, send):
+            if scope["type"] != "http":
+                return await app(scope, receive, send)
+            label = dict(scope.get("headers") or []).get(LABEL_HEADER.encode())
+            counter = [0]
+            token = _query_counter.set(counter)
+            try:
+                await app(scope, receive, send)
+            finally:
+                _query_counter.reset(token)
+                if label:
+                    self.samples[label.decode()].append(counter[0])
+        return wrapped
+
+
+@dataclass
+class Endpoint:
+    """One benchmarked route; ``body`` builds the JSON payload for request ``i``"""
+    name: str
+    method: str
+    path: str
+    body: Optional[Callable[[int], Dict[str, Any]]] = None
+
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, min(len(ordered), int(round(p / 100.0 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+
+def summarize(latencies_ms: List[float], errors: int, wall_seconds: float, queries: List[int]) -> Dict[str, Any]:
+    """Latency percentiles, throughput and query statistics for one endpoint run"""
+    ordered = sorted(latencies_ms)
+    ordered_queries = sorted(queries)
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "rps": round(len(latencies_ms) / wall_seconds, 2) if wall_seconds > 0 else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else None,
+            "p50": round(percentile(ordered, 50), 2) if ordered else None,
+            "p95": round(percentile(ordered, 95), 2) if ordered else None,
+            "p99": round(percentile(ordered, 99), 2) if ordered else None,
+            "max": round(ordered[-1], 2) if ordered else None
+        },
+        "db_queries_per_request": {
+            "mean": round(sum(ordered_queries) / len(ordered_queries), 2) if ordered_queries else None,
+            "p95": percentile(ordered_queries, 95),
+            "max": ordered_queries[-1] if ordered_queries else None
+        }
+    }
+
+
+async def drive_endpoint(
+    base_url: str,
+    endpoint: Endpoint,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    timeout: float = 120.0
+) -> Dict[str, Any]:
+    """
+    Issue ``requests`` calls to one endpoint from ``concurrency`` workers
+
+    Warmup calls are sent first and excluded from statistics (they carry no label,
+    so their queries are not counted either).
+
+    Returns:
+        Raw measurements: latencies_ms, errors, wall_seconds, status_codes
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def call(i: int, labelled: bool) -> httpx.Response:
+            headers = {LABEL_HEADER: endpoint.name} if labelled else {}
+            json_body = endpoint.body(i) if endpoint.body else None
+            return await client.request(endpoint.method, endpoint.path, json=json_body, headers=headers)
+
+        for i in range(warmup):
+            await call(-(i + 1), labelled=False)
+
+        latencies: List[float] = []
+        status_codes: Dict[int, int] = defaultdict(int)
+        errors = 0
+        next_index = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for i in next_index:
+                start = time.perf_counter()
+                try:
+                    response = await call(i, labelled=True)
+                    status_codes[response.status_code] += 1
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    status_codes[0] += 1
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        "latencies_ms": latencies,
+        "errors": errors,
+        "wall_seconds": wall_seconds,
+        "status_codes": dict(status_codes)
+    }
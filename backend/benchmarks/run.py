@@ -0,0 +1,277 @@
+"""
+Benchmark Runner
+Seeds a fresh database per scale, serves the backend over HTTP against the stub LLM,
+drives concurrent load per endpoint and compares the results with a baseline.
+
+Each scale runs in its own subprocess so settings (DATABASE_URL, OPENAI_BASE_URL)
+are read fresh by the app at import time.
+
+Usage (from backend/):
+    python -m benchmarks.run                                  # default scales, print + save results
+    python -m benchmarks.run --scales 1000 --endpoints risk_alerts,open_alerts
+    python -m benchmarks.run --baseline benchmarks/baseline.json            # diff, exit 1 on regression
+    python -m benchmarks.run --baseline benchmarks/baseline.json --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from .harness import Endpoint
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARK_DIR)
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("kyc_analyze", "POST", "/api/kyc/analyze", lambda i: {
+        "full_name": f"Benchmark Applicant {i:06d}",
+        "nationality": "UK",
+        "residency_country": "Monaco",
+        "source_of_wealth": "Sale of technology company",
+        "kyc_notes": "Founder of a software company sold in 2019. Holds investment portfolio in Switzerland."
+    }),
+    Endpoint("risk_alerts", "GET", "/api/risk/alerts"),
+    Endpoint("open_alerts", "GET", "/api/alerts/open"),
+    Endpoint("cases", "GET", "/api/cases"),
+    Endpoint("dashboard_stats", "GET", "/api/dashboard/stats"),
+    Endpoint("orchestrate", "POST", "/agents/orchestrate", lambda i: {
+        "full_name": f"Benchmark Applicant {i:06d}",
+        "kyc_notes": "Private equity partner with holdings in the UK and Singapore.",
+        "nationality": "UK",
+        "residency_country": "Singapore"
+    }),
+]
+ENDPOINTS_BY_NAME = {endpoint.name: endpoint for endpoint in ENDPOINTS}
+
+
+# ---------------------------------------------------------------------------
+# Worker: one scale in an isolated process
+# ---------------------------------------------------------------------------
+
+def run_scale(args) -> Dict[str, Any]:
+    """Seed, serve and load-test one scale; must run in a fresh interpreter"""
+    from tools.llm_stub_server import StubServer, PROFILES
+
+    profile = replace(
+        PROFILES[args.llm_profile],
+        latency_ms=args.llm_latency_ms if args.llm_latency_ms is not None else PROFILES[args.llm_profile].latency_ms,
+        seed=args.seed
+    )
+    stub = StubServer(profile).start()
+
+    db_dir = tempfile.mkdtemp(prefix="xbanker-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["OPENAI_BASE_URL"] = stub.base_url
+    # Measure the backend, not the cache or the provider quota (override via env if wanted)
+    os.environ.setdefault("LLM_CACHE_ENABLED", "False")
+    os.environ.setdefault("LLM_RATE_LIMIT_RPM", "0")
+    os.environ.setdefault("LLM_RATE_LIMIT_TPM", "0")
+    os.environ.setdefault("SIMILARITY_INDEX_SNAPSHOT_PATH", os.path.join(db_dir, "similarity_index.npz"))
+
+    # Import after the environment is set: settings and the engine are created at import
+    from app.main import app
+    from app.database import SessionLocal, engine, init_db
+    from tools.server_thread import ServerThread
+    from .harness import QueryCounter, drive_endpoint, summarize
+    from .seed import seed_database
+
+    init_db()
+    db = SessionLocal()
+    try:
+        seed_start = time.perf_counter()
+        rows = seed_database(db, args.scale, seed=args.seed)
+        seed_seconds = time.perf_counter() - seed_start
+    finally:
+        db.close()
+
+    counter = QueryCounter(engine)
+    server = ServerThread(counter.wrap(app)).start()
+    endpoints = [ENDPOINTS_BY_NAME[name] for name in args.endpoints.split(",")]
+    results: Dict[str, Any] = {}
+    try:
+        for endpoint in endpoints:
+            raw = asyncio.run(drive_endpoint(
+                server.url, endpoint, args.requests, args.concurrency, warmup=args.warmup
+            ))
+            results[endpoint.name] = {
+                **summarize(raw["latencies_ms"], raw["errors"], raw["wall_seconds"], counter.samples.get(endpoint.name, [])),
+                "status_codes": raw["status_codes"]
+            }
+            print(f"  scale={args.scale} {endpoint.name}: {_format_line(results[endpoint.name])}", file=sys.stderr)
+    finally:
+        # Server shutdown runs the app's shutdown hook, which closes the LLM gateway
+        server.stop()
+        stub.stop()
+
+    return {"rows": rows, "seed_seconds": round(seed_seconds, 2), "endpoints": results}
+
+
+def _format_line(result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    queries = result["db_queries_per_request"]
+    return (f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+            f"rps={result['rps']} errors={result['errors']} queries={queries['mean']}")
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of ``results`` against ``baseline``
+
+    Latency (p95) and throughput may drift by ``tolerance`` (a fraction); query
+    counts are deterministic, so any increase in the mean is a regression.
+    """
+    regressions = []
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if not previous:
+            continue
+        for name, result in current["endpoints"].items():
+            before = previous["endpoints"].get(name)
+            if not before:
+                continue
+            label = f"scale={scale} {name}"
+            p95, base_p95 = result["latency_ms"]["p95"], before["latency_ms"]["p95"]
+            if p95 is not None and base_p95 and p95 > base_p95 * (1 + tolerance):
+                regressions.append(f"{label}: p95 {base_p95}ms -> {p95}ms")
+            rps, base_rps = result["rps"], before["rps"]
+            if rps is not None and base_rps and rps < base_rps * (1 - tolerance):
+                regressions.append(f"{label}: rps {base_rps} -> {rps}")
+            queries = result["db_queries_per_request"]["mean"]
+            base_queries = before["db_queries_per_request"]["mean"]
+            if queries is not None and base_queries is not None and queries > base_queries + 0.01:
+                regressions.append(f"{label}: queries/request {base_queries} -> {queries}")
+            if result["errors"] > before["errors"]:
+                regressions.append(f"{label}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="End-to-end HTTP benchmarks for the xBanker backend")
+    parser.add_argument("--scales", default="100,1000,10000", help="Comma-separated client counts to seed")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS_BY_NAME), help="Comma-separated endpoint names")
+    parser.add_argument("--requests", type=int, default=100, help="Measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per endpoint")
+    parser.add_argument("--llm-profile", default="fast", help="Stub LLM profile (see tools.llm_stub_server)")
+    parser.add_argument("--llm-latency-ms", type=float, help="Override the stub's median latency")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data generation and the stub")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Baseline results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed latency/throughput drift")
+    # Internal: run one scale and write its results to --worker-output
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    unknown = set(args.endpoints.split(",")) - set(ENDPOINTS_BY_NAME)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    if args.save_baseline and not args.baseline:
+        parser.error("--save-baseline requires --baseline")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.worker:
+        with open(args.worker_output, "w") as f:
+            json.dump(run_scale(args), f)
+        return 0
+
+    passthrough = [
+        "--endpoints", args.endpoints, "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--warmup", str(args.warmup), "--llm-profile", args.llm_profile, "--seed", str(args.seed)
+    ]
+    if args.llm_latency_ms is not None:
+        passthrough += ["--llm-latency-ms", str(args.llm_latency_ms)]
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("worker", "scale", "worker_output")}
+        },
+        "scales": {}
+    }
+
+    for scale in [int(s) for s in args.scales.split(",")]:
+        print(f"Running scale={scale} ...", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            worker_output = tmp.name
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.run", "--worker", "--scale", str(scale),
+                 "--worker-output", worker_output, *passthrough],
+                cwd=BACKEND_DIR, check=True
+            )
+            with open(worker_output) as f:
+                results["scales"][str(scale)] = json.load(f)
+        finally:
+            os.unlink(worker_output)
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}", file=sys.stderr)
+        return 0
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"Baseline {args.baseline} not found; run with --save-baseline to create it", file=sys.stderr)
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for key in ("requests", "concurrency", "llm_profile", "llm_latency_ms"):
+            if baseline.get("meta", {}).get("params", {}).get(key) != getattr(args, key):
+                print(f"Warning: baseline was recorded with a different --{key.replace('_', '-')}", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
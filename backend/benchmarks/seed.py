@@ -0,0 +1,138 @@
+"""
+Benchmark Data Seeding
+Deterministic synthetic clients, KYC history, alerts and cases at a given scale.
+"""
+
+import random
+from datetime import datetime, timedelta, date
+from typing import Dict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import Client, KYCRecord, RiskAlert, Case
+
+FIRST_NAMES = ["James", "Maria", "Wei", "Olga", "Ahmed", "Sofia", "Hiroshi", "Elena", "Carlos", "Amara", "Lukas", "Priya"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Ivanova", "Hassan", "Rossi", "Tanaka", "Petrova", "Silva", "Okafor", "Muller", "Sharma"]
+COUNTRIES = ["UK", "USA", "Switzerland", "Monaco", "Singapore", "Hong Kong", "UAE", "Cyprus", "Germany", "Brazil", "Russia", "India"]
+RISK_SCORES = ["Low", "Low", "Medium", "Medium", "High"]
+SEVERITIES = ["Low", "Medium", "Medium", "High", "Critical"]
+ALERT_STATUSES = ["Open", "Open", "Under Review", "Escalated", "Closed"]
+CASE_STATUSES = ["Open", "Under Investigation", "Closed"]
+RISK_TAGS = ["transaction_pattern_risk", "pep_association", "high_risk_jurisdiction", "structuring", "unusual_activity", "sanctions_exposure", "adverse_media"]
+
+# Rows generated per client
+KYC_RECORDS_PER_CLIENT = 2
+ALERTS_PER_CLIENT = 3
+CLIENTS_PER_CASE = 4
+
+INSERT_BATCH_SIZE = 5000
+
+
+def _insert(db: Session, model, rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def seed_database(db: Session, clients: int, seed: int = 42) -> Dict[str, int]:
+    """
+    Populate an empty database with ``clients`` clients and proportional history
+
+    Args:
+        db: Database session (tables must exist)
+        clients: Number of clients to create
+        seed: RNG seed so every run sees the same data
+
+    Returns:
+        Row counts per table
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    today = date.today()
+
+    client_rows = []
+    for i in range(1, clients + 1):
+        risk = rng.choice(RISK_SCORES)
+        client_rows.append({
+            "id": i,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:06d}",
+            "date_of_birth": date(1950, 1, 1) + timedelta(days=rng.randint(0, 18000)),
+            "nationality": rng.choice(COUNTRIES),
+            "residency_country": rng.choice(COUNTRIES),
+            "source_of_wealth": "Business ownership and investment portfolio",
+            "business_activity": "Holding company",
+            "pep_flag": rng.random() < 0.05,
+            "sanctions_flag": rng.random() < 0.01,
+            "risk_score": risk,
+            "risk_rationale": f"Synthetic {risk.lower()} risk profile",
+            "kyc_summary": "Synthetic benchmark client",
+            "raw_kyc_notes": "Synthetic KYC notes for benchmarking.",
+            "status": "Active",
+            "next_review_date": today + timedelta(days=rng.randint(-60, 365)),
+            "created_at": now - timedelta(days=rng.randint(0, 720)),
+            "updated_at": now
+        })
+    _insert(db, Client, client_rows)
+
+    kyc_rows = []
+    for client in client_rows:
+        for version in range(1, KYC_RECORDS_PER_CLIENT + 1):
+            kyc_rows.append({
+                "client_id": client["id"],
+                "version": version,
+                "risk_score": client["risk_score"],
+                "risk_rationale": client["risk_rationale"],
+                "kyc_summary": client["kyc_summary"],
+                "pep_flag": client["pep_flag"],
+                "sanctions_flag": client["sanctions_flag"],
+                "cdd_conclusion": "Enhanced CDD" if client["risk_score"] == "High" else "Standard CDD",
+                "edd_required": client["risk_score"] == "High",
+                "review_date": today - timedelta(days=365 * (KYC_RECORDS_PER_CLIENT - version)),
+                "next_review_date": client["next_review_date"],
+                "created_at": client["created_at"]
+            })
+    _insert(db, KYCRecord, kyc_rows)
+
+    alert_rows = []
+    alert_id = 0
+    for client in client_rows:
+        for _ in range(ALERTS_PER_CLIENT):
+            alert_id += 1
+            severity = rng.choice(SEVERITIES)
+            created = now - timedelta(hours=rng.randint(0, 24 * 30))
+            alert_rows.append({
+                "id": alert_id,
+                "client_id": client["id"],
+                "severity": severity,
+                "risk_tags": rng.sample(RISK_TAGS, 2),
+                "summary": f"Synthetic {severity.lower()} severity alert",
+                "next_steps": "Review activity",
+                "status": rng.choice(ALERT_STATUSES),
+                "priority": severity,
+                "sla_due_date": created + timedelta(days=rng.choice([1, 3, 7])),
+                "created_at": created
+            })
+    _insert(db, RiskAlert, alert_rows)
+
+    case_rows = []
+    for i, client in enumerate(client_rows[::CLIENTS_PER_CASE]):
+        created = now - timedelta(days=rng.randint(0, 90))
+        case_rows.append({
+            "alert_id": i * CLIENTS_PER_CASE * ALERTS_PER_CLIENT + 1,
+            "client_id": client["id"],
+            "case_type": rng.choice(["AML", "Sanctions", "Fraud"]),
+            "status": rng.choice(CASE_STATUSES),
+            "priority": rng.choice(SEVERITIES),
+            "investigation_notes": "Synthetic investigation",
+            "created_at": created,
+            "updated_at": created
+        })
+    _insert(db, Case, case_rows)
+
+    db.commit()
+    return {
+        "clients": len(client_rows),
+        "kyc_records": len(kyc_rows),
+        "risk_alerts": len(alert_rows),
+        "cases": len(case_rows)
+    }
@@ -0,0 +1,34 @@
+"""
+Test configuration
+Points the application at a throwaway SQLite database and keeps it away from
+external services (no OpenAI key, no watch-list files, no index snapshot).
+The environment is set before the app package is imported, since settings and
+the database engine are created at import time.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_DATA_DIR = tempfile.mkdtemp(prefix="xbanker-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DATA_DIR, 'test.db')}"
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["SIMILARITY_INDEX_SNAPSHOT_PATH"] = ""
+os.environ["SCREENING_INDEX_PATH"] = ""
+os.environ["SCREENING_WATCHLIST_PATHS"] = ""
+os.environ["JOB_WORKER_CONCURRENCY"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def database():
+    """Empty application tables for one test"""
+    from app.database import Base, engine, init_db
+
+    Base.metadata.drop_all(bind=engine)
+    init_db()
+    yield engine
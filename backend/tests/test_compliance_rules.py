@@ -0,0 +1,104 @@
+"""
+Compliance rules fast path: decisions are only taken on fully screened cases, and
+their audit breakdown reflects the facts of the case.
+"""
+
+import copy
+
+import pytest
+
+from app.services.compliance_rules import ComplianceRulesEngine, DEFAULT_RULES, case_facts, compile_rules
+
+RISK_LOW = {"risk_assessment": {"risk_score": "Low"}, "extracted_data": {"red_flags": []}}
+CLEAR_PEP = {"is_pep": False, "list_version": "v1", "matches": []}
+CLEAR_SANCTIONS = {"is_sanctioned": False, "list_version": "v1", "matches": []}
+
+
+def sanctions_hit(score: float = 0.99, jurisdiction_match: bool = True):
+    return {
+        "is_sanctioned": True,
+        "list_version": "v1",
+        "matches": [{"entry_id": "SDN-1", "score": score, "jurisdiction_match": jurisdiction_match}]
+    }
+
+
+def pep_hit(score: float = 0.93):
+    return {"is_pep": True, "list_version": "v1", "matches": [{"entry_id": "PEP-1", "score": score}]}
+
+
+@pytest.fixture
+def engine():
+    engine = ComplianceRulesEngine()
+    engine.load(DEFAULT_RULES, "default")
+    return engine
+
+
+def test_sanctioned_pep_is_rejected_with_failed_pep_check(engine):
+    facts = case_facts(RISK_LOW, pep_hit(), sanctions_hit(), inputs_complete=True)
+
+    outcome = engine.evaluate(facts)
+
+    assert outcome["rule"] == "confirmed_sanctions_hit"
+    decision = outcome["decision"]
+    assert decision["compliance_status"] == "Rejected"
+    assert decision["decision_breakdown"] == {"kyc_data": "Pass", "pep_check": "Fail", "sanctions_check": "Fail"}
+    assert decision["pep_flag"] is True and decision["sanctions_flag"] is True
+    assert "0.99" in decision["rationale"]
+
+
+def test_sanctioned_client_with_red_flags_gets_kyc_warning(engine):
+    risk = {"risk_assessment": {"risk_score": "High"}, "extracted_data": {"red_flags": ["Shell companies"]}}
+    facts = case_facts(risk, CLEAR_PEP, sanctions_hit(), inputs_complete=True)
+
+    decision = engine.evaluate(facts)["decision"]
+
+    assert decision["decision_breakdown"] == {"kyc_data": "Warning", "pep_check": "Pass", "sanctions_check": "Fail"}
+
+
+def test_clean_low_risk_is_approved_after_real_screening(engine):
+    outcome = engine.evaluate(case_facts(RISK_LOW, CLEAR_PEP, CLEAR_SANCTIONS, inputs_complete=True))
+
+    assert outcome["rule"] == "clean_low_risk"
+    assert outcome["decision"]["decision_breakdown"] == {"kyc_data": "Pass", "pep_check": "Pass", "sanctions_check": "Pass"}
+
+
+@pytest.mark.parametrize("pep, sanctions, inputs_complete", [
+    ({"is_pep": False, "demo": True}, {"is_sanctioned": False, "demo": True}, True),  # demo screening
+    (CLEAR_PEP, {"is_sanctioned": False}, True),  # sanctions not screened against a list
+    (CLEAR_PEP, CLEAR_SANCTIONS, False),  # an upstream step fell back to placeholder data
+    (pep_hit(), CLEAR_SANCTIONS, True),  # PEP match: needs review
+])
+def test_unclear_cases_go_to_the_model(engine, pep, sanctions, inputs_complete):
+    assert engine.evaluate(case_facts(RISK_LOW, pep, sanctions, inputs_complete)) is None
+
+
+def test_sanctions_hit_outside_client_jurisdictions_goes_to_the_model(engine):
+    facts = case_facts(RISK_LOW, CLEAR_PEP, sanctions_hit(jurisdiction_match=False), inputs_complete=True)
+
+    assert engine.evaluate(facts) is None
+
+
+@pytest.mark.parametrize("field, template", [
+    ("rationale", "Matched {unknown_fact}"),
+    ("rationale", "Literal { brace"),
+    ("pep_check", "{is_pep_status}"),
+])
+def test_rules_with_unrenderable_templates_are_rejected(field, template):
+    rules = copy.deepcopy(DEFAULT_RULES)
+    if field == "rationale":
+        rules[0]["decision"]["rationale"] = template
+    else:
+        rules[0]["decision"]["decision_breakdown"][field] = template
+
+    with pytest.raises(ValueError):
+        compile_rules(rules)
+
+
+def test_render_failure_falls_back_to_the_model():
+    rules = copy.deepcopy(DEFAULT_RULES[1:])
+    rules[0]["decision"]["rationale"] = "{risk_score:.2f}"  # valid fact, wrong format for a string
+    engine = ComplianceRulesEngine()
+    engine.load(rules, "test")
+
+    assert engine.evaluate(case_facts(RISK_LOW, CLEAR_PEP, CLEAR_SANCTIONS, inputs_complete=True)) is None
+    assert engine.stats()["fast_path"] == 0
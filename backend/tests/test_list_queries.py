@@ -0,0 +1,91 @@
+"""
+Alert and case list endpoints fetch their rows and the client names in a fixed
+number of queries, however many rows they return (no per-row client lookups).
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+SMALL = 5
+LARGE = 10 * SMALL
+
+# path -> (queries per request, function extracting the rows from the response)
+ENDPOINTS = {
+    "/api/risk/alerts?limit=1000": (2, lambda body: body["alerts"]),
+    "/api/alerts/open": (1, lambda body: body),
+    "/api/cases": (1, lambda body: body),
+}
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seed(total: int):
+    """Add clients, open alerts and cases until there are ``total`` of each (every fourth without a client)"""
+    from app.database import SessionLocal
+    from app.models import Case, Client, RiskAlert
+
+    db = SessionLocal()
+    try:
+        start = db.query(Client).count()
+        now = datetime.utcnow()
+        for i in range(start, total):
+            client = Client(full_name=f"Client {i}", status="Active")
+            db.add(client)
+            db.flush()
+            client_id = None if i % 4 == 3 else client.id
+            alert = RiskAlert(
+                client_id=client_id,
+                severity="High",
+                risk_tags=["Test"],
+                summary=f"Alert {i}",
+                status="Open",
+                priority="High",
+                sla_due_date=now + timedelta(hours=i)
+            )
+            db.add(alert)
+            db.flush()
+            db.add(Case(alert_id=alert.id, client_id=client_id, case_type="AML", status="Open", priority="High"))
+        db.commit()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(database):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", list(ENDPOINTS))
+def test_list_endpoint_query_count_is_constant(client, database, path):
+    expected_queries, rows_of = ENDPOINTS[path]
+    counts = []
+    for total in (SMALL, LARGE):
+        seed(total)
+        with count_queries(database) as statements:
+            response = client.get(path)
+        assert response.status_code == 200
+        rows = rows_of(response.json())
+        assert len(rows) == total
+        named = [row for row in rows if row["client_id"] is not None]
+        assert named and all(row["client_name"] == f"Client {row['client_id'] - 1}" for row in named)
+        assert all(row["client_name"] is None for row in rows if row["client_id"] is None)
+        counts.append(len(statements))
+    assert counts == [expected_queries, expected_queries], f"{path}: queries at {SMALL} and {LARGE} rows: {counts}"
@@ -0,0 +1,151 @@
+"""
+Overlapping workflows on the shared orchestrator must not see each other's state:
+every run's execution log, events, outputs and checkpoints belong to that run only.
+"""
+
+import asyncio
+import json
+import random
+import re
+
+import pytest
+
+CLIENTS = ["Alice Aldridge", "Bruno Bellini", "Chiara Castelli", "Dmitri Dorokhov", "Elena Esposito", "Farid Farouk"]
+
+
+class StubLLMService:
+    """
+    Answers each agent prompt with data derived from the client it is about, after
+    a random delay, so overlapping runs interleave and any leak shows up as
+    another client's name in a run's output
+    """
+
+    def __init__(self, seed: int = 7):
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def generate_completion(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.random.uniform(0, 0.02))
+        client = re.search(r"Client Name: (.+)", prompt)
+        if client:
+            name = client.group(1).strip()
+            return json.dumps({
+                "wealth_sources": [f"{name} holdings"],
+                "business_activities": [f"{name} trading"],
+                "jurisdictions": [],
+                "red_flags": [],
+                "confidence_score": 80
+            })
+        client = re.search(r"Wealth Sources: \['(.+) holdings'\]", prompt)
+        if client:
+            name = client.group(1)
+            return json.dumps({
+                "risk_score": "Medium",
+                "risk_factors": [f"{name} factor"],
+                "comparison_to_historical": f"{name} compared",
+                "confidence": 70
+            })
+        client = re.search(r"Client: (.+)", prompt)
+        if client:
+            name = client.group(1).strip()
+            return json.dumps({
+                "compliance_status": "Review Required",
+                "confidence_score": 0.7,
+                "risk_score": 50,
+                "approval_tier": "Level 2 (Senior Review)",
+                "decision_breakdown": {
+                    "kyc_data": "Pass",
+                    "rag_check": "Pass",
+                    "pep_check": "Pass",
+                    "sanctions_check": "Pass"
+                },
+                "pep_flag": False,
+                "sanctions_flag": False,
+                "recommended_actions": [f"Review {name}"],
+                "rationale": f"Decision for {name}"
+            })
+        raise AssertionError(f"Unexpected prompt: {prompt[:80]}")
+
+    async def stream_completion(self, prompt: str, **kwargs):
+        text = await self.generate_completion(prompt, **kwargs)
+        for start in range(0, len(text), 8):
+            await asyncio.sleep(0)
+            yield text[start:start + 8]
+
+
+@pytest.fixture
+def orchestrator(database, monkeypatch):
+    from app.services.agent_orchestrator import agent_orchestrator
+
+    stub = StubLLMService()
+    monkeypatch.setattr(agent_orchestrator, "llm_service", stub)
+    return agent_orchestrator
+
+
+def _run_workflows(orchestrator, streaming: bool):
+    events = {name: [] for name in CLIENTS}
+
+    def sink_for(name):
+        async def sink(event, data):
+            events[name].append((event, data))
+        return sink
+
+    async def run_all():
+        return await asyncio.gather(*(
+            orchestrator.orchestrate_kyc_workflow(
+                {"full_name": name, "kyc_notes": f"{name} is a private banking client."},
+                event_sink=sink_for(name) if streaming else None,
+                run_id=f"run{index}",
+                reuse_checkpoints=False
+            )
+            for index, name in enumerate(CLIENTS)
+        ))
+
+    return asyncio.run(run_all()), events
+
+
+def _assert_only(name: str, value) -> None:
+    text = json.dumps(value, default=str)
+    assert name in text
+    for other in CLIENTS:
+        if other != name:
+            assert other not in text, f"{other} leaked into the run of {name}"
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_overlapping_runs_keep_their_own_logs_and_outputs(orchestrator, streaming):
+    results, events = _run_workflows(orchestrator, streaming)
+
+    for index, (name, result) in enumerate(zip(CLIENTS, results)):
+        assert result["metadata"]["run_id"] == f"run{index}"
+        log = result["workflow_execution"]
+        assert [entry["agent_name"] for entry in log] == [
+            "KYC Analyst Agent", "Risk Assessor Agent", "Compliance Agent"
+        ]
+        _assert_only(name, log)
+        _assert_only(name, result["final_result"])
+        assert result["final_result"]["compliance_decision"]["rationale"] == f"Decision for {name}"
+        assert result["final_result"]["risk_assessment"]["risk_factors"] == [f"{name} factor"]
+        assert set(result["metadata"]["agent_timings"]) == {
+            "KYC Analyst Agent", "Risk Assessor Agent", "Compliance Agent"
+        }
+        if streaming:
+            started = [data for event, data in events[name] if event == "workflow_started"]
+            assert [data["run_id"] for data in started] == [f"run{index}"]
+            _assert_only(name, events[name])
+        else:
+            assert events[name] == []
+
+
+def test_overlapping_runs_checkpoint_their_own_steps(orchestrator):
+    from app.services.workflow_checkpoints import workflow_checkpoints
+
+    results, _ = _run_workflows(orchestrator, streaming=False)
+
+    for index, name in enumerate(CLIENTS):
+        run = workflow_checkpoints.get_run(f"run{index}")
+        assert run["status"] == "Completed"
+        assert run["input_data"]["full_name"] == name
+        assert {step["step_name"] for step in run["steps"]} == {"kyc_analyst", "risk_assessor", "compliance_agent"}
+        _assert_only(name, run["result"]["final_result"])
@@ -0,0 +1 @@
+"""Developer tooling for running and measuring the backend offline"""
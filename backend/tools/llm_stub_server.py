@@ -0,0 +1,474 @@
+"""
+Local LLM Stub Server
+OpenAI-compatible stand-in for the chat completions API, for load testing the real
+network path (gateway, scheduler, streaming) on a machine without provider access.
+
+Responses are schema-valid JSON for every prompt the backend issues (AIAnalysisService
+templates and chunk prompts, LLMService analyses and insights, and the three
+orchestrator agents), derived deterministically from the prompt so identical
+requests get identical answers. Latency, streaming speed and failures are driven by
+a profile that can be changed at runtime via POST /stub/profile.
+
+Usage (from backend/):
+    python -m tools.llm_stub_server --profile realistic --port 8100
+
+Then point the backend at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict, fields, replace
+from typing import Dict, Any, Optional, List, AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .server_thread import ServerThread
+
+# Characters per streamed token (approximates the provider's tokenisation)
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class StubProfile:
+    """Latency and failure behaviour of the stub"""
+    latency_distribution: str = "lognormal"  # fixed | uniform | normal | lognormal
+    latency_ms: float = 800.0  # Median time to first byte
+    latency_spread: float = 0.5  # uniform: +/- fraction, normal: stddev fraction, lognormal: sigma
+    latency_max_ms: float = 30000.0
+    tokens_per_second: float = 60.0  # Streaming speed after the first token (0 = as fast as possible)
+    error_rate_429: float = 0.0
+    error_rate_500: float = 0.0
+    timeout_rate: float = 0.0  # Fraction of requests that hang without responding
+    timeout_hang_seconds: float = 300.0
+    retry_after_seconds: float = 1.0  # Retry-After header on injected 429s
+    seed: Optional[int] = None  # Seeds latency/failure sampling for reproducible runs
+
+
+PROFILES: Dict[str, StubProfile] = {
+    # No latency or failures: measures backend overhead only
+    "instant": StubProfile(latency_distribution="fixed", latency_ms=0.0, tokens_per_second=0.0),
+    # Fixed small latency: deterministic benchmark runs
+    "fast": StubProfile(latency_distribution="fixed", latency_ms=50.0, tokens_per_second=0.0),
+    # Roughly gpt-4o-like: ~0.8s median first byte with a long tail, ~60 tokens/s
+    "realistic": StubProfile(),
+    # Realistic latency plus provider throttling, server errors and hung requests
+    "flaky": StubProfile(error_rate_429=0.05, error_rate_500=0.02, timeout_rate=0.01),
+    # Provider under load: slow and heavily throttled
+    "degraded": StubProfile(latency_ms=3000.0, latency_spread=0.8, tokens_per_second=20.0, error_rate_429=0.2),
+}
+
+
+# ---------------------------------------------------------------------------
+# Response generation
+# ---------------------------------------------------------------------------
+
+HIGH_RISK_TERMS = ["sanction", "ofac", "shell compan", "offshore", "structur", "cash-intensive", "adverse media", "fraud", "launder"]
+PEP_TERMS = ["pep", "minister", "politically exposed", "senator", "governor", "ambassador", "parliament", "state-owned"]
+SANCTION_TERMS = ["sanction", "ofac", "sdn", "embargo", "designated"]
+JURISDICTIONS = [
+    "United Kingdom", "UK", "United States", "USA", "Switzerland", "Monaco", "Singapore", "Hong Kong",
+    "Cayman Islands", "British Virgin Islands", "Panama", "Cyprus", "Luxembourg", "UAE", "Dubai",
+    "Russia", "Iran", "China", "Germany", "France", "Jersey", "Guernsey"
+]
+
+
+class _Signals:
+    """Keyword signals extracted from a prompt to shape the stub's answer"""
+
+    def __init__(self, text: str):
+        lowered = text.lower()
+        self.text = text
+        self.rng = random.Random(int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16))
+        self.pep = any(term in lowered for term in PEP_TERMS)
+        self.sanctions = any(term in lowered for term in SANCTION_TERMS)
+        self.risk_hits = sum(lowered.count(term) for term in HIGH_RISK_TERMS)
+        self.jurisdictions = [j for j in JURISDICTIONS if re.search(rf"\b{re.escape(j)}\b", text)][:5]
+        self.entities = list(dict.fromkeys(re.findall(r"\b[A-Z][a-z]+(?: [A-Z][a-z]+)+(?: (?:Ltd|LLC|Inc|AG|SA|GmbH))?\b", text)))[:6]
+
+    @property
+    def level(self) -> int:
+        """0=Low, 1=Medium, 2=High, 3=Critical"""
+        if self.sanctions:
+            return 3
+        if self.pep or self.risk_hits >= 3:
+            return 2
+        if self.risk_hits >= 1:
+            return 1
+        return self.rng.choice([0, 0, 1])
+
+
+LEVELS = ["Low", "Medium", "High", "Critical"]
+
+# Instructions that follow the client data in backend prompts; signals are read from
+# the text before them so the instructions' own vocabulary (e.g. "PEP") is ignored
+INSTRUCTION_MARKERS = [
+    "**Analysis Requirements:**", "Extract only what this section states", "Extract and return JSON",
+    "Based on the current profile", "Make final compliance decision", "Provide your analysis in",
+    "Provide your risk analysis", "Generate Client 360 insights"
+]
+
+
+def _data_section(messages: List[Dict[str, Any]]) -> str:
+    """Client-supplied portion of the last user message"""
+    user_messages = [str(m.get("content") or "") for m in messages if m.get("role") == "user"]
+    text = user_messages[-1] if user_messages else ""
+    cut = min((text.find(marker) for marker in INSTRUCTION_MARKERS if marker in text), default=len(text))
+    return text[:cut]
+
+
+def _risk_score(s: _Signals) -> str:
+    return LEVELS[min(s.level, 2)]
+
+
+def _kyc_analysis(s: _Signals) -> Dict[str, Any]:
+    risk = _risk_score(s)
+    enhanced = risk == "High"
+    return {
+        "risk_score": risk,
+        "pep_flag": s.pep,
+        "sanctions_flag": s.sanctions,
+        "risk_rationale": f"Stub assessment: {s.risk_hits} risk indicator(s) found"
+                          + (", PEP exposure identified" if s.pep else "")
+                          + (", potential sanctions nexus" if s.sanctions else "") + ".",
+        "kyc_summary": "Stub KYC summary generated from the supplied client profile and documentation.",
+        "cdd_conclusion": "Enhanced CDD" if enhanced else "Standard CDD",
+        "edd_required": enhanced,
+        "next_review_months": {"Low": 12, "Medium": 6, "High": 3}[risk]
+    }
+
+
+def _kyc_chunk_findings(s: _Signals) -> Dict[str, Any]:
+    return {
+        "pep_indicators": ["Public office or political connection referenced"] if s.pep else [],
+        "sanctions_indicators": ["Possible sanctions list reference"] if s.sanctions else [],
+        "risk_factors": [f"Risk keyword occurrences: {s.risk_hits}"] if s.risk_hits else [],
+        "mitigating_factors": [] if s.risk_hits else ["No adverse indicators in this section"],
+        "key_facts": [f"Jurisdiction mentioned: {j}" for j in s.jurisdictions]
+    }
+
+
+def _risk_surveillance(s: _Signals) -> Dict[str, Any]:
+    severity = LEVELS[s.level]
+    tags = []
+    if s.risk_hits:
+        tags.append("transaction_pattern_risk")
+    if s.pep:
+        tags.append("pep_association")
+    if s.sanctions:
+        tags.append("sanctions_exposure")
+    if any(j in s.jurisdictions for j in ("Cayman Islands", "British Virgin Islands", "Panama", "Iran", "Russia")):
+        tags.append("high_risk_jurisdiction")
+    return {
+        "severity": severity,
+        "summary": f"Stub surveillance finding with {s.risk_hits} suspicious indicator(s).",
+        "risk_tags": tags or ["unusual_activity"],
+        "entities": s.entities + s.jurisdictions,
+        "next_steps": "Escalate to MLRO and consider SAR filing." if s.level >= 2 else "Continue standard monitoring.",
+        "priority": severity
+    }
+
+
+def _client_insights(s: _Signals) -> Dict[str, Any]:
+    return {
+        "profile_overview": ["Stub profile point 1", "Stub profile point 2", "Stub profile point 3", "Stub profile point 4"],
+        "risk_compliance_view": ["Stub risk point 1", "Stub risk point 2", "Stub risk point 3", "Stub risk point 4"],
+        "suggested_rm_actions": ["Stub action 1", "Stub action 2", "Stub action 3", "Stub action 4"],
+        "next_best_actions": ["Stub opportunity 1", "Stub opportunity 2", "Stub opportunity 3", "Stub opportunity 4"]
+    }
+
+
+def _agent_kyc_extraction(s: _Signals) -> Dict[str, Any]:
+    return {
+        "wealth_sources": ["Business profits", "Investment portfolio"],
+        "business_activities": ["Private equity"] if "equity" in s.text.lower() else ["Consulting"],
+        "jurisdictions": s.jurisdictions or ["UK"],
+        "red_flags": ["Risk keywords present in KYC notes"] if s.risk_hits else [],
+        "confidence_score": s.rng.randint(70, 95)
+    }
+
+
+def _agent_risk_assessment(s: _Signals) -> Dict[str, Any]:
+    return {
+        "risk_score": _risk_score(s),
+        "risk_factors": ["Complex jurisdictional footprint"] if len(s.jurisdictions) > 2 else [],
+        "comparison_to_historical": "Profile is broadly consistent with retrieved historical cases.",
+        "confidence": s.rng.randint(70, 95)
+    }
+
+
+def _agent_compliance_decision(s: _Signals) -> Dict[str, Any]:
+    # The prompt embeds the tool results as Python dict reprs
+    pep = "'is_pep': True" in s.text
+    sanctioned = "'is_sanctioned': True" in s.text
+    high = "'risk_score': 'High'" in s.text
+    if sanctioned:
+        status, tier, score = "Rejected", "Level 3 (Executive)", 90
+    elif pep or high:
+        status, tier, score = "Review Required", "Level 2 (Senior Review)", 65
+    else:
+        status, tier, score = "Approved", "Level 1 (Automated)", 15
+    return {
+        "compliance_status": status,
+        "confidence_score": round(0.8 + s.rng.random() * 0.19, 2),
+        "risk_score": score,
+        "approval_tier": tier,
+        "decision_breakdown": {
+            "kyc_data": "Pass",
+            "rag_check": "Warning" if high else "Pass",
+            "pep_check": "Warning" if pep else "Pass",
+            "sanctions_check": "Fail" if sanctioned else "Pass"
+        },
+        "pep_flag": pep,
+        "sanctions_flag": sanctioned,
+        "recommended_actions": ["Escalate for senior review"] if status != "Approved" else ["Approve account opening", "Schedule standard annual review"],
+        "rationale": f"Stub decision: {status.lower()} based on PEP={pep}, sanctions={sanctioned} and assessed risk. "
+                     "Tool results and the risk assessment were weighed against policy thresholds."
+    }
+
+
+# (marker found in the prompt, generator) - first match wins, most specific first
+RESPONSE_TEMPLATES: List[tuple] = [
+    ('"pep_indicators"', _kyc_chunk_findings),
+    ('"next_review_months"', _kyc_analysis),
+    ('"profile_overview"', _client_insights),
+    ("Senior Compliance Officer", _agent_compliance_decision),
+    ("KYC Analyst Agent", _agent_kyc_extraction),
+    ("Risk Assessment Agent", _agent_risk_assessment),
+    ('"severity"', _risk_surveillance),
+    ('"pep_flag"', _kyc_analysis),
+]
+
+
+def generate_response(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a schema-valid JSON answer for the backend prompt in ``messages``"""
+    text = "\n".join(str(message.get("content") or "") for message in messages)
+    signals = _Signals(_data_section(messages))
+    for marker, generator in RESPONSE_TEMPLATES:
+        if marker in text:
+            return generator(signals)
+    return {"result": "ok", "note": "Stub response for an unrecognised prompt"}
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class StubState:
+    """Active profile, sampling RNG and request counters"""
+
+    def __init__(self, profile: StubProfile):
+        self.lock = threading.Lock()
+        self.set_profile(profile)
+        self.counters: Dict[str, int] = {}
+
+    def set_profile(self, profile: StubProfile):
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+
+    def count(self, key: str):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def sample_latency(self) -> float:
+        """First-byte latency in seconds drawn from the profile's distribution"""
+        p = self.profile
+        with self.lock:
+            if p.latency_distribution == "uniform":
+                value = self.rng.uniform(p.latency_ms * (1 - p.latency_spread), p.latency_ms * (1 + p.latency_spread))
+            elif p.latency_distribution == "normal":
+                value = self.rng.gauss(p.latency_ms, p.latency_ms * p.latency_spread)
+            elif p.latency_distribution == "lognormal":
+                value = p.latency_ms * self.rng.lognormvariate(0.0, p.latency_spread)
+            else:
+                value = p.latency_ms
+        return max(0.0, min(value, p.latency_max_ms)) / 1000.0
+
+    def sample_fault(self) -> Optional[str]:
+        """Pick an injected fault ("429", "500", "timeout") or None"""
+        p = self.profile
+        with self.lock:
+            roll = self.rng.random()
+        for fault, rate in (("429", p.error_rate_429), ("500", p.error_rate_500), ("timeout", p.timeout_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+def _usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // CHARS_PER_TOKEN + 1
+    completion_tokens = len(content) // CHARS_PER_TOKEN + 1
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+def create_app(profile: Optional[StubProfile] = None) -> FastAPI:
+    """Create the stub ASGI app with the given (or default "realistic") profile"""
+    app = FastAPI(title="LLM Stub Server")
+    state = StubState(profile or PROFILES["realistic"])
+    app.state.stub = state
+
+    def error(status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": message, "type": error_type, "param": None, "code": None}},
+            headers=headers
+        )
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": name, "object": "model", "owned_by": "stub"} for name in ("gpt-4o", "gpt-4o-mini")]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        model = body.get("model", "gpt-4o")
+        state.count("requests")
+
+        fault = state.sample_fault()
+        if fault == "429":
+            state.count("injected_429")
+            return error(429, "Rate limit reached (stub)", "rate_limit_error",
+                         {"retry-after": str(state.profile.retry_after_seconds)})
+        if fault == "500":
+            state.count("injected_500")
+            return error(500, "The server had an error while processing your request (stub)", "server_error")
+        if fault == "timeout":
+            state.count("injected_timeout")
+            await asyncio.sleep(state.profile.timeout_hang_seconds)
+            return error(504, "Stub request hung past its deadline", "timeout")
+
+        content = json.dumps(generate_response(messages))
+        usage = _usage(messages, content)
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        await asyncio.sleep(state.sample_latency())
+
+        if not body.get("stream"):
+            state.count("completions")
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        tokens_per_second = state.profile.tokens_per_second
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def event_stream() -> AsyncIterator[str]:
+            state.count("streams")
+            yield chunk({"role": "assistant", "content": ""})
+            for start in range(0, len(content), CHARS_PER_TOKEN):
+                yield chunk({"content": content[start:start + CHARS_PER_TOKEN]})
+                if tokens_per_second > 0:
+                    await asyncio.sleep(1.0 / tokens_per_second)
+            yield chunk({}, "stop")
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @app.get("/stub/profile")
+    async def get_profile():
+        return asdict(state.profile)
+
+    @app.post("/stub/profile")
+    async def update_profile(request: Request):
+        """Switch to a named profile ({"profile": "flaky"}) and/or override individual fields"""
+        body = await request.json()
+        base = PROFILES.get(body.pop("profile", None), state.profile)
+        known = {f.name for f in fields(StubProfile)}
+        unknown = set(body) - known
+        if unknown:
+            return error(400, f"Unknown profile fields: {sorted(unknown)}", "invalid_request_error")
+        state.set_profile(replace(base, **body))
+        return asdict(state.profile)
+
+    @app.get("/stub/stats")
+    async def stats():
+        with state.lock:
+            return dict(state.counters)
+
+    @app.post("/stub/stats/reset")
+    async def reset_stats():
+        with state.lock:
+            state.counters.clear()
+        return {"status": "reset"}
+
+    return app
+
+
+class StubServer(ServerThread):
+    """
+    Run the stub in a background thread (for benchmarks and scripts)
+
+    Example:
+        with StubServer(PROFILES["fast"]) as stub:
+            os.environ["OPENAI_BASE_URL"] = stub.base_url
+    """
+
+    def __init__(self, profile: Optional[StubProfile] = None, host: str = "127.0.0.1", port: int = 0):
+        super().__init__(create_app(profile), host, port)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    @property
+    def state(self) -> StubState:
+        return self.app.state.stub
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic",
+                        help="Base profile; individual options below override it")
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, help="Median time to first byte")
+    parser.add_argument("--latency-spread", type=float)
+    parser.add_argument("--latency-max-ms", type=float)
+    parser.add_argument("--tokens-per-second", type=float, help="Streaming speed (0 = unthrottled)")
+    parser.add_argument("--error-rate-429", type=float)
+    parser.add_argument("--error-rate-500", type=float)
+    parser.add_argument("--timeout-rate", type=float)
+    parser.add_argument("--timeout-hang-seconds", type=float)
+    parser.add_argument("--retry-after-seconds", type=float)
+    parser.add_argument("--seed", type=int)
+    args = vars(parser.parse_args(argv))
+
+    host, port = args.pop("host"), args.pop("port")
+    profile = replace(PROFILES[args.pop("profile")], **{k: v for k, v in args.items() if v is not None})
+    print(f"LLM stub listening on http://{host}:{port}/v1 with profile {asdict(profile)}")
+    uvicorn.run(create_app(profile), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
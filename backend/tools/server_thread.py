@@ -0,0 +1,57 @@
+"""
+Background Uvicorn Server
+Runs an ASGI app on a local port in a daemon thread, for scripts and benchmarks.
+"""
+
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+
+
+class ServerThread:
+    """
+    Serve an ASGI app from a background thread
+
+    Example:
+        with ServerThread(app) as server:
+            httpx.get(server.url + "/health")
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "ServerThread":
+        config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning", timeout_keep_alive=60)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError(f"Server for {self.app!r} failed to start")
+            time.sleep(0.01)
+        # Resolve an ephemeral port (port=0) to the one actually bound
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()